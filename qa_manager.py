@@ -1,36 +1,4392 @@
+import ast
+import asyncio
+import base64
+import bisect
+import copy
+import csv
+import difflib
+import gzip
+import hashlib
+import heapq
+import html
+import io
+import itertools
 import json
+import logging
+import mmap
+import operator
 import os
+import queue
+import re
+import struct
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+import urllib.parse
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape as xml_escape
+from tkinter import ttk, messagebox, filedialog, simpledialog
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 from datetime import datetime
 
 DATA_FILE = "qa_data_gui.json"
 
+# Lazy úložisko: dátový súbor má jeden záznam na riadok a vedľa neho leží index
+# s offsetmi (qa_data_gui.json.idx). Pri štarte sa načíta iba index, celé záznamy
+# sa dekódujú z memory-mapovaného súboru až keď ich niekto naozaj číta.
+LAZY_STORAGE = True
+INDEX_SUFFIX = ".idx"
+INDEX_FORMAT = 1
+
+# Zdieľaný režim: viac inštancií nad jedným súborom (napr. na sieťovom disku).
+# Zápis prebieha pod advisory zámkom, každý záznam má číslo verzie "rev"
+# a neskonfliktné zmeny sa pri uložení zlúčia so zmenami ostatných.
+SHARED_STORAGE = False
+LOCK_SUFFIX = ".lock"
+CONFLICTS_SUFFIX = ".conflicts.json"
+LOCK_TIMEOUT = 10.0
+SHARED_POLL_MS = 2000
+
+# Rozdelené úložisko: namiesto jedného súboru adresár qa_data_gui.json.shards/
+# s jedným súborom na TS (jeho TC a bugy k nim) a malým manifestom. Shardy sa
+# načítavajú paralelne a pri uložení sa prepíšu len tie, ktorých sa zmena týkala.
+SHARDED_STORAGE = False
+SHARD_DIR_SUFFIX = ".shards"
+SHARD_MANIFEST = "manifest.json"
+SHARD_FORMAT = 1
+SHARD_WORKERS = 8
+SHARD_UNASSIGNED = ""  # TC bez TS a bugy bez TC
+
+COLLECTIONS = ("test_scenarios", "test_cases", "bug_reports")
+
+# polia, ktoré potrebujú zoznamy a comboboxy – držia sa v pamäti stále
+SUMMARY_FIELDS = {
+    "test_scenarios": ("id", "title", "rev"),
+    "test_cases": ("id", "title", "ts_id", "status", "rev"),
+    "bug_reports": ("id", "title", "related_tc", "severity", "screenshot", "rev"),
+}
+
+# na ktorú kolekciu odkazuje pole záznamu
+REFERENCES = {
+    "test_cases": ("ts_id", "test_scenarios"),
+    "bug_reports": ("related_tc", "test_cases"),
+}
+# hodnota odkazu "bez väzby" (TC bez TS má None, bug bez TC prázdny reťazec)
+EMPTY_REFERENCE = {"test_cases": None, "bug_reports": ""}
+
+# Čo sa stane so záznamami, ktoré odkazujú na mazaný TS / TC:
+#   "keep"     – ostanú nezmenené (pôvodné správanie, odkaz ostane visieť)
+#   "nullify"  – odkaz sa zruší
+#   "cascade"  – vymažú sa tiež
+#   "restrict" – mazanie sa odmietne
+DELETE_POLICIES = {"test_scenarios": "keep", "test_cases": "keep"}
+DELETE_POLICY_TEXT = {
+    "keep": "zostanú nezmenené",
+    "nullify": "stratia odkaz",
+    "cascade": "budú vymazané tiež",
+    "restrict": "bránia vymazaniu",
+}
+
+
+def empty_data():
+    return {"test_scenarios": [], "test_cases": [], "bug_reports": []}
+
+
+class RecordFile:
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self.open()
+
+    def open(self):
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self._file.close()
+            raise
+
+    def raw(self, offset, length):
+        return self._map[offset:offset + length]
+
+    def read(self, offset, length):
+        return json.loads(self._map[offset:offset + length])
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+
+# mapované súbory čítajú aj úlohy na pozadí – dočítanie záznamu a prepnutie
+# záznamov na nový súbor po uložení preto prebiehajú pod jedným zámkom
+_source_lock = threading.RLock()
+
+
+# záznam, ktorý má v pamäti len súhrnné polia – zvyšok sa dočíta pri prvom prístupe
+class LazyRecord(dict):
+    __slots__ = ("_source", "_offset", "_length")
+
+    def __init__(self, summary, source, offset, length):
+        super().__init__(summary)
+        self._source = source
+        self._offset = offset
+        self._length = length
+
+    @property
+    def loaded(self):
+        return self._source is None
+
+    def load(self):
+        if self._source is not None:
+            with _source_lock:
+                if self._source is not None:
+                    full = self._source.read(self._offset, self._length)
+                    dict.clear(self)
+                    dict.update(self, full)
+                    # až teraz – iné vlákno medzitým narazí na chýbajúci kľúč a počká na zámok
+                    self._source = None
+        return self
+
+    def peek(self):
+        # celý záznam bez toho, aby ostal v pamäti
+        with _source_lock:
+            if self._source is None:
+                return self
+            return self._source.read(self._offset, self._length)
+
+    def _need(self, key):
+        if self._source is not None and not dict.__contains__(self, key):
+            self.load()
+
+    def __getitem__(self, key):
+        self._need(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._need(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        self._need(key)
+        return dict.__contains__(self, key)
+
+    def __setitem__(self, key, value):
+        self.load()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.load()
+        dict.__delitem__(self, key)
+
+    def pop(self, key, *default):
+        self.load()
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key, default=None):
+        self.load()
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        self.load()
+        dict.update(self, *args, **kwargs)
+
+    def __iter__(self):
+        self.load()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self.load()
+        return dict.__len__(self)
+
+    def keys(self):
+        self.load()
+        return dict.keys(self)
+
+    def values(self):
+        self.load()
+        return dict.values(self)
+
+    def items(self):
+        self.load()
+        return dict.items(self)
+
+    def copy(self):
+        self.load()
+        return dict(dict.items(self))
+
+    def __eq__(self, other):
+        self.load()
+        if isinstance(other, LazyRecord):
+            other.load()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        self.load()
+        return dict.__repr__(self)
+
+
+def _index_path(path):
+    return path + INDEX_SUFFIX
+
+
+def _load_index(path):
+    try:
+        with open(_index_path(path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if (
+        index.get("format") != INDEX_FORMAT
+        or index.get("size") != st.st_size
+        or index.get("mtime_ns") != st.st_mtime_ns
+    ):
+        return None
+    return index
+
+
+def _load_lazy(path):
+    index = _load_index(path)
+    if index is None:
+        return None
+    try:
+        source = RecordFile(path)
+    except (OSError, ValueError):
+        return None
+
+    data = dict(index.get("extra", {}))
+    for name in COLLECTIONS:
+        data[name] = [
+            LazyRecord(summary, source, offset, length)
+            for offset, length, summary in index["collections"].get(name, [])
+        ]
+    return data
+
+
+def record_view(record):
+    # celý záznam pre čítanie mimo GUI (export, archív) – nenačítaný sa prečíta cez
+    # peek() a v pamäti neostane, načítaný sa skopíruje, aby ho GUI medzitým nemenilo
+    if isinstance(record, LazyRecord):
+        full = record.peek()
+        return dict.copy(full) if full is record else full
+    return record
+
+
+def snapshot_data(data):
+    # stav pre úlohu na pozadí, zachytený v GUI vlákne pri jej zadaní. Nenačítané lazy
+    # záznamy sa len odkážu (čítajú sa pod _source_lock, uloženie ich presmeruje na nový
+    # súbor), ostatné sa skopírujú aj so zoznamami krokov, aby ich GUI medzitým nemenilo
+    snapshot = {key: value for key, value in data.items() if key not in COLLECTIONS}
+    for name in COLLECTIONS:
+        snapshot[name] = [
+            record if isinstance(record, LazyRecord) and not record.loaded else {
+                key: value.copy() if isinstance(value, (list, dict)) else value
+                for key, value in dict.items(record)
+            }
+            for record in data.get(name, [])
+        ]
+    return snapshot
+
+
+def _data_sources(data):
+    sources = set()
+    for name in COLLECTIONS:
+        for record in data.get(name, []):
+            if isinstance(record, LazyRecord) and not record.loaded:
+                sources.add(record._source)
+    return sources
+
+
+def close_data(data):
+    # uvoľní memory-mapované súbory (napr. pred zmazaním databázy)
+    with _source_lock:
+        for source in _data_sources(data):
+            source.close()
+
+
+def materialize_data(data):
+    # načíta všetky lazy záznamy do obyčajných dict-ov a pustí mapovaný súbor
+    sources = _data_sources(data)
+    for name in COLLECTIONS:
+        data[name] = [
+            record.copy() if isinstance(record, LazyRecord) else record
+            for record in data.get(name, [])
+        ]
+    for source in sources:
+        source.close()
+    return data
+
+
+def _record_bytes(record):
+    if isinstance(record, LazyRecord) and not record.loaded:
+        return record._source.raw(record._offset, record._length)
+    return json.dumps(record, ensure_ascii=False).encode("utf-8")
+
+
+def _write_record_file(path, data, progress=None):
+    # jeden záznam na riadok – súbor ostáva platný JSON, ale dá sa indexovať
+    tmp_path = path + ".tmp"
+    entries = {}
+    extra = {k: v for k, v in data.items() if k not in COLLECTIONS}
+    try:
+        _write_records(tmp_path, data, extra, entries, progress)
+    except BaseException:
+        # zrušená úloha alebo chyba zápisu – rozpísaný súbor netreba
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    with _source_lock:
+        _replace_record_file(path, tmp_path, data, extra, entries)
+
+
+def _write_records(tmp_path, data, extra, entries, progress):
+    written = 0
+    with open(tmp_path, "wb") as f:
+        f.write(b"{\n")
+        for key, value in extra.items():
+            f.write(json.dumps(key).encode("utf-8") + b": ")
+            f.write(json.dumps(value, ensure_ascii=False).encode("utf-8") + b",\n")
+        for n, name in enumerate(COLLECTIONS):
+            f.write(json.dumps(name).encode("utf-8") + b": [\n")
+            fields = SUMMARY_FIELDS[name]
+            records = data.get(name, [])
+            collection_entries = []
+            for i, record in enumerate(records):
+                if progress and written % JOB_PROGRESS_EVERY == 0:
+                    progress(written)
+                written += 1
+                with _source_lock:
+                    raw = _record_bytes(record)
+                    summary = {k: dict.get(record, k) for k in fields if dict.__contains__(record, k)}
+                offset = f.tell()
+                f.write(raw)
+                f.write(b",\n" if i < len(records) - 1 else b"\n")
+                collection_entries.append([offset, len(raw), summary])
+            entries[name] = collection_entries
+            f.write(b"]\n" if n == len(COLLECTIONS) - 1 else b"],\n")
+        f.write(b"}\n")
+
+
+def _replace_record_file(path, tmp_path, data, extra, entries):
+    sources = _data_sources(data)
+    # na Windows sa otvorený (namapovaný) súbor nedá prepísať
+    for source in sources:
+        source.close()
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        for source in sources:
+            source.open()
+        raise
+
+    st = os.stat(path)
+    index = {
+        "format": INDEX_FORMAT,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "extra": extra,
+        "collections": entries,
+    }
+    tmp_index = _index_path(path) + ".tmp"
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_index, _index_path(path))
+
+    if sources:
+        new_source = RecordFile(path)
+        for name in COLLECTIONS:
+            for record, (offset, length, _) in zip(data.get(name, []), entries[name]):
+                if isinstance(record, LazyRecord) and not record.loaded:
+                    record._source = new_source
+                    record._offset = offset
+                    record._length = length
+
+
+# záznam, ktorý si pri zmene poznačí, že sa od posledného načítania / uloženia zmenil
+class TrackedRecord(dict):
+    __slots__ = ("dirty", "nested")
+
+    def __init__(self, record):
+        super().__init__(record)
+        self.dirty = False
+        self.nested = self._nested()
+
+    def _nested(self):
+        # kópie zoznamov (kroky) – tc["steps"].append(...) neprejde cez __setitem__,
+        # takže sa pri ukladaní porovnajú s obsahom z posledného načítania / uloženia
+        return {key: value.copy() for key, value in self.items() if isinstance(value, (list, dict))}
+
+    def changed(self):
+        return self.dirty or any(dict.get(self, key) != value for key, value in self.nested.items())
+
+    def saved(self):
+        self.dirty = False
+        self.nested = self._nested()
+
+    def __setitem__(self, key, value):
+        self.dirty = True
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.dirty = True
+        dict.__delitem__(self, key)
+
+    def pop(self, key, *default):
+        self.dirty = True
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self.dirty = True
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        self.dirty = True
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        self.dirty = True
+        dict.update(self, *args, **kwargs)
+
+    def clear(self):
+        self.dirty = True
+        dict.clear(self)
+
+
+# záznam zo shardu – pri zmene si poznačí, že jeho shard treba prepísať
+class ShardRecord(TrackedRecord):
+    __slots__ = ("shard",)
+
+    def __init__(self, record, shard):
+        super().__init__(record)
+        self.shard = shard
+
+    def saved(self, shard):
+        self.shard = shard
+        TrackedRecord.saved(self)
+
+
+# stav posledného načítania / uloženia pre každý adresár so shardmi:
+# {"files": {shard: súbor}, "counts": {shard: počet záznamov}, "plain": {id(záznam): (záznam, shard, hash)}}
+_shard_state = {}
+
+
+def shard_dir(path):
+    return path + SHARD_DIR_SUFFIX
+
+
+def storage_path(path):
+    # súbor, ktorého zmena znamená zmenu dát (pre zdieľaný režim)
+    if SHARDED_STORAGE:
+        return os.path.join(shard_dir(path), SHARD_MANIFEST)
+    return path
+
+
+def _shard_file(shard):
+    return "ts-" + (re.sub(r"[^\w.-]", "_", shard) or "none") + ".json"
+
 
-def load_data():
-    if not os.path.exists(DATA_FILE):
-        return {"test_scenarios": [], "test_cases": [], "bug_reports": []}
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
+def _id_order(record):
+    match = re.search(r"(\d+)$", record.get("id") or "")
+    return (int(match.group(1)) if match else -1, record.get("id") or "")
+
+
+def _read_shard(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _load_sharded(path):
+    directory = shard_dir(path)
+    try:
+        with open(os.path.join(directory, SHARD_MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != SHARD_FORMAT:
+        return None
+
+    files = manifest.get("shards", {})
+    shards = list(files)
+    with ThreadPoolExecutor(max_workers=SHARD_WORKERS) as pool:
+        contents = list(pool.map(_read_shard, [os.path.join(directory, files[shard]) for shard in shards]))
+
+    data = dict(manifest.get("extra", {}))
+    for name in COLLECTIONS:
+        data[name] = []
+    counts = {}
+    for shard, content in zip(shards, contents):
+        counts[shard] = 0
+        for name in COLLECTIONS:
+            for record in content.get(name, []):
+                data[name].append(ShardRecord(record, shard))
+                counts[shard] += 1
+    for name in COLLECTIONS:
+        data[name].sort(key=_id_order)  # poradie podľa čísla ID, ako pri jednom súbore
+    _shard_state[os.path.abspath(directory)] = {"files": files, "counts": counts, "plain": {}}
+    return data
+
+
+def _assign_shards(data):
+    # shard každého záznamu: TS sám, TC podľa ts_id, bug podľa TS svojho TC
+    ts_ids = {ts["id"] for ts in data.get("test_scenarios", [])}
+    tc_shard = {}
+    assigned = []
+    for ts in data.get("test_scenarios", []):
+        assigned.append(("test_scenarios", ts, ts["id"]))
+    for tc in data.get("test_cases", []):
+        shard = tc.get("ts_id") if tc.get("ts_id") in ts_ids else SHARD_UNASSIGNED
+        tc_shard[tc["id"]] = shard
+        assigned.append(("test_cases", tc, shard))
+    for bug in data.get("bug_reports", []):
+        assigned.append(("bug_reports", bug, tc_shard.get(bug.get("related_tc"), SHARD_UNASSIGNED)))
+    return assigned
+
+
+def _write_shard(path, content):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(content, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _save_sharded(data, path):
+    directory = shard_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    state = _shard_state.get(os.path.abspath(directory), {"files": {}, "counts": {}, "plain": {}})
+
+    groups = {}
+    dirty = set()
+    plain = {}
+    assigned = _assign_shards(data)
+    for name, record, shard in assigned:
+        groups.setdefault(shard, empty_data())[name].append(record)
+        if isinstance(record, ShardRecord):
+            if record.shard != shard or record.changed():
+                dirty.update((shard, record.shard))
+        else:
+            # nový záznam – bez sledovania zmien, porovnáva sa odtlačok
+            digest = record_hash(record)
+            previous = state["plain"].get(id(record))
+            if previous is None or previous[0] is not record or previous[1:] != (shard, digest):
+                dirty.add(shard)
+                if previous is not None and previous[0] is record:
+                    dirty.add(previous[1])
+            plain[id(record)] = (record, shard, digest)
+    counts = {shard: sum(len(group[name]) for name in COLLECTIONS) for shard, group in groups.items()}
+    dirty.update(shard for shard, count in counts.items() if state["counts"].get(shard) != count)
+    dirty.intersection_update(groups)
+
+    files = {shard: state["files"].get(shard) or _shard_file(shard) for shard in groups}
+    with ThreadPoolExecutor(max_workers=SHARD_WORKERS) as pool:
+        list(pool.map(
+            lambda shard: _write_shard(os.path.join(directory, files[shard]), groups[shard]),
+            dirty,
+        ))
+
+    manifest = {
+        "format": SHARD_FORMAT,
+        "extra": {k: v for k, v in data.items() if k not in COLLECTIONS},
+        "shards": files,
+    }
+    _write_shard(os.path.join(directory, SHARD_MANIFEST), manifest)
+    for shard, file_name in state["files"].items():
+        if shard not in groups and file_name not in files.values():
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except OSError:
+                pass
+
+    for name, record, shard in assigned:
+        if isinstance(record, ShardRecord) and shard in dirty:
+            record.saved(shard)
+    _shard_state[os.path.abspath(directory)] = {"files": files, "counts": counts, "plain": plain}
+    return dirty
+
+
+def load_data(path=None):
+    path = path or DATA_FILE
+    if SHARDED_STORAGE:
+        data = _load_sharded(path)
+        if data is not None:
+            return data
+    if not os.path.exists(path):
+        return empty_data()
+    if LAZY_STORAGE:
+        data = _load_lazy(path)
+        if data is not None:
+            return data
+    with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def save_data(data):
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
+def save_data(data, path=None, progress=None):
+    path = path or DATA_FILE
+    if SHARDED_STORAGE:
+        _save_sharded(data, path)
+        return
+    if LAZY_STORAGE:
+        _write_record_file(path, data, progress)
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+
+
+# prefix -> (id(zoznam), dĺžka, id(posledný záznam), jeho ID, najvyššie číslo)
+# Len jedna položka na prefix a bez odkazov na samotné dáta – zoznam nahradený
+# pri mazaní či oprave, alebo projekt zatvorený v LRU, tak môže zaniknúť.
+_id_counters = {}
+
+
+def generate_id(prefix, existing_items, reserved=None):
+    # najvyššie číslo + 1 – po archivácii / mazaní by len+1 vydalo už použité ID.
+    # Do zoznamu sa väčšinou len pridáva, preto sa pamätá, po ktorý záznam je
+    # prejdený, a pri ďalšom volaní sa prejdú len nové záznamy.
+    # reserved – {prefix: číslo} už vydaných ID, ktoré v zozname nie sú (LinkGraph.reserved)
+    cached = _id_counters.get(prefix)
+    start = number = 0
+    if cached is not None and cached[0] == id(existing_items) and 0 < cached[1] <= len(existing_items):
+        last = existing_items[cached[1] - 1]
+        if id(last) == cached[2] and last.get("id") == cached[3]:
+            start, number = cached[1], cached[4]
+
+    size = len(prefix)
+    for item in itertools.islice(existing_items, start, None):
+        item_id = item.get("id")
+        if not isinstance(item_id, str):
+            continue
+        if item_id.startswith(prefix) and item_id[size:].isdecimal():
+            number = max(number, int(item_id[size:]))
+    if existing_items:
+        last = existing_items[-1]
+        _id_counters[prefix] = (id(existing_items), len(existing_items), id(last), last.get("id"), number)
+    if reserved is not None:
+        number = max(number, reserved.get(prefix, 0))
+        reserved[prefix] = number + 1
+    return f"{prefix}{number + 1:02d}"
+
+
+# ===== OPERÁCIE NAD DÁTAMI (spoločné pre GUI aj API) =====
+TC_STATUSES = ["PASSED", "FAILED", "NOT RUN"]
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+
+
+def clean_steps(steps):
+    if steps is None:
+        return []
+    if isinstance(steps, str):
+        steps = steps.splitlines()
+    return [str(s).strip() for s in steps if str(s).strip()]
+
+
+def find_record(data, collection, record_id):
+    for record in data[collection]:
+        if record["id"] == record_id:
+            return record
+    return None
+
+
+def _get_record(data, collection, record_id, links=None):
+    if links is not None:
+        record = links.record(collection, record_id)
+    else:
+        record = find_record(data, collection, record_id)
+    if record is None:
+        raise KeyError(record_id)
+    return record
+
+
+# ===== VÄZBY TS → TC → BUG =====
+class LinkGraph:
+    # Index záznamov podľa ID a spätných odkazov (kto odkazuje na koho).
+    # Odkazy na neexistujúce záznamy sa evidujú v množine dangling, takže
+    # report osirelých odkazov nemusí prechádzať celú databázu.
+    def __init__(self, data):
+        self.reserved = {}  # prefix -> najvyššie už vydané číslo ID (aj archivované, zmazané)
+        self.rebuild(data)
+
+    def reserve(self, ids):
+        # ID, ktoré v dátach nie sú, ale nové záznamy ich nesmú zopakovať
+        for record_id in ids:
+            for prefix in ID_PREFIXES.values():
+                number = (record_id or "")[len(prefix):]
+                if (record_id or "").startswith(prefix) and number.isdecimal():
+                    self.reserved[prefix] = max(self.reserved.get(prefix, 0), int(number))
+
+    def rebuild(self, data):
+        self.data = data
+        self.records = {name: {} for name in COLLECTIONS}
+        self.children = {}  # (kolekcia, id) -> {(kolekcia potomka, id potomka)}
+        self.dangling = set()
+        for name in COLLECTIONS:
+            index = self.records[name]
+            for record in data[name]:
+                index[record.get("id")] = record
+        for name, (field, target) in REFERENCES.items():
+            for record in data[name]:
+                self._link(name, record.get("id"), target, record.get(field))
+
+    def _link(self, name, record_id, target, target_id):
+        if not target_id:
+            return
+        self.children.setdefault((target, target_id), set()).add((name, record_id))
+        if target_id not in self.records[target]:
+            self.dangling.add((target, target_id))
+
+    def _unlink(self, name, record_id, target, target_id):
+        key = (target, target_id)
+        kids = self.children.get(key)
+        if not kids:
+            return
+        kids.discard((name, record_id))
+        if not kids:
+            del self.children[key]
+            self.dangling.discard(key)
+
+    def record(self, name, record_id):
+        return self.records[name].get(record_id)
+
+    def linked(self, name, record_id):
+        return set(self.children.get((name, record_id), ()))
+
+    def added(self, name, record):
+        self.records[name][record["id"]] = record
+        self.dangling.discard((name, record["id"]))
+        if name in REFERENCES:
+            field, target = REFERENCES[name]
+            self._link(name, record["id"], target, record.get(field))
+
+    def relinked(self, name, record, old_target_id):
+        field, target = REFERENCES[name]
+        self._unlink(name, record["id"], target, old_target_id)
+        self._link(name, record["id"], target, record.get(field))
+
+    def removed(self, name, record_id):
+        record = self.records[name].pop(record_id, None)
+        if record is not None and name in REFERENCES:
+            field, target = REFERENCES[name]
+            self._unlink(name, record_id, target, record.get(field))
+        if (name, record_id) in self.children:
+            self.dangling.add((name, record_id))
+
+    def orphans(self):
+        # [(kolekcia, id, pole, chýbajúce ID)]
+        result = []
+        for target, target_id in self.dangling:
+            for name, record_id in self.children.get((target, target_id), ()):
+                result.append((name, record_id, REFERENCES[name][0], target_id))
+        return sorted(result)
+
+
+def delete_record(data, name, record_id, links=None):
+    # zmaže záznam a podľa DELETE_POLICIES aj naviazané záznamy (alebo ich odkazy)
+    links = links if links is not None else LinkGraph(data)
+    removed = _get_record(data, name, record_id, links)
+
+    doomed = {n: set() for n in COLLECTIONS}
+    nullify = []
+    stack = [(name, record_id)]
+    while stack:
+        current, current_id = stack.pop()
+        if current_id in doomed[current]:
+            continue
+        doomed[current].add(current_id)
+        policy = DELETE_POLICIES.get(current, "keep")
+        for child_name, child_id in sorted(links.linked(current, current_id)):
+            if policy == "restrict":
+                raise ValueError(f"{current_id} sa nedá vymazať, odkazuje naň {child_id}.")
+            if policy == "cascade":
+                stack.append((child_name, child_id))
+            elif policy == "nullify":
+                nullify.append((child_name, child_id))
+
+    for child_name, child_id in nullify:
+        if child_id in doomed[child_name]:
+            continue
+        child = links.record(child_name, child_id)
+        field = REFERENCES[child_name][0]
+        old_value = child.get(field)
+        child[field] = EMPTY_REFERENCE[child_name]
+        links.relinked(child_name, child, old_value)
+
+    for current, ids in doomed.items():
+        if ids:
+            data[current] = [r for r in data[current] if r["id"] not in ids]
+            for current_id in ids:
+                links.removed(current, current_id)
+    return removed
+
+
+def nullify_orphans(data, links):
+    fixed = 0
+    for name, record_id, field, _ in links.orphans():
+        record = links.record(name, record_id)
+        if record is None:
+            continue
+        old_value = record.get(field)
+        record[field] = EMPTY_REFERENCE[name]
+        links.relinked(name, record, old_value)
+        fixed += 1
+    return fixed
+
+
+def _check_tc_fields(title, steps, status):
+    if not title:
+        raise ValueError("Názov TC nemôže byť prázdny.")
+    if not steps:
+        raise ValueError("Musíš zadať aspoň jeden krok.")
+    if status not in TC_STATUSES:
+        raise ValueError(f"Neplatný stav: {status}")
+
+
+def _check_bug_fields(title, steps):
+    if not title:
+        raise ValueError("Názov chyby nemôže byť prázdny.")
+    if not steps:
+        raise ValueError("Musíš zadať kroky k reprodukcii.")
+
+
+def mark_tc_failed(data, tc_id, links=None):
+    # bug naviazaný na TC znamená, že TC zlyhal
+    if tc_id:
+        if links is not None:
+            tc = links.record("test_cases", tc_id)
+        else:
+            tc = find_record(data, "test_cases", tc_id)
+        if tc is not None:
+            tc["status"] = "FAILED"
+
+
+def create_ts(data, title, description="", links=None):
+    title = (title or "").strip()
+    if not title:
+        raise ValueError("Názov TS nemôže byť prázdny.")
+    ts = {
+        "id": generate_id("TS", data["test_scenarios"], links.reserved if links is not None else None),
+        "title": title,
+        "description": (description or "").strip(),
+    }
+    data["test_scenarios"].append(ts)
+    if links is not None:
+        links.added("test_scenarios", ts)
+    return ts
+
+
+def edit_ts(data, ts_id, title=None, description=None, links=None):
+    ts = _get_record(data, "test_scenarios", ts_id, links)
+    title = ts["title"] if title is None else title.strip()
+    if not title:
+        raise ValueError("Názov TS nemôže byť prázdny.")
+    ts["title"] = title
+    if description is not None:
+        ts["description"] = description.strip()
+    return ts
+
+
+def create_tc(data, title, steps, preconditions="", ts_id=None, expected="", actual="", status="NOT RUN",
+              links=None):
+    title = (title or "").strip()
+    steps = clean_steps(steps)
+    status = (status or "NOT RUN").strip().upper()
+    _check_tc_fields(title, steps, status)
+
+    tc = {
+        "id": generate_id("TC", data["test_cases"], links.reserved if links is not None else None),
+        "title": title,
+        "preconditions": (preconditions or "").strip(),
+        "ts_id": ts_id or None,
+        "steps": steps,
+        "expected": (expected or "").strip(),
+        "actual": (actual or "").strip(),
+        "status": status,
+    }
+    data["test_cases"].append(tc)
+    if links is not None:
+        links.added("test_cases", tc)
+    return tc
+
+
+def edit_tc(data, tc_id, links=None, **fields):
+    tc = _get_record(data, "test_cases", tc_id, links)
+    unknown = set(fields) - {"title", "steps", "preconditions", "ts_id", "expected", "actual", "status"}
+    if unknown:
+        raise ValueError(f"Neznáme polia: {', '.join(sorted(unknown))}")
+
+    if "steps" in fields:
+        fields["steps"] = clean_steps(fields["steps"])
+    if "status" in fields:
+        fields["status"] = (fields["status"] or "NOT RUN").strip().upper()
+    if "ts_id" in fields:
+        fields["ts_id"] = fields["ts_id"] or None
+    for key in ("title", "preconditions", "expected", "actual"):
+        if key in fields:
+            fields[key] = (fields[key] or "").strip()
+
+    _check_tc_fields(
+        fields.get("title", tc["title"]),
+        fields.get("steps", tc["steps"]),
+        fields.get("status", tc["status"]),
+    )
+    old_ts_id = tc.get("ts_id")
+    for key, value in fields.items():
+        tc[key] = value
+    if links is not None and tc.get("ts_id") != old_ts_id:
+        links.relinked("test_cases", tc, old_ts_id)
+    return tc
+
+
+def remove_ts(data, ts_id, links=None):
+    return delete_record(data, "test_scenarios", ts_id, links)
+
+
+def remove_tc(data, tc_id, links=None):
+    return delete_record(data, "test_cases", tc_id, links)
+
+
+def create_bug(data, title, steps, related_tc="", expected="", actual="", severity="Medium", note="",
+               screenshot=None, links=None):
+    title = (title or "").strip()
+    steps = clean_steps(steps)
+    _check_bug_fields(title, steps)
+
+    bug = {
+        "id": generate_id("BUG", data["bug_reports"], links.reserved if links is not None else None),
+        "title": title,
+        "related_tc": (related_tc or "").strip(),
+        "steps": steps,
+        "expected": (expected or "").strip(),
+        "actual": (actual or "").strip(),
+        "severity": (severity or "Medium").strip(),
+        "note": (note or "").strip(),
+        "screenshot": screenshot or None,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    data["bug_reports"].append(bug)
+    if links is not None:
+        links.added("bug_reports", bug)
+    mark_tc_failed(data, bug["related_tc"], links)
+    return bug
+
+
+def edit_bug(data, bug_id, links=None, **fields):
+    bug = _get_record(data, "bug_reports", bug_id, links)
+    unknown = set(fields) - {"title", "related_tc", "steps", "expected", "actual", "severity", "note", "screenshot"}
+    if unknown:
+        raise ValueError(f"Neznáme polia: {', '.join(sorted(unknown))}")
+
+    if "steps" in fields:
+        fields["steps"] = clean_steps(fields["steps"])
+    for key in ("title", "related_tc", "expected", "actual", "severity", "note"):
+        if key in fields:
+            fields[key] = (fields[key] or "").strip()
+    if "screenshot" in fields:
+        fields["screenshot"] = fields["screenshot"] or None
+
+    _check_bug_fields(fields.get("title", bug["title"]), fields.get("steps", bug["steps"]))
+    old_tc_id = bug.get("related_tc")
+    for key, value in fields.items():
+        bug[key] = value
+    if links is not None and bug.get("related_tc") != old_tc_id:
+        links.relinked("bug_reports", bug, old_tc_id)
+    mark_tc_failed(data, bug["related_tc"], links)
+    return bug
+
+
+def remove_bug(data, bug_id, links=None):
+    return delete_record(data, "bug_reports", bug_id, links)
+
+
+# ===== DUPLICITY BUGOV =====
+# Každý bug má MinHash podpis (32 hodnôt) z trojíc slov v názve, krokoch a skutočnom
+# výsledku. Podpis sa rozdelí na pásma (LSH) a bugy s rovnakým pásmom sú kandidáti
+# na duplicitu – pri hľadaní sa tak porovnáva len pár bugov, nie celá databáza.
+DUPLICATE_BANDS = 8
+DUPLICATE_ROWS = 4
+DUPLICATE_THRESHOLD = 0.4
+DUPLICATE_LIMIT = 5
+DUPLICATE_BUILD_CHUNK = 200
+DUPLICATE_DELAY_MS = 250
+
+_WORD_RE = re.compile(r"\w+")
+_MINHASH_SALTS = (b"qa-dup-0", b"qa-dup-1")  # 2 × 16 hodnôt z jedného blake2b
+
+
+def bug_text(bug):
+    steps = bug.get("steps") or []
+    return " ".join([bug.get("title") or "", " ".join(steps), bug.get("actual") or ""])
+
+
+def _shingles(text):
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < 3:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def minhash(text):
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+    columns = []
+    for salt in _MINHASH_SALTS:
+        rows = [
+            struct.unpack("<16I", hashlib.blake2b(s.encode("utf-8"), digest_size=64, salt=salt).digest())
+            for s in shingles
+        ]
+        columns.extend(min(column) for column in zip(*rows))
+    return tuple(columns)
+
+
+def _bands(signature):
+    return [(band, signature[band * DUPLICATE_ROWS:(band + 1) * DUPLICATE_ROWS])
+            for band in range(DUPLICATE_BANDS)]
+
+
+class BugDuplicateIndex:
+    # Index sa plní postupne (build_step), nové a upravené bugy sa doň
+    # zapisujú hneď cez update / remove.
+    def __init__(self, bugs=()):
+        self.rebuild(bugs)
+
+    def rebuild(self, bugs):
+        self.signatures = {}
+        self.buckets = {}
+        self._pending = list(bugs)
+
+    @property
+    def building(self):
+        return bool(self._pending)
+
+    def build_step(self, count=DUPLICATE_BUILD_CHUNK):
+        chunk, self._pending = self._pending[:count], self._pending[count:]
+        for bug in chunk:
+            if bug["id"] not in self.signatures:
+                full = bug.peek() if isinstance(bug, LazyRecord) else bug
+                self._add(bug["id"], minhash(bug_text(full)))
+        return self.building
+
+    def _add(self, bug_id, signature):
+        if signature is None:
+            return
+        self.signatures[bug_id] = signature
+        for key in _bands(signature):
+            self.buckets.setdefault(key, set()).add(bug_id)
+
+    def remove(self, bug_id):
+        signature = self.signatures.pop(bug_id, None)
+        if signature is None:
+            return
+        for key in _bands(signature):
+            ids = self.buckets.get(key)
+            if ids is not None:
+                ids.discard(bug_id)
+                if not ids:
+                    del self.buckets[key]
+
+    def retain(self, bug_ids):
+        # po kaskádovom mazaní vyhodí bugy, ktoré už neexistujú
+        for bug_id in set(self.signatures).difference(bug_ids):
+            self.remove(bug_id)
+
+    def update(self, bug):
+        self.remove(bug["id"])
+        self._add(bug["id"], minhash(bug_text(bug)))
+
+    def similar(self, text, exclude=None, threshold=DUPLICATE_THRESHOLD, limit=DUPLICATE_LIMIT):
+        # [(id, podobnosť 0–1)] zoradené od najpodobnejšieho
+        signature = minhash(text)
+        if signature is None:
+            return []
+        candidates = set()
+        for key in _bands(signature):
+            candidates.update(self.buckets.get(key, ()))
+        candidates.discard(exclude)
+        size = len(signature)
+        result = []
+        for bug_id in candidates:
+            other = self.signatures[bug_id]
+            score = sum(1 for a, b in zip(signature, other) if a == b) / size
+            if score >= threshold:
+                result.append((bug_id, score))
+        result.sort(key=lambda item: (-item[1], item[0]))
+        return result[:limit]
+
+
+# ===== RÝCHLE OTVORENIE (Ctrl+P) =====
+# Trigramový index nad "id názov" všetkých TS, TC a bugov. Dotaz prienikom
+# trigramov zúži kandidátov na pár záznamov, krátke dotazy (1–2 znaky) idú
+# cez zoradený zoznam slov (prefix). Index sa upravuje pri každej zmene.
+QUICK_OPEN_LIMIT = 20
+QUICK_OPEN_SCAN = 5000  # viac kandidátov sa pri širokom dotaze nehodnotí
+QUICK_OPEN_KINDS = {"test_scenarios": "TS", "test_cases": "TC", "bug_reports": "Bug"}
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class QuickOpenIndex:
+    def __init__(self, data=None):
+        self.rebuild(data)
+
+    def rebuild(self, data):
+        self.texts = {}  # (kolekcia, id) -> "id názov" malými písmenami
+        self.grams = {}  # trigram -> {(kolekcia, id)}
+        self.words = []  # zoradené (slovo, kolekcia, id)
+        self._sorted = True
+        self._pending = [(name, record) for name in COLLECTIONS for record in data[name]] if data else []
+
+    @property
+    def building(self):
+        return bool(self._pending)
+
+    def build_step(self, count=DUPLICATE_BUILD_CHUNK * 5):
+        chunk, self._pending = self._pending[:count], self._pending[count:]
+        for name, record in chunk:
+            self._add(name, record, bulk=True)
+        return self.building
+
+    def _add(self, name, record, bulk=False):
+        key = (name, record["id"])
+        text = f"{record['id']} {record.get('title') or ''}".lower()
+        self.texts[key] = text
+        for gram in _trigrams(text):
+            self.grams.setdefault(gram, set()).add(key)
+        for word in set(text.split()):
+            if bulk:
+                self.words.append((word, name, key[1]))
+                self._sorted = False
+            else:
+                self._sort()
+                bisect.insort(self.words, (word, name, key[1]))
+
+    def _sort(self):
+        if not self._sorted:
+            self.words.sort()
+            self._sorted = True
+
+    def remove(self, name, record_id):
+        key = (name, record_id)
+        text = self.texts.pop(key, None)
+        if text is None:
+            return
+        for gram in _trigrams(text):
+            keys = self.grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.grams[gram]
+        self._sort()
+        for word in set(text.split()):
+            entry = (word, name, record_id)
+            i = bisect.bisect_left(self.words, entry)
+            if i < len(self.words) and self.words[i] == entry:
+                del self.words[i]
+
+    def update(self, name, record):
+        self.remove(name, record["id"])
+        self._add(name, record)
+
+    def retain(self, records):
+        # records: {kolekcia: {id: záznam}} (napr. LinkGraph.records)
+        for name, record_id in [key for key in self.texts if key[1] not in records[key[0]]]:
+            self.remove(name, record_id)
+
+    def _word_candidates(self, word):
+        grams = _trigrams(word)
+        if not grams:
+            self._sort()
+            found = set()
+            i = bisect.bisect_left(self.words, (word,))
+            while i < len(self.words) and self.words[i][0].startswith(word) and len(found) < QUICK_OPEN_SCAN:
+                found.add(self.words[i][1:])
+                i += 1
+            return found
+
+        postings = sorted((self.grams.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        if candidates:
+            return candidates
+        # preklep – stačí zhoda väčšiny trigramov slova
+        counts = {}
+        budget = QUICK_OPEN_SCAN * 10
+        for keys in postings:
+            budget -= len(keys)
+            if budget < 0:
+                break
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+        need = max(1, (len(grams) + 1) // 2)
+        return {key for key, count in counts.items() if count >= need}
+
+    def search(self, query, limit=QUICK_OPEN_LIMIT):
+        # [(kolekcia, id)] od najlepšej zhody; každé slovo dotazu musí sedieť
+        words = query.lower().split()
+        if not words:
+            return []
+        query = " ".join(words)
+        candidates = None
+        for word in sorted(set(words), key=len, reverse=True):
+            found = self._word_candidates(word)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return []
+
+        def rank(key):
+            record_id = key[1].lower()
+            text = self.texts[key]
+            pos = text.find(query)
+            if record_id == query:
+                score = 0
+            elif record_id.startswith(query):
+                score = 1
+            elif pos == 0 or pos > 0 and text[pos - 1] == " ":
+                score = 2
+            elif pos > 0:
+                score = 3
+            elif all(word in text for word in words):
+                score = 4
+            else:
+                score = 5
+            return score, len(text), key
+
+        return heapq.nsmallest(limit, itertools.islice(candidates, QUICK_OPEN_SCAN), key=rank)
+
+
+# ===== ZDIEĽANÝ PRÍSTUP (viac používateľov) =====
+class FileLock:
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+
+    def _try_lock(self):
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock(self):
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._try_lock()
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    raise TimeoutError(f"Súbor {self.path} je zamknutý iným používateľom.")
+                time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._unlock()
+        finally:
+            self._file.close()
+            self._file = None
+
 
+def _fingerprint(record):
+    return hash(json.dumps(record, sort_keys=True, ensure_ascii=False))
 
-def generate_id(prefix, existing_items):
-    number = len(existing_items) + 1
+
+def _field_values(record):
+    # pole -> serializovaná hodnota; reťazce sa nemenia, keď UI upravuje záznam na mieste
+    return {key: json.dumps(value, sort_keys=True, ensure_ascii=False)
+            for key, value in record.items() if key != "rev"}
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _free_id(prefix, taken):
+    number = 1
+    for item_id in taken:
+        match = re.fullmatch(re.escape(prefix) + r"(\d+)", item_id or "")
+        if match:
+            number = max(number, int(match.group(1)) + 1)
     return f"{prefix}{number:02d}"
 
 
+class SharedStore:
+    def __init__(self, path=None):
+        self.path = path or DATA_FILE
+        self.lock_path = self.path + LOCK_SUFFIX
+        self.conflicts_path = self.path + CONFLICTS_SUFFIX
+        self._base = {}  # (kolekcia, id) -> (rev, odtlačok, polia) pri poslednom načítaní / uložení
+        self._signature = None
+
+    def _read(self):
+        # v zdieľanom režime sa súbor nenecháva namapovaný – iné procesy ho musia vedieť nahradiť;
+        # záznamy si zmeny sledujú samy, kontrola lokálnych zmien tak nepočíta odtlačky
+        data = materialize_data(load_data(self.path))
+        for name in COLLECTIONS:
+            data[name] = [
+                record if isinstance(record, TrackedRecord) else TrackedRecord(record)
+                for record in data.get(name, [])
+            ]
+        return data
+
+    def _remembered(self, data):
+        base = {
+            (name, record.get("id")): (record.get("rev", 0), _fingerprint(record), _field_values(record))
+            for name in COLLECTIONS
+            for record in data.get(name, [])
+        }
+        return base, _file_signature(storage_path(self.path))
+
+    def _remember(self, data):
+        self._base, self._signature = self._remembered(data)
+
+    def load(self):
+        with FileLock(self.lock_path):
+            data = self._read()
+            self._remember(data)
+        return data
+
+    def has_local_changes(self, data):
+        current = {(name, record.get("id")) for name in COLLECTIONS for record in data.get(name, [])}
+        if current != set(self._base):
+            return True
+        return any(self._changed(name, record) for name in COLLECTIONS for record in data.get(name, []))
+
+    def changed_on_disk(self):
+        return _file_signature(storage_path(self.path)) != self._signature
+
+    def fetch(self):
+        # prečítanie súboru (aj mimo GUI vlákna); prevezme sa až cez reload(data, fetched)
+        with FileLock(self.lock_path):
+            disk = self._read()
+            return disk, self._remembered(disk)
+
+    def reload(self, data, fetched=None):
+        disk, (self._base, self._signature) = fetched or self.fetch()
+        data.clear()
+        data.update(disk)
+
+    def _changed(self, name, record):
+        base = self._base.get((name, record.get("id")))
+        if base is None:
+            return True
+        if isinstance(record, TrackedRecord):
+            return record.changed()
+        return base[1] != _fingerprint(record)
+
+    def snapshot(self, data):
+        # v GUI vlákne pred uložením na pozadí: zmenené záznamy sa skopírujú, ostatné
+        # stačí poznať podľa ID – pri zlúčení sa za ne vezme verzia zo súboru.
+        # Vráti (snapshot, odoslané), odoslané sú pre adopt() a ako changed pre save()
+        snapshot = {key: copy.deepcopy(value) for key, value in data.items() if key not in COLLECTIONS}
+        ids = {}
+        copies = {}
+        for name in COLLECTIONS:
+            records = []
+            ids[name] = set()
+            copies[name] = {}
+            for record in data.get(name, []):
+                record_id = record.get("id")
+                ids[name].add(record_id)
+                if self._changed(name, record):
+                    copies[name][record_id] = copy.deepcopy(dict(record))
+                    records.append(copy.deepcopy(copies[name][record_id]))
+                else:
+                    records.append({"id": record_id})
+            snapshot[name] = records
+        return snapshot, (ids, copies)
+
+    def adopt(self, data, merged, sent):
+        # v GUI vlákne po uložení na pozadí: prevezme zlúčený stav, ale záznamy, ktoré
+        # sa v GUI medzitým zmenili, pribudli alebo sa zmazali, ostanú podľa GUI
+        ids, copies = sent
+        for key, value in merged.items():
+            if key not in COLLECTIONS:
+                data[key] = value
+        for name in COLLECTIONS:
+            live = {record.get("id"): record for record in data.get(name, [])}
+            result = []
+            for record in merged.get(name, []):
+                record_id = record.get("id")
+                our = live.pop(record_id, None)
+                if our is None:
+                    if record_id not in ids[name]:
+                        result.append(record)
+                    continue
+                result.append(our if self._touched(our, copies[name]) else record)
+            result.extend(our for record_id, our in live.items() if record_id not in ids[name])
+            data[name] = result
+
+    @staticmethod
+    def _touched(record, sent):
+        # zmenené v GUI po snapshot()
+        previous = sent.get(record.get("id"))
+        if previous is not None:
+            return record != previous
+        return not isinstance(record, TrackedRecord) or record.changed()
+
+    def save(self, data, changed=None):
+        # vráti (konflikty, premenované ID); data sa aktualizujú na zlúčený stav.
+        # changed – {kolekcia: ID zmenených} zo snapshot(), inak sa zmeny zistia tu
+        if changed is None:
+            is_changed = self._changed
+        else:
+            def is_changed(name, record):
+                return record.get("id") in changed[name]
+        conflicts = []
+        renamed = {}
+        with FileLock(self.lock_path):
+            disk = self._read()
+            merged = {k: v for k, v in disk.items() if k not in COLLECTIONS}
+            for key, value in data.items():
+                if key not in COLLECTIONS:
+                    merged[key] = value
+
+            for name in COLLECTIONS:
+                ours = {record.get("id"): record for record in data.get(name, [])}
+                theirs = {record.get("id"): record for record in disk.get(name, [])}
+                ref = REFERENCES.get(name)
+                result = []
+
+                for record_id, their in theirs.items():
+                    our = ours.get(record_id)
+                    base = self._base.get((name, record_id))
+                    their_rev = their.get("rev", 0)
+
+                    if our is None and base is not None:
+                        # u nás vymazané
+                        if their_rev != base[0]:
+                            conflicts.append((name, record_id, "vymazané lokálne, upravené iným používateľom", None))
+                            result.append(their)
+                        continue
+                    if our is None or not is_changed(name, our):
+                        result.append(their)
+                        continue
+                    if base is None:
+                        # obaja vytvorili záznam s rovnakým ID – náš sa prečísluje nižšie
+                        result.append(their)
+                        continue
+                    if their_rev == base[0]:
+                        our["rev"] = their_rev + 1
+                        result.append(our)
+                        continue
+                    record, clashes = self._merge(base[2], our, their)
+                    if clashes:
+                        # ostatné naše zmeny sa zapíšu, v sporných poliach zostáva ich verzia
+                        fields = ", ".join(sorted(clashes))
+                        conflicts.append((name, record_id, f"upravené aj iným používateľom ({fields})", our))
+                    if record != their:
+                        record["rev"] = their_rev + 1
+                    result.append(record)
+
+                taken = set(theirs)
+                for record_id, our in ours.items():
+                    if ref and renamed.get(our.get(ref[0])):
+                        our[ref[0]] = renamed[our[ref[0]]]
+                    base = self._base.get((name, record_id))
+                    if base is not None:
+                        if record_id not in theirs and is_changed(name, our):
+                            conflicts.append((name, record_id, "upravené lokálne, vymazané iným používateľom", our))
+                        continue
+                    if record_id in theirs:
+                        prefix = re.match(r"[A-Za-z]*", record_id or "").group(0)
+                        new_id = _free_id(prefix, taken)
+                        renamed[record_id] = new_id
+                        our["id"] = new_id
+                    our["rev"] = 1
+                    taken.add(our["id"])
+                    result.append(our)
+
+                merged[name] = result
+
+            save_data(merged, self.path)
+            if conflicts:
+                self._store_conflicts(conflicts)
+            data.clear()
+            data.update(self._read())
+            self._remember(data)
+        return conflicts, renamed
+
+    @staticmethod
+    def _merge(base, our, their):
+        # trojcestné zlúčenie po poliach: konflikt je len vtedy, keď obe strany
+        # zmenili to isté pole na rôzne hodnoty
+        ours = _field_values(our)
+        theirs = _field_values(their)
+        record = dict(their)
+        clashes = []
+        for key in ours.keys() | theirs.keys() | base.keys():
+            old, mine, other = base.get(key), ours.get(key), theirs.get(key)
+            if mine == old or mine == other:
+                continue
+            if other != old:
+                clashes.append(key)
+            elif key in our:
+                record[key] = our[key]
+            else:
+                record.pop(key, None)
+        return record, clashes
+
+    def _store_conflicts(self, conflicts):
+        # lokálne verzie, ktoré sa nepodarilo zapísať, aby sa práca nestratila
+        try:
+            with open(self.conflicts_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = []
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for name, record_id, reason, record in conflicts:
+            stored.append({"time": now, "collection": name, "id": record_id, "reason": reason, "local": record})
+        with open(self.conflicts_path, "w", encoding="utf-8") as f:
+            json.dump(stored, f, ensure_ascii=False, indent=4)
+
+
+# ===== CACHE EXPORTOV =====
+# Vyrenderované fragmenty jednotlivých záznamov sa ukladajú vedľa exportov
+# (qa_export.cache.json) podľa hash-u obsahu záznamu. Pri ďalšom exporte sa
+# znovu renderujú iba nové a zmenené TC a bugy.
+EXPORT_CACHE_FILE = "qa_export.cache.json"
+EXPORT_CACHE_VERSION = 2
+
+
+def record_hash(record):
+    raw = json.dumps(record, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+
+class ExportCache:
+    def __init__(self, path=EXPORT_CACHE_FILE, variant=""):
+        # variant – export iného stavu (k dátumu, z archívu, rozdiel) má vlastnú časť
+        # manifestu, aby nevytláčal fragmenty bežného exportu
+        self.path = path
+        self.variant = variant
+        self.hits = 0
+        self.misses = 0
+        self._old = {}
+        self._new = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == EXPORT_CACHE_VERSION:
+                self._old = manifest.get("formats", {})
+        except (OSError, ValueError):
+            pass
+
+    def fragment(self, fmt, kind, record, render, version=""):
+        # version – napr. odtlačok šablóny; pri jej zmene sa fragmenty vyrenderujú znova
+        key = f"{kind}:{record['id']}"
+        digest = record_hash(record) + version
+        if self.variant:
+            fmt = f"{fmt}@{self.variant}"
+        entry = self._old.get(fmt, {}).get(key)
+        if entry is not None and entry[0] == digest:
+            fragment = entry[1]
+            self.hits += 1
+        else:
+            fragment = render(record)
+            self.misses += 1
+        self._new.setdefault(fmt, {})[key] = [digest, fragment]
+        return fragment
+
+    def summary(self):
+        return f"Znovu vyrenderované: {self.misses}, z cache: {self.hits}"
+
+    def save(self):
+        # formáty (a varianty), ktoré sa teraz neexportovali, ostávajú v manifeste bez zmeny
+        formats = dict(self._old)
+        formats.update(self._new)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": EXPORT_CACHE_VERSION, "formats": formats}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+# ===== HISTÓRIA ZMIEN =====
+# Vedľa dátového súboru sa vedie append-only log (qa_data_gui.json.history.jsonl).
+# Pri každom uložení sa doň zapíšu len zmenené polia zmenených záznamov, každá
+# HISTORY_KEYFRAME_EVERY-tá verzia záznamu je celá (keyframe), takže rekonštrukcia
+# ľubovoľnej verzie prečíta najviac pár riadkov. Z logu sa dá poskladať stav
+# databázy k zvolenému času (napr. pre export stavu k vydaniu).
+HISTORY_SUFFIX = ".history.jsonl"
+HISTORY_KEYFRAME_EVERY = 16
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIME_INPUT_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+def history_path(path):
+    return path + HISTORY_SUFFIX
+
+
+def parse_timestamp(text):
+    text = (text or "").strip()
+    for fmt in TIME_INPUT_FORMATS:
+        try:
+            moment = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if fmt == "%Y-%m-%d":
+            moment = moment.replace(hour=23, minute=59, second=59)  # celý deň
+        return moment.strftime(TIME_FORMAT)
+    raise ValueError("Čas musí byť v tvare RRRR-MM-DD alebo RRRR-MM-DD HH:MM.")
+
+
+def _record_delta(old, new):
+    changed = {key: value for key, value in new.items() if key not in old or old[key] != value}
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+class RecordHistory:
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}  # (kolekcia, id) -> [(čas, offset, dĺžka, keyframe)]
+        self.state = {}  # (kolekcia, id) -> (hash, rev, počet delta od keyframu, zmazaný)
+        self._torn = None  # koniec platných riadkov, ak za ním zostal nedopísaný riadok
+        self._imported = False  # prvý commit (pôvodné záznamy bez histórie) už prebehol
+        self._lock = threading.RLock()  # commit beží v úlohe ukladania, čítanie z GUI
+        self._scan()
+
+    def _scan(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._index(entry, offset, len(line))
+                offset += len(line)
+            end = f.seek(0, os.SEEK_END)
+        if offset != end:
+            self._torn = offset  # nedopísaný riadok po páde – odreže sa až pri zápise
+
+    def _index(self, entry, offset, length):
+        key = (entry["collection"], entry["id"])
+        keyframe = "record" in entry
+        self.entries.setdefault(key, []).append((entry["time"], offset, length, keyframe))
+        old = self.state.get(key)
+        since = 0 if keyframe or old is None else old[2] + 1
+        self.state[key] = (entry.get("hash"), entry.get("rev"), since, entry["op"] == "delete")
+
+    def _replay(self, f, spans):
+        record = None
+        start = 0
+        for i, span in enumerate(spans):
+            if span[3]:
+                start = i
+        for _, offset, length, _ in spans[start:]:
+            f.seek(offset)
+            entry = json.loads(f.read(length))
+            if entry["op"] == "delete":
+                record = None
+            elif "record" in entry:
+                record = entry["record"]
+            elif record is not None:
+                record.update(entry["changed"])
+                for key in entry.get("removed", ()):
+                    record.pop(key, None)
+        return record
+
+    def version(self, name, record_id, when=None):
+        # záznam tak, ako vyzeral v čase when (None = posledná verzia)
+        spans = self.entries.get((name, record_id))
+        if not spans:
+            return None
+        if when is not None:
+            spans = [span for span in spans if span[0] <= when]
+        with self._lock, open(self.path, "rb") as f:
+            return self._replay(f, spans)
+
+    def revisions(self, name, record_id):
+        with self._lock:
+            return [span[0] for span in self.entries.get((name, record_id), ())]
+
+    def as_of(self, when):
+        # stav celej databázy v čase when, bez dotyku aktuálnych dát
+        data = empty_data()
+        if not self.entries:
+            return data
+        with self._lock, open(self.path, "rb") as f:
+            for (name, _), spans in self.entries.items():
+                spans = [span for span in spans if span[0] <= when]
+                record = self._replay(f, spans) if spans else None
+                if record is not None:
+                    data[name].append(record)
+        return data
+
+    def commit(self, data):
+        # zapíše zmeny od posledného volania, vráti počet nových záznamov v logu
+        with self._lock:
+            return self._commit(data)
+
+    def _commit(self, data):
+        now = datetime.now().strftime(TIME_FORMAT)
+        fresh = not self.entries and not self._imported
+        self._imported = True
+        entries = []
+        seen = set()
+        for name in COLLECTIONS:
+            for record in data[name]:
+                if not isinstance(record, dict) or not isinstance(record.get("id"), str):
+                    continue  # poškodený záznam sa do histórie dostane až po oprave (kontrola integrity)
+                key = (name, record["id"])
+                seen.add(key)
+                state = self.state.get(key)
+                alive = state is not None and not state[3]
+                if (alive and isinstance(record, LazyRecord) and not record.loaded
+                        and state[1] == record.get("rev")):
+                    continue  # nenačítaný záznam sa lokálne zmeniť nemohol
+                full = record.peek() if isinstance(record, LazyRecord) else record
+                digest = record_hash(full)
+                if alive and state[0] == digest:
+                    continue
+                entry = {"time": now, "collection": name, "id": record["id"], "op": "edit",
+                         "hash": digest, "rev": full.get("rev")}
+                if not alive:
+                    entry["op"] = "create"
+                    if fresh:
+                        # prvý zápis histórie – pôvodné záznamy dostanú čas vytvorenia
+                        # (bez neho "" = existovali odjakživa); nové záznamy majú čas uloženia
+                        entry["time"] = full.get("created_at") or ""
+                if not alive or state[2] + 1 >= HISTORY_KEYFRAME_EVERY:
+                    entry["record"] = dict(full)
+                else:
+                    entry["changed"], entry["removed"] = _record_delta(self.version(name, record["id"]), full)
+                entries.append(entry)
+        for key, state in self.state.items():
+            if key not in seen and not state[3]:
+                entries.append({"time": now, "collection": key[0], "id": key[1], "op": "delete"})
+        if entries:
+            self._append(entries)
+        return len(entries)
+
+    def _append(self, entries):
+        with open(self.path, "ab") as f:
+            if self._torn is not None:
+                f.truncate(self._torn)  # nedopísaný riadok po páde aplikácie
+                self._torn = None
+            offset = f.seek(0, os.SEEK_END)
+            for entry in entries:
+                line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                f.write(line)
+                self._index(entry, offset, len(line))
+                offset += len(line)
+
+
+# ===== ARCHÍV =====
+# Uzavreté TS (všetky ich TC prešli) sa dajú spolu s TC a bugmi presunúť do
+# komprimovaného segmentu v qa_archive/. Segmenty sa už nemenia (súbor je len na
+# čítanie), manifest drží ID a názvy všetkých archivovaných záznamov, takže
+# hľadanie v archíve nemusí segmenty rozbaľovať. Reset databázy robí to isté
+# s celou databázou namiesto mazania súboru.
+ARCHIVE_DIR = "qa_archive"
+ARCHIVE_MANIFEST = "manifest.json"
+ARCHIVE_FORMAT = 1
+ARCHIVE_CACHE_SIZE = 2
+ID_PREFIXES = {"test_scenarios": "TS", "test_cases": "TC", "bug_reports": "BUG"}
+
+
+def closed_scenarios(data, links):
+    closed = []
+    for ts in data["test_scenarios"]:
+        children = [links.record(name, record_id) for name, record_id in links.linked("test_scenarios", ts["id"])]
+        if children and all(tc is not None and tc["status"] == "PASSED" for tc in children):
+            closed.append(ts["id"])
+    return closed
+
+
+def split_archive(data, ts_ids, links):
+    # vyberie TS, ich TC a bugy k týmto TC zo živých dát a vráti ich ako samostatné dáta
+    chosen = {name: set() for name in COLLECTIONS}
+    for ts_id in ts_ids:
+        chosen["test_scenarios"].add(ts_id)
+        for _, tc_id in links.linked("test_scenarios", ts_id):
+            chosen["test_cases"].add(tc_id)
+            for _, bug_id in links.linked("test_cases", tc_id):
+                chosen["bug_reports"].add(bug_id)
+
+    moved = empty_data()
+    for name in COLLECTIONS:
+        keep = []
+        for record in data[name]:
+            if record["id"] in chosen[name]:
+                moved[name].append(record.copy())
+            else:
+                keep.append(record)
+        data[name] = keep
+        for record_id in chosen[name]:
+            links.removed(name, record_id)
+    return moved
+
+
+def restore_archive(data, archived, links):
+    # vráti archivované záznamy do živých dát; obsadené ID sa premenujú
+    # (aj s odkazmi medzi obnovenými záznamami), vráti {staré ID: nové ID}
+    renamed = {}
+    for name in COLLECTIONS:
+        taken = {record["id"] for record in data[name]}
+        reference = REFERENCES.get(name)
+        for record in archived[name]:
+            record = dict(record)
+            if reference is not None:
+                field, target = reference
+                old_target = record.get(field)
+                if old_target and (target, old_target) in renamed:
+                    record[field] = renamed[(target, old_target)]
+            if record["id"] in taken:
+                new_id = generate_id(ID_PREFIXES[name], data[name], links.reserved)
+                renamed[(name, record["id"])] = new_id
+                record["id"] = new_id
+            taken.add(record["id"])
+            data[name].append(record)
+            links.added(name, record)
+    return {old_id: new_id for (_, old_id), new_id in renamed.items()}
+
+
+def issued_ids(history, archive):
+    # ID, ktoré už niekedy existovali – v histórii (aj zmazané) a v archívnych segmentoch
+    ids = [record_id for _, record_id in history.entries]
+    ids.extend(record_id for segment in archive.segments for _, record_id, _ in segment["records"])
+    return ids
+
+
+class ArchiveStore:
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, ARCHIVE_MANIFEST)
+        # [{"file", "label", "created_at", "counts", "records": [[kolekcia, id, názov]], "restored_at"?}]
+        self.segments = []
+        self._cache = OrderedDict()
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") == ARCHIVE_FORMAT:
+                self.segments = manifest.get("segments", [])
+        except (OSError, ValueError):
+            pass
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": ARCHIVE_FORMAT, "segments": self.segments}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def add(self, data, label):
+        os.makedirs(self.directory, exist_ok=True)
+        created_at = datetime.now().strftime(TIME_FORMAT)
+        stem = "segment-" + datetime.now().strftime("%Y%m%d-%H%M%S")
+        file_name = stem + ".json.gz"
+        number = 1
+        while os.path.exists(os.path.join(self.directory, file_name)):
+            number += 1
+            file_name = f"{stem}-{number}.json.gz"
+
+        path = os.path.join(self.directory, file_name)
+        payload = {"format": ARCHIVE_FORMAT, "label": label, "created_at": created_at, "data": data}
+        with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+        os.chmod(path, 0o444)  # segment sa už nemení
+
+        segment = {
+            "file": file_name,
+            "label": label,
+            "created_at": created_at,
+            "counts": {name: len(data[name]) for name in COLLECTIONS},
+            "records": [[name, r["id"], r.get("title", "")] for name in COLLECTIONS for r in data[name]],
+        }
+        self.segments.append(segment)
+        self._save_manifest()
+        return segment
+
+    def mark_restored(self, segment):
+        # obnovený segment ostáva v archíve, ale druhýkrát sa už obnoviť nedá
+        segment["restored_at"] = datetime.now().strftime(TIME_FORMAT)
+        self._save_manifest()
+
+    def load(self, segment):
+        data = self._cache.get(segment["file"])
+        if data is None:
+            with gzip.open(os.path.join(self.directory, segment["file"]), "rt", encoding="utf-8") as f:
+                data = json.load(f)["data"]
+            self._cache[segment["file"]] = data
+            if len(self._cache) > ARCHIVE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(segment["file"])
+        return data
+
+    def search(self, text):
+        # [(segment, kolekcia, id, názov)] – prehľadáva len manifest
+        words = text.lower().split()
+        result = []
+        for segment in self.segments:
+            for name, record_id, title in segment["records"]:
+                haystack = f"{record_id} {title}".lower()
+                if all(word in haystack for word in words):
+                    result.append((segment, name, record_id, title))
+        return result
+
+
+# ===== IMPORT VÝSLEDKOV Z JUNIT / XUNIT XML =====
+# Súbor sa číta prúdovo (iterparse) a každý spracovaný <testcase> sa hneď
+# zahodí, takže aj 100 MB výsledkov zaberie v pamäti len jeden test naraz.
+# Test sa s TC spáruje podľa ID v názve (napr. test_TC0012_login) alebo podľa
+# zhodného názvu TC. Uloží sa až raz na konci.
+JUNIT_MESSAGE_LIMIT = 2000
+JUNIT_UNMATCHED_SHOWN = 20
+_JUNIT_TC_ID = re.compile(r"(?<![A-Za-z0-9])TC0*(\d+)(?!\d)", re.I)
+
+
+def _junit_key(text):
+    return " ".join((text or "").lower().split())
+
+
+def _junit_outcome(testcase):
+    # (stav, skutočný výsledok) podľa potomkov <failure>, <error>, <skipped>
+    for child in testcase:
+        tag = child.tag.rsplit("}", 1)[-1]
+        if tag in ("failure", "error", "skipped"):
+            message = child.get("message") or ""
+            text = (child.text or "").strip()
+            actual = "\n".join(part for part in (message, text) if part)[:JUNIT_MESSAGE_LIMIT]
+            if tag == "skipped":
+                return "NOT RUN", actual or "Test bol preskočený."
+            return "FAILED", actual or f"Automatický test skončil stavom {tag}."
+    duration = testcase.get("time")
+    return "PASSED", f"Automatický test prešiel ({duration} s)." if duration else "Automatický test prešiel."
+
+
+def import_junit(data, source, links=None, create_bugs=False):
+    # source: cesta alebo otvorený súbor; vráti súhrn importu. Chyba čítania súboru
+    # import nezruší – už spracované testy ostávajú a chyba je v súhrne ("error")
+    links = links if links is not None else LinkGraph(data)
+    by_number = {}
+    by_title = {}
+    for tc in data["test_cases"]:
+        match = re.fullmatch(r"TC(\d+)", tc["id"])
+        if match:
+            by_number.setdefault(int(match.group(1)), tc["id"])
+        by_title.setdefault(_junit_key(tc["title"]), tc["id"])
+
+    result = {"testcases": 0, "updated": 0, "bugs": [], "unmatched": 0, "unmatched_names": [],
+              "failed": 0, "failed_names": [], "error": None}
+    try:
+        _import_junit_tests(data, source, links, create_bugs, result, by_number, by_title)
+    except (OSError, ET.ParseError) as e:
+        result["error"] = str(e)
+    return result
+
+
+def _import_junit_tests(data, source, links, create_bugs, result, by_number, by_title):
+    stack = []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag.rsplit("}", 1)[-1] != "testcase":
+            continue
+
+        result["testcases"] += 1
+        name = elem.get("name") or ""
+        classname = elem.get("classname") or ""
+        tc_id = None
+        for text in (name, classname):
+            match = _JUNIT_TC_ID.search(text)
+            if match and int(match.group(1)) in by_number:
+                tc_id = by_number[int(match.group(1))]
+                break
+        if tc_id is None:
+            tc_id = by_title.get(_junit_key(name)) or by_title.get(_junit_key(f"{classname}.{name}"))
+
+        if tc_id is None:
+            result["unmatched"] += 1
+            if len(result["unmatched_names"]) < JUNIT_UNMATCHED_SHOWN:
+                result["unmatched_names"].append(f"{classname}.{name}" if classname else name)
+        else:
+            status, actual = _junit_outcome(elem)
+            # len výsledok – edit_tc by znova kontroloval aj názov a kroky starších TC
+            tc = _get_record(data, "test_cases", tc_id, links)
+            tc["status"] = status
+            tc["actual"] = actual
+            result["updated"] += 1
+            if create_bugs and status == "FAILED":
+                title = f"{name} zlyhal"
+                existing = (links.record(kind, bug_id) for kind, bug_id in links.linked("test_cases", tc_id))
+                if not any(bug and bug["title"] == title for bug in existing):
+                    try:
+                        bug = create_bug(
+                            data,
+                            title=title,
+                            steps=clean_steps(tc.get("steps")) or [f"Spustiť automatický test {classname}.{name}"],
+                            related_tc=tc_id,
+                            expected=tc.get("expected") or "",
+                            actual=actual,
+                            note="Vytvorené importom JUnit výsledkov.",
+                            links=links,
+                        )
+                        result["bugs"].append(bug)
+                    except ValueError as e:
+                        result["failed"] += 1
+                        if len(result["failed_names"]) < JUNIT_UNMATCHED_SHOWN:
+                            result["failed_names"].append(f"{tc_id}: {e}")
+
+        # spracovaný test sa uvoľní, aby pamäť nerástla s veľkosťou súboru
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+def junit_summary(result):
+    lines = [
+        f"Testov v súbore: {result['testcases']}",
+        f"Aktualizované TC: {result['updated']}",
+        f"Nové bugy: {len(result['bugs'])}",
+        f"Nespárované testy: {result['unmatched']}",
+    ]
+    if result["failed"]:
+        lines.append(f"Bugy, ktoré sa nepodarilo vytvoriť: {result['failed']}")
+    if result["error"]:
+        lines.append(f"Súbor sa nepodarilo dočítať: {result['error']}")
+    for names, count in ((result["unmatched_names"], result["unmatched"]),
+                         (result["failed_names"], result["failed"])):
+        if names:
+            lines.append("")
+            lines.extend(names)
+            if count > len(names):
+                lines.append("…")
+    return "\n".join(lines)
+
+
+# ===== KONTROLA INTEGRITY =====
+# Jeden prechod dátami v poradí TS → TC → bug: schéma polí, jedinečnosť ID
+# a odkazy (TS a TC, na ktoré sa odkazuje, sú v tej chvíli už prejdené).
+# Lazy záznamy sa čítajú cez peek(), kontrola teda nenačíta celú databázu do
+# pamäte. Existencia screenshotov sa overuje paralelne a s časovým limitom
+# (sieťové disky). Výsledkom je plán opráv, ktorý sa použije celý alebo vôbec.
+INTEGRITY_WORKERS = 8
+INTEGRITY_FILE_TIMEOUT = 10.0
+INTEGRITY_SHOWN = 200  # toľko problémov sa vypíše, ostatné sa len spočítajú
+
+# pole -> hodnota, ktorou sa doplní chýbajúce alebo poškodené pole (None pri "id" = nové ID)
+RECORD_FIELDS = {
+    "test_scenarios": {"id": None, "title": "", "description": ""},
+    "test_cases": {"id": None, "title": "", "preconditions": "", "ts_id": None, "steps": [],
+                   "expected": "", "actual": "", "status": "NOT RUN"},
+    "bug_reports": {"id": None, "title": "", "related_tc": "", "steps": [], "expected": "", "actual": "",
+                    "severity": "Medium", "note": "", "screenshot": None, "created_at": ""},
+}
+NULLABLE_FIELDS = {"ts_id", "screenshot"}
+FIELD_CHOICES = {"status": TC_STATUSES, "severity": SEVERITIES}
+
+
+class IntegrityReport:
+    def __init__(self):
+        self.issues = []  # (kolekcia, id, pole, popis) – prvých INTEGRITY_SHOWN
+        self.count = 0
+        self.checked = 0
+        self.plan = {}  # (kolekcia, pozícia) -> (záznam, {pole: nová hodnota}) alebo (záznam, None) = vyhodiť
+        self.collections = []  # kolekcie, ktoré treba nahradiť prázdnym zoznamom
+
+    def problem(self, name, record_id, field, text):
+        self.count += 1
+        if len(self.issues) < INTEGRITY_SHOWN:
+            self.issues.append((name, record_id, field, text))
+
+    def fix(self, name, position, record, field, value):
+        changes = self.plan.setdefault((name, position), (record, {}))[1]
+        changes[field] = value
+
+    def drop(self, name, position, record):
+        self.plan[(name, position)] = (record, None)
+
+    @property
+    def fixable(self):
+        return bool(self.plan or self.collections)
+
+
+def _check_field(field, value, default):
+    # vráti (popis problému, opravená hodnota) alebo None, ak je pole v poriadku
+    if isinstance(default, list):
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return None
+        return "nie je zoznam textov", clean_steps(value) if isinstance(value, (str, list)) else []
+    if value is None:
+        if field in NULLABLE_FIELDS:
+            return None
+        return "je prázdne (null)", default
+    if not isinstance(value, str):
+        return f"nie je text ({type(value).__name__})", str(value)
+    choices = FIELD_CHOICES.get(field)
+    if choices and value not in choices:
+        fixed = next((choice for choice in choices if choice.lower() == value.strip().lower()), default)
+        return f"neplatná hodnota '{value}'", fixed
+    return None
+
+
+def _missing_files(paths, workers=INTEGRITY_WORKERS, timeout=INTEGRITY_FILE_TIMEOUT):
+    # vráti (chýbajúce, neoverené v časovom limite)
+    if not paths:
+        return set(), set()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="integrity")
+    futures = {executor.submit(os.path.exists, path): path for path in paths}
+    done, not_done = wait_futures(futures, timeout=timeout)
+    executor.shutdown(wait=False, cancel_futures=True)
+    missing = {futures[future] for future in done if future.exception() is not None or not future.result()}
+    return missing, {futures[future] for future in not_done}
+
+
+def check_integrity(data, check_files=True, progress=None):
+    report = IntegrityReport()
+    seen = {name: set() for name in COLLECTIONS}
+    renames = []
+    attachments = {}  # cesta -> [id bugov]
+    done = 0
+
+    for name in COLLECTIONS:
+        records = data.get(name)
+        if not isinstance(records, list):
+            report.problem(name, None, None, "kolekcia chýba" if records is None else "kolekcia nie je zoznam")
+            report.collections.append(name)
+            continue
+        fields = RECORD_FIELDS[name]
+        reference = REFERENCES.get(name)
+        ids = seen[name]
+        for position, record in enumerate(records):
+            if progress and done % JOB_PROGRESS_EVERY == 0:
+                progress(done)
+            done += 1
+            if not isinstance(record, dict):
+                report.problem(name, None, None, f"záznam č. {position + 1} nie je objekt")
+                report.drop(name, position, record)
+                continue
+            full = record.peek() if isinstance(record, LazyRecord) else record
+
+            record_id = full.get("id")
+            if not isinstance(record_id, str) or not record_id:
+                report.problem(name, None, "id", f"záznam č. {position + 1} nemá ID")
+                renames.append((name, position, record))
+                record_id = None
+            elif record_id in ids:
+                report.problem(name, record_id, "id", "duplicitné ID")
+                renames.append((name, position, record))
+            else:
+                ids.add(record_id)
+
+            for field, default in fields.items():
+                if field == "id":
+                    continue
+                if field not in full:
+                    report.problem(name, record_id, field, "pole chýba")
+                    report.fix(name, position, record, field, list(default) if isinstance(default, list) else default)
+                    continue
+                wrong = _check_field(field, full[field], default)
+                if wrong is not None:
+                    report.problem(name, record_id, field, wrong[0])
+                    report.fix(name, position, record, field, wrong[1])
+
+            if reference:
+                field, target = reference
+                changes = report.plan.get((name, position), (None, {}))[1] or {}
+                value = changes.get(field, full.get(field))
+                if isinstance(value, str) and value and value not in seen[target]:
+                    report.problem(name, record_id, field, f"odkaz na neexistujúci {value}")
+                    report.fix(name, position, record, field, EMPTY_REFERENCE[name])
+
+            screenshot = full.get("screenshot")
+            if check_files and isinstance(screenshot, str) and screenshot:
+                attachments.setdefault(screenshot, []).append(record_id)
+        report.checked += len(records)
+
+    # nové ID až po prechode – až vtedy je známe najvyššie použité číslo
+    numbers = {}
+    for name, position, record in renames:
+        prefix = ID_PREFIXES[name]
+        if name not in numbers:
+            numbers[name] = int(_free_id(prefix, seen[name])[len(prefix):])
+        report.fix(name, position, record, "id", f"{prefix}{numbers[name]:02d}")
+        numbers[name] += 1
+
+    if attachments:
+        missing, unknown = _missing_files(attachments)
+        for path in sorted(missing):
+            for record_id in attachments[path]:
+                report.problem("bug_reports", record_id, "screenshot", f"súbor {path} neexistuje")
+        for path in sorted(unknown):
+            for record_id in attachments[path]:
+                report.problem("bug_reports", record_id, "screenshot", f"súbor {path} sa nepodarilo overiť")
+    return report
+
+
+def apply_repair(data, report):
+    # nový stav sa pripraví bokom; do dát sa zapíše, až keď sedí každá položka plánu
+    lists = {name: [] for name in report.collections}
+    for (name, position), (record, changes) in report.plan.items():
+        if name in report.collections:
+            continue
+        records = data[name]
+        if position >= len(records) or records[position] is not record:
+            raise ValueError("Dáta sa od kontroly zmenili, spusti kontrolu znova.")
+        if name not in lists:
+            lists[name] = list(records)
+        fixed = lists[name]
+        if changes is None:
+            fixed[position] = None
+        else:
+            repaired = record.copy()
+            repaired.update(changes)
+            fixed[position] = repaired
+    for name, records in lists.items():
+        data[name] = [record for record in records if record is not None]
+    return len(report.plan) + len(report.collections)
+
+
+def integrity_summary(report):
+    lines = [f"Skontrolované záznamy: {report.checked}", f"Nájdené problémy: {report.count}"]
+    if report.issues:
+        lines.append("")
+    for name, record_id, field, text in report.issues:
+        where = record_id or QUICK_OPEN_KINDS[name]
+        lines.append(f"{where}: {field}: {text}" if field else f"{where}: {text}")
+    if report.count > len(report.issues):
+        lines.append("…")
+    return "\n".join(lines)
+
+
+# ===== POROVNANIE DÁT =====
+# Dve verzie databázy (napr. snapshot pred vydaním a aktuálny stav) sa spoja
+# podľa ID cez slovník – jeden prechod starými a jeden novými dátami. Lazy
+# záznamy z dvoch súborov sa najprv porovnajú ako surové bajty, dekódujú sa
+# len tie, ktoré sa líšia. Výsledok sa dá zobraziť aj vyexportovať bežnými
+# exportmi: zmenené polia majú hodnotu "staré → nové".
+DIFF_SHOWN = 500  # riadkov na kategóriu v súhrne
+DIFF_IGNORED_FIELDS = {"rev"}
+DIFF_MARKS = {"added": "NOVÝ", "removed": "ZMAZANÝ", "changed": "ZMENENÝ"}
+
+
+class DatasetDiff:
+    def __init__(self):
+        self.added = {name: [] for name in COLLECTIONS}  # záznamy z nových dát
+        self.removed = {name: [] for name in COLLECTIONS}  # záznamy zo starých dát
+        self.changed = {name: [] for name in COLLECTIONS}  # (starý, nový, [zmenené polia])
+        self.unchanged = {name: 0 for name in COLLECTIONS}
+
+    def status_changed(self):
+        return [(old, new) for old, new, fields in self.changed["test_cases"] if "status" in fields]
+
+    @property
+    def empty(self):
+        return not any(self.added[name] or self.removed[name] or self.changed[name] for name in COLLECTIONS)
+
+
+def _diff_raw(record):
+    if isinstance(record, LazyRecord):
+        with _source_lock:
+            if not record.loaded:
+                return record._source.raw(record._offset, record._length)
+    return None
+
+
+def _diff_full(record):
+    return dict(record.peek() if isinstance(record, LazyRecord) else record)
+
+
+def diff_datasets(old, new, progress=None):
+    diff = DatasetDiff()
+    done = 0
+    for name in COLLECTIONS:
+        before = {record.get("id"): record for record in old.get(name, [])}
+        for record in new.get(name, []):
+            if progress and done % JOB_PROGRESS_EVERY == 0:
+                progress(done)
+            done += 1
+            previous = before.pop(record.get("id"), None)
+            if previous is None:
+                diff.added[name].append(_diff_full(record))
+                continue
+            raw = _diff_raw(record)
+            if raw is not None and raw == _diff_raw(previous):
+                diff.unchanged[name] += 1
+                continue
+            a, b = _diff_full(previous), _diff_full(record)
+            fields = [key for key in dict.fromkeys([*a, *b])
+                      if key not in DIFF_IGNORED_FIELDS and a.get(key) != b.get(key)]
+            if fields:
+                diff.changed[name].append((a, b, fields))
+            else:
+                diff.unchanged[name] += 1
+        diff.removed[name] = [_diff_full(record) for record in before.values()]
+    return diff
+
+
+def _diff_value(old, new):
+    if isinstance(old, list) and isinstance(new, list):
+        lines = []
+        matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op == "equal":
+                lines.extend(old[i1:i2])
+                continue
+            lines.extend(f"− {item}" for item in old[i1:i2])
+            lines.extend(f"+ {item}" for item in new[j1:j2])
+        return lines
+    return f"{'—' if old in (None, '') else old} → {'—' if new in (None, '') else new}"
+
+
+def diff_report_data(diff):
+    # dáta pre bežné exporty: len nové, zmenené a zmazané záznamy, označené v názve
+    data = empty_data()
+    for name in COLLECTIONS:
+        for record in diff.added[name]:
+            data[name].append(dict(record, title=f"[{DIFF_MARKS['added']}] {record.get('title', '')}"))
+        for old, new, fields in diff.changed[name]:
+            record = dict(new)
+            for field in fields:
+                if field not in ("id", "screenshot"):
+                    record[field] = _diff_value(old.get(field), new.get(field))
+            record["title"] = f"[{DIFF_MARKS['changed']}] {record.get('title', '')}"
+            data[name].append(record)
+        for record in diff.removed[name]:
+            data[name].append(dict(record, title=f"[{DIFF_MARKS['removed']}] {record.get('title', '')}"))
+    return data
+
+
+def diff_summary(diff, limit=DIFF_SHOWN):
+    lines = []
+    for name in COLLECTIONS:
+        kind = QUICK_OPEN_KINDS[name]
+        lines.append(
+            f"{kind}: nové {len(diff.added[name])}, zmazané {len(diff.removed[name])}, "
+            f"zmenené {len(diff.changed[name])}, bez zmeny {diff.unchanged[name]}"
+        )
+    sections = [("Zmenený stav TC", [f"{new['id']}: {old.get('status')} → {new.get('status')}"
+                                     for old, new in diff.status_changed()])]
+    for name in COLLECTIONS:
+        kind = QUICK_OPEN_KINDS[name]
+        sections.append((f"Nové {kind}", [f"{r.get('id')} – {r.get('title', '')}" for r in diff.added[name]]))
+        sections.append((f"Zmazané {kind}", [f"{r.get('id')} – {r.get('title', '')}" for r in diff.removed[name]]))
+        sections.append((f"Zmenené {kind}", [f"{new.get('id')}: {', '.join(fields)}"
+                                            for _, new, fields in diff.changed[name]]))
+    for heading, rows in sections:
+        if not rows:
+            continue
+        lines.append("")
+        lines.append(f"{heading} ({len(rows)}):")
+        lines.extend(f"  {row}" for row in rows[:limit])
+        if len(rows) > limit:
+            lines.append("  …")
+    return "\n".join(lines)
+
+
+# ===== RÝCHLY WORD (DOCX) EXPORT =====
+# Tabuľky sa negenerujú cez python-docx bunku po bunke (to je pri tisícoch
+# riadkov veľmi pomalé), ale ako hotové WordprocessingML XML naraz.
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+EMU_PER_TWIP = 635
+_XML_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _docx_runs(text):
+    text = _XML_INVALID_CHARS.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+    parts = []
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            parts.append("<w:br/>")
+        for j, chunk in enumerate(line.split("\t")):
+            if j:
+                parts.append("<w:tab/>")
+            if chunk:
+                parts.append(f'<w:t xml:space="preserve">{xml_escape(chunk)}</w:t>')
+    return "".join(parts)
+
+
+def docx_row_xml(values, widths):
+    cells = []
+    for value, width in zip(values, widths):
+        runs = _docx_runs(value or "")
+        paragraph = f"<w:p><w:r>{runs}</w:r></w:p>" if runs else "<w:p/>"
+        cells.append(f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>{paragraph}</w:tc>')
+    return "<w:tr>" + "".join(cells) + "</w:tr>"
+
+
+def docx_table_xml(style_id, widths, headers, rows):
+    # rovnaká štruktúra ako doc.add_table() + table.style = "Table Grid"
+    grid = "".join(f'<w:gridCol w:w="{width}"/>' for width in widths)
+    return (
+        f'<w:tbl xmlns:w="{W_NAMESPACE}">'
+        "<w:tblPr>"
+        f'<w:tblStyle w:val="{style_id}"/>'
+        '<w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+        'w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+        "</w:tblPr>"
+        f"<w:tblGrid>{grid}</w:tblGrid>"
+        + docx_row_xml(headers, widths)
+        + "".join(rows)
+        + "</w:tbl>"
+    )
+
+
+# ===== ŠABLÓNY REPORTOV =====
+# Jednoduché šablóny pre HTML export: {{ tc.title }} vypíše hodnotu escapovanú,
+# {{ x|raw }} bez escapovania, {{ x|url }} ako cestu do src/href,
+# {% if tc.status == "FAILED" %}…{% elif … %}…{% else %}…{% endif %},
+# {% for step in tc.steps %}{{ loop.index }}. {{ step }}{% endfor %}.
+# Šablóna sa skladá z blokov {% block meno %}…{% endblock %} (head, section_start,
+# ts, tc, bug, section_end, foot). Každý blok sa raz preloží na Python funkciu
+# a skompilované šablóny sa držia v cache, kým sa súbor nezmení.
+HTML_TEMPLATE_FILE = "qa_export_template.html"
+TEMPLATE_BLOCKS = ("head", "section_start", "ts", "tc", "bug", "section_end", "foot")
+
+DEFAULT_HTML_TEMPLATE = """\
+{% block head %}<html><head><meta charset='utf-8'><title>QA Export</title><style>\
+body{font-family:Arial, sans-serif;}\
+h1,h2{color:#333;}\
+.section{margin-bottom:30px;}\
+.card{border:1px solid #ccc;padding:10px;margin:5px 0;}\
+.bug{border-color:#f00;}\
+table{border-collapse:collapse;width:100%;margin:5px 0;}\
+th,td{border:1px solid #ccc;padding:4px;font-size:12px;}\
+th{background:#f5f5f5;}\
+</style></head><body><h1>QA Export</h1><p>Vygenerované: {{ generated }}</p>{% endblock %}
+
+{% block section_start %}<div class='section'><h2>{{ heading }}</h2>{% endblock %}
+
+{% block ts %}<div class='card'><strong>{{ ts.id }}</strong> – {{ ts.title }}<br>\
+{% if ts.description %}<em>Popis:</em> {{ ts.description }}<br>{% endif %}</div>{% endblock %}
+
+{% block tc %}<div class='card'><strong>{{ tc.id }}</strong> – {{ tc.title }}<br>\
+<strong>TS:</strong> {{ tc.ts_id }}<br>\
+<strong>Predpoklady:</strong> {{ tc.preconditions }}<br>\
+<strong>Kroky:</strong><ol>{% for step in tc.steps %}<li>{{ step }}</li>{% endfor %}</ol>\
+<strong>Očakávaný:</strong> {{ tc.expected }}<br>\
+<strong>Skutočný:</strong> {{ tc.actual }}<br>\
+<strong>Stav:</strong> {{ tc.status }}<br></div>{% endblock %}
+
+{% block bug %}<div class='card bug'><strong>{{ bug.id }}</strong> – {{ bug.title }}<br>\
+<strong>Test Case:</strong> {{ bug.related_tc }}<br>\
+<strong>Severity:</strong> {{ bug.severity }}<br>\
+<strong>Vytvorené:</strong> {{ bug.created_at }}<br>\
+<strong>Kroky k reprodukcii:</strong><ol>{% for step in bug.steps %}<li>{{ step }}</li>{% endfor %}</ol>\
+<strong>Očakávaný:</strong> {{ bug.expected }}<br>\
+<strong>Skutočný:</strong> {{ bug.actual }}<br>\
+{% if bug.screenshot %}<strong>Screenshot:</strong><br>\
+<img src='{{ bug.screenshot|url }}' style='max-width:400px; max-height:300px; border:1px solid #ccc;'><br>{% endif %}\
+{% if bug.note %}<strong>Poznámka:</strong> {{ bug.note }}<br>{% endif %}</div>{% endblock %}
+
+{% block section_end %}</div>{% endblock %}
+
+{% block foot %}</body></html>{% endblock %}
+"""
+
+_TEMPLATE_TOKEN = re.compile(r"({{.*?}}|{%.*?%})", re.S)
+_TEMPLATE_PATH = re.compile(r"[A-Za-z_]\w*(?:\.\w+)*$")
+_TEMPLATE_CONDITION = re.compile(r"""(not\s+)?([\w.]+)(?:\s*(==|!=)\s*("[^"]*"|'[^']*'))?$""")
+_TEMPLATE_FILTERS = {"": "_escape({})", "raw": "_text({})", "url": "_escape(_url({}))",
+                     "upper": "_escape(_text({}).upper())", "lower": "_escape(_text({}).lower())"}
+_template_cache = {}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def _template_text(value):
+    return "" if value is None else str(value)
+
+
+def _template_escape(value):
+    return html.escape(_template_text(value), quote=True)
+
+
+def _template_url(value):
+    return _template_text(value).replace("\\", "/")
+
+
+def _template_attr(value, name):
+    # len kľúče slovníka / index zoznamu – šablóna nemá prístup k atribútom objektov
+    if isinstance(value, dict):
+        return value.get(name)
+    if isinstance(value, (list, tuple)) and name.isdigit() and int(name) < len(value):
+        return value[int(name)]
+    return None
+
+
+def _path_code(expr, where):
+    expr = expr.strip()
+    if not _TEMPLATE_PATH.match(expr):
+        raise TemplateError(f"{where}: neplatný výraz '{expr}'")
+    head, *rest = expr.split(".")
+    code = f"_v.get({head!r})"
+    for part in rest:
+        code = f"_attr({code}, {part!r})"
+    return code
+
+
+def _condition_code(expr, where):
+    match = _TEMPLATE_CONDITION.match(expr.strip())
+    if not match:
+        raise TemplateError(f"{where}: neplatná podmienka '{expr.strip()}'")
+    negate, path, op, literal = match.groups()
+    code = _path_code(path, where)
+    if op:
+        # literál sa do generovaného kódu nevkladá surovo ("x\" by ho rozbil)
+        try:
+            value = ast.literal_eval(literal)
+        except (SyntaxError, ValueError):
+            raise TemplateError(f"{where}: neplatný reťazec {literal}") from None
+        code = f"_text({code}) {op} {value!r}"
+    return f"not ({code})" if negate else code
+
+
+def compile_template(source, name="<šablóna>"):
+    # {blok: funkcia(hodnoty) -> str}
+    code = []
+    stack = []
+    indent = 0
+    loops = 0
+
+    def emit(line):
+        code.append("    " * indent + line)
+
+    line_no = 1
+    for token in _TEMPLATE_TOKEN.split(source):
+        where = f"{name}:{line_no}"
+        line_no += token.count("\n")
+        if not token:
+            continue
+        if token.startswith("{{"):
+            if not stack:
+                raise TemplateError(f"{where}: výraz mimo bloku")
+            expr, _, filter_name = token[2:-2].partition("|")
+            template = _TEMPLATE_FILTERS.get(filter_name.strip())
+            if template is None:
+                raise TemplateError(f"{where}: neznámy filter '{filter_name.strip()}'")
+            emit(f"_w({template.format(_path_code(expr, where))})")
+        elif token.startswith("{%"):
+            tag, _, arg = token[2:-2].strip().partition(" ")
+            if tag == "block":
+                if stack:
+                    raise TemplateError(f"{where}: blok v inom bloku")
+                if not arg.strip().isidentifier():
+                    raise TemplateError(f"{where}: neplatné meno bloku '{arg.strip()}'")
+                emit(f"def _block_{arg.strip()}(_v):")
+                indent += 1
+                emit("_v = dict(_v)")
+                emit("_out = []")
+                emit("_w = _out.append")
+                stack.append("block")
+            elif tag == "if":
+                emit(f"if {_condition_code(arg, where)}:")
+                indent += 1
+                emit("pass")
+                stack.append("if")
+            elif tag in ("elif", "else"):
+                if not stack or stack[-1] not in ("if", "else"):
+                    raise TemplateError(f"{where}: {tag} bez if")
+                if stack[-1] == "else":
+                    raise TemplateError(f"{where}: {tag} po else")
+                indent -= 1
+                emit(f"elif {_condition_code(arg, where)}:" if tag == "elif" else "else:")
+                indent += 1
+                emit("pass")
+                if tag == "else":
+                    stack[-1] = "else"
+            elif tag == "for":
+                match = re.fullmatch(r"\s*(\w+)\s+in\s+(.+)", arg)
+                if not match:
+                    raise TemplateError(f"{where}: for musí mať tvar 'for x in zoznam'")
+                loops += 1
+                emit(f"for _i{loops}, _x in enumerate({_path_code(match.group(2), where)} or (), 1):")
+                indent += 1
+                emit(f"_v[{match.group(1)!r}] = _x")
+                emit(f"_v['loop'] = {{'index': _i{loops}}}")
+                stack.append("for")
+            elif tag in ("endblock", "endif", "endfor"):
+                if stack and stack[-1] == "else":
+                    stack[-1] = "if"
+                if not stack or stack[-1] != tag[3:]:
+                    raise TemplateError(f"{where}: nečakaný {tag}")
+                stack.pop()
+                if tag == "endblock":
+                    emit("return ''.join(_out)")
+                indent -= 1
+            else:
+                raise TemplateError(f"{where}: neznámy príkaz '{tag}'")
+        elif stack:
+            emit(f"_w({token!r})")
+        elif token.strip():
+            raise TemplateError(f"{where}: text mimo bloku")
+    if stack:
+        raise TemplateError(f"{name}: neuzavretý {'if' if stack[-1] == 'else' else stack[-1]}")
+
+    namespace = {"_escape": _template_escape, "_text": _template_text, "_url": _template_url,
+                 "_attr": _template_attr}
+    try:
+        exec(compile("\n".join(code), name, "exec"), namespace)
+    except (SyntaxError, ValueError) as e:
+        # posledná poistka – chyba šablóny nesmie zhodiť export mimo TemplateError
+        raise TemplateError(f"{name}: šablónu sa nepodarilo preložiť: {e}") from None
+    return {key[len("_block_"):]: value for key, value in namespace.items() if key.startswith("_block_")}
+
+
+class ReportTemplate:
+    def __init__(self, source, name="<šablóna>"):
+        self.name = name
+        self.digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        self.blocks = compile_template(source, name)
+
+    def render(self, block, **values):
+        function = self.blocks.get(block)
+        return function(values) if function else ""
+
+
+def load_template(path=None):
+    # None = vstavaná šablóna; súbor sa prekladá znova len keď sa zmení
+    try:
+        if path is None:
+            key = ("<default>",)
+        else:
+            st = os.stat(path)
+            key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        template = _template_cache.get(key)
+        if template is None:
+            if path is None:
+                template = ReportTemplate(DEFAULT_HTML_TEMPLATE, "<vstavaná šablóna>")
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    template = ReportTemplate(f.read(), path)
+            _template_cache[key] = template
+    except (OSError, UnicodeDecodeError) as e:
+        raise TemplateError(f"Šablónu {path} sa nepodarilo načítať: {e}")
+    return template
+
+
+# ===== EXPORT – SPOLOČNÝ PRECHOD DÁTAMI =====
+# Jeden prechod cez TS, TC a bugy napája ľubovoľný počet zapisovačov naraz.
+# Prílohy (screenshoty) sa čítajú najviac raz a zdieľajú medzi zapisovačmi.
+EXPORT_SECTIONS = (
+    ("ts", "test_scenarios"),
+    ("tc", "test_cases"),
+    ("bug", "bug_reports"),
+)
+
+
+class Attachment:
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self.error = None
+
+    @property
+    def data(self):
+        if self._data is None and self.error is None:
+            try:
+                with open(self.path, "rb") as f:
+                    self._data = f.read()
+            except OSError as e:
+                self.error = e
+        return self._data
+
+    def stream(self):
+        data = self.data
+        if data is None:
+            raise self.error
+        return io.BytesIO(data)
+
+
+class ExportContext:
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else ExportCache()
+        self.generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.warnings = []
+        self._attachments = {}
+
+    def attachment(self, path):
+        if not path:
+            return None
+        if path not in self._attachments:
+            self._attachments[path] = Attachment(path)
+        return self._attachments[path]
+
+
+class ExportWriter:
+    fmt = None
+    label = None
+    filename = None
+    version = ""
+
+    def begin(self, ctx):
+        self.ctx = ctx
+
+    def start_section(self, kind, count):
+        pass
+
+    def record(self, kind, record, attachment):
+        pass
+
+    def end_section(self, kind):
+        pass
+
+    def finish(self):
+        pass
+
+    def abort(self):
+        # export sa nedokončil (chyba alebo zrušená úloha)
+        pass
+
+    def fragment(self, kind, record):
+        return self.ctx.cache.fragment(self.fmt, kind, record, getattr(self, f"render_{kind}"), self.version)
+
+
+def run_export(data, writers, ctx=None, progress=None):
+    # progress(počet spracovaných záznamov) môže export zrušiť výnimkou
+    ctx = ctx or ExportContext()
+    started = []
+    try:
+        for writer in writers:
+            writer.begin(ctx)
+            started.append(writer)
+        done = 0
+        for kind, name in EXPORT_SECTIONS:
+            records = data[name]
+            for writer in writers:
+                writer.start_section(kind, len(records))
+            for record in records:
+                if progress and done % JOB_PROGRESS_EVERY == 0:
+                    progress(done)
+                done += 1
+                record = record_view(record)
+                attachment = ctx.attachment(record.get("screenshot")) if kind == "bug" else None
+                for writer in writers:
+                    writer.record(kind, record, attachment)
+            for writer in writers:
+                writer.end_section(kind)
+    except BaseException:
+        for writer in started:
+            writer.abort()
+        raise
+    for writer in writers:
+        writer.finish()
+    ctx.cache.save()
+    return ctx
+
+
+class TxtWriter(ExportWriter):
+    fmt = "txt"
+    label = "TXT"
+    filename = "qa_export.txt"
+    headings = {"ts": "=== TEST SCENÁRE ===\n\n", "tc": "\n=== TEST CASES ===\n\n", "bug": "\n=== BUG REPORTS ===\n\n"}
+
+    def begin(self, ctx):
+        super().begin(ctx)
+        self.f = open(self.filename, "w", encoding="utf-8")
+
+    def start_section(self, kind, count):
+        self.f.write(self.headings[kind])
+
+    def record(self, kind, record, attachment):
+        self.f.write(self.fragment(kind, record))
+
+    def finish(self):
+        self.f.close()
+
+    def abort(self):
+        self.f.close()
+        os.remove(self.filename)
+
+    def render_ts(self, ts):
+        out = f"{ts['id']} – {ts['title']}\n"
+        if ts["description"]:
+            out += f"Popis: {ts['description']}\n"
+        return out + "-" * 60 + "\n"
+
+    def render_tc(self, tc):
+        lines = [
+            f"ID: {tc['id']}",
+            f"Názov: {tc['title']}",
+            f"TS: {tc['ts_id']}",
+            f"Predpoklady: {tc['preconditions']}",
+            "Kroky:",
+        ]
+        for i, step in enumerate(tc["steps"], start=1):
+            lines.append(f"  {i}. {step}")
+        lines.append(f"Očakávaný výsledok: {tc['expected']}")
+        lines.append(f"Skutočný výsledok: {tc['actual']}")
+        lines.append(f"Stav: {tc['status']}")
+        lines.append("-" * 60)
+        return "\n".join(lines) + "\n"
+
+    def render_bug(self, bug):
+        lines = [
+            f"ID: {bug['id']}",
+            f"Názov: {bug['title']}",
+            f"Test Case: {bug['related_tc']}",
+            f"Severity: {bug['severity']}",
+            "Kroky k reprodukcii:",
+        ]
+        for i, step in enumerate(bug["steps"], start=1):
+            lines.append(f"  {i}. {step}")
+        lines.append(f"Očakávaný výsledok: {bug['expected']}")
+        lines.append(f"Skutočný výsledok: {bug['actual']}")
+        screenshot = bug.get("screenshot")
+        if screenshot:
+            lines.append(f"Screenshot: {screenshot}")
+        if bug["note"]:
+            lines.append(f"Poznámka: {bug['note']}")
+        lines.append(f"Vytvorené: {bug['created_at']}")
+        lines.append("-" * 60)
+        return "\n".join(lines) + "\n"
+
+
+class HtmlWriter(ExportWriter):
+    fmt = "html"
+    label = "HTML"
+    filename = "qa_export.html"
+    headings = {"ts": "Test Scenáre", "tc": "Test Cases", "bug": "Bug Reports"}
+
+    def __init__(self, template=None):
+        # vlastný layout tímu: qa_export_template.html vedľa aplikácie
+        if template is None:
+            template = load_template(HTML_TEMPLATE_FILE if os.path.exists(HTML_TEMPLATE_FILE) else None)
+        self.template = template
+        self.version = template.digest
+
+    def begin(self, ctx):
+        super().begin(ctx)
+        self.f = open(self.filename, "w", encoding="utf-8")
+        self.f.write(self.template.render("head", generated=ctx.generated))
+
+    def start_section(self, kind, count):
+        self.f.write(self.template.render("section_start", kind=kind, heading=self.headings[kind], count=count))
+
+    def record(self, kind, record, attachment):
+        self.f.write(self.fragment(kind, record))
+
+    def end_section(self, kind):
+        self.f.write(self.template.render("section_end", kind=kind))
+
+    def finish(self):
+        self.f.write(self.template.render("foot"))
+        self.f.close()
+
+    def abort(self):
+        self.f.close()
+        os.remove(self.filename)
+
+    def render_ts(self, ts):
+        return self.template.render("ts", ts=ts)
+
+    def render_tc(self, tc):
+        return self.template.render("tc", tc=tc)
+
+    def render_bug(self, bug):
+        return self.template.render("bug", bug=bug)
+
+
+class WordWriter(ExportWriter):
+    fmt = "docx"
+    label = "Word"
+    filename = "qa_export_professional.docx"
+    headings = {"ts": "Test Scenáre", "tc": "Test Cases", "bug": "Bug Reports"}
+    empty = {"ts": "Žiadne test scenáre.", "tc": "Žiadne Test Cases.", "bug": "Žiadne bug reporty."}
+    columns = {
+        "ts": ["ID", "Názov", "Popis"],
+        "tc": ["ID", "Názov", "TS", "Predpoklady", "Kroky", "Očakávaný výsledok", "Skutočný výsledok", "Stav"],
+        "bug": ["ID", "Názov", "Test Case", "Severity", "Kroky k reprodukcii", "Očakávaný výsledok",
+                "Skutočný výsledok", "Poznámka", "Vytvorené"],
+    }
+
+    def __init__(self):
+        # ImportError sa prejaví hneď pri vytvorení zapisovača
+        from docx import Document
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import qn
+        from docx.shared import Inches
+
+        self._document = Document
+        self._parse_xml = parse_xml
+        self._qn = qn
+        self._inches = Inches
+
+    def begin(self, ctx):
+        super().begin(ctx)
+        self.doc = self._document()
+        section = self.doc.sections[-1]
+        self.block_width = section.page_width - section.left_margin - section.right_margin
+        self.style_id = self.doc.styles["Table Grid"].style_id
+
+        # Hlavný nadpis
+        self.doc.add_heading("QA Test Report", level=1)
+        self.doc.add_paragraph(f"Vygenerované: {ctx.generated}")
+
+    def start_section(self, kind, count):
+        self.doc.add_page_break()
+        self.doc.add_heading(self.headings[kind], level=2)
+        headers = self.columns[kind]
+        self.widths = [int(self.block_width // len(headers) // EMU_PER_TWIP)] * len(headers)
+        self.rows = []
+        self.pictures = []
+
+    def record(self, kind, record, attachment):
+        self.rows.append(self.fragment(kind, record))
+        if attachment is not None:
+            self.pictures.append((record, attachment))
+
+    def end_section(self, kind):
+        if not self.rows:
+            self.doc.add_paragraph(self.empty[kind], style="Intense Quote")
+            return
+
+        # celá tabuľka sa poskladá ako jeden XML reťazec a vloží naraz
+        tbl = self._parse_xml(docx_table_xml(self.style_id, self.widths, self.columns[kind], self.rows))
+        body = self.doc.element.body
+        sect_pr = body.find(self._qn("w:sectPr"))
+        if sect_pr is not None:
+            sect_pr.addprevious(tbl)
+        else:
+            body.append(tbl)
+
+        for bug, attachment in self.pictures:
+            p = self.doc.add_paragraph()
+            p.add_run(f"Screenshot pre {bug['id']} – {bug['title']}:\n")
+            try:
+                self.doc.add_picture(attachment.stream(), width=self._inches(3))
+            except Exception as e:
+                p.add_run(f"(Nepodarilo sa vložiť obrázok: {e})")
+            self.doc.add_paragraph("")
+
+    def finish(self):
+        self.doc.save(self.filename)
+
+    def render_ts(self, ts):
+        return docx_row_xml([ts["id"], ts["title"] or "", ts["description"] or ""], self.widths)
+
+    def render_tc(self, tc):
+        return docx_row_xml([
+            tc["id"],
+            tc["title"] or "",
+            tc["ts_id"] or "",
+            tc["preconditions"] or "",
+            "\n".join(tc["steps"]) if tc["steps"] else "",
+            tc["expected"] or "",
+            tc["actual"] or "",
+            tc["status"] or "",
+        ], self.widths)
+
+    def render_bug(self, bug):
+        return docx_row_xml([
+            bug["id"],
+            bug["title"] or "",
+            bug["related_tc"] or "",
+            bug["severity"] or "",
+            "\n".join(bug["steps"]) if bug["steps"] else "",
+            bug["expected"] or "",
+            bug["actual"] or "",
+            bug["note"] or "",
+            bug["created_at"] or "",
+        ], self.widths)
+
+
+# PDF layout: riadky sa zalamujú podľa šírok glyfov (tabuľka šírok sa z fontu
+# načíta raz a drží sa pre celý proces), zalomené riadky sa ukladajú do cache
+# fragmentov, záznam sa nedelí medzi strany, ak sa celý zmestí na novú, a text
+# jednej strany ide cez jeden textový objekt – font sa prepína len pri zmene veľkosti.
+PDF_MARGIN_CM = 2
+PDF_LEADING = 1.45  # výška riadku ako násobok veľkosti písma
+PDF_KEEP_LINES = 3  # záznam dlhší ako strana začne na novej, ak by sa z neho zmestilo menej riadkov
+_WRAP_HANG = re.compile(r" *(?:\d+\. )?")
+
+
+class GlyphWidths(dict):
+    # znak -> šírka v tisícinách em; znaky mimo tabuľky fontu sa dopočítajú raz
+    def __init__(self, font, string_width):
+        super().__init__()
+        self.font = font
+        self._string_width = string_width
+
+    def __missing__(self, char):
+        width = self[char] = self._string_width(char, self.font, 1000)
+        return width
+
+
+_GLYPH_WIDTHS = {}
+
+
+def glyph_widths(font, pdfmetrics):
+    widths = _GLYPH_WIDTHS.get(font)
+    if widths is None:
+        widths = GlyphWidths(font, pdfmetrics.stringWidth)
+        face = getattr(pdfmetrics.getFont(font), "face", None)
+        for code, width in getattr(face, "charWidths", {}).items():
+            widths[chr(code)] = width
+        _GLYPH_WIDTHS[font] = widths
+    return widths
+
+
+def wrap_text(widths, text, size, max_width):
+    # greedy zalamovanie po slovách; pokračovanie kroku "  3. ..." sa odsadí pod text kroku
+    limit = max_width * 1000 / size
+    measure = widths.__getitem__
+    if sum(map(measure, text)) <= limit:
+        return [text]
+
+    prefix = _WRAP_HANG.match(text).group()
+    space = widths[" "]
+    hang = " " * round(sum(map(measure, prefix)) / space) if space else ""
+    hang_width = len(hang) * space
+
+    lines = []
+    line, line_width, empty = prefix, sum(map(measure, prefix)), True
+    for word in text[len(prefix):].split(" "):
+        word_width = sum(map(measure, word))
+        width = line_width + word_width + (0 if empty else space)
+        if width <= limit:
+            line = line + word if empty else f"{line} {word}"
+            line_width, empty = width, False
+            continue
+        if not empty:
+            lines.append(line)
+            line, line_width, empty = hang, hang_width, True
+        while word and line_width + word_width > limit:
+            # slovo dlhšie ako riadok sa láme po znakoch
+            used, cut = line_width, 0
+            while cut < len(word) and used + measure(word[cut]) <= limit:
+                used += measure(word[cut])
+                cut += 1
+            cut = max(cut, 1)
+            lines.append(line + word[:cut])
+            word = word[cut:]
+            word_width = sum(map(measure, word))
+            line, line_width = hang, hang_width
+        if word:
+            line += word
+            line_width += word_width
+            empty = False
+    lines.append(line)
+    return lines
+
+
+class PdfWriter(ExportWriter):
+    fmt = "pdf"
+    label = "PDF"
+    filename = "qa_export.pdf"
+    headings = {"ts": "Test Scenáre", "tc": "Test Cases", "bug": "Bug Reports"}
+    gaps = {"ts": 0.2, "tc": 0.4, "bug": 0.4}
+
+    def __init__(self):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.units import cm
+        from reportlab.lib.utils import ImageReader
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        self._canvas = canvas
+        self._image_reader = ImageReader
+        self.page_size = A4
+        self.cm = cm
+        self._pdfmetrics = pdfmetrics
+        self._ttfont = TTFont
+
+    def begin(self, ctx):
+        super().begin(ctx)
+        cm = self.cm
+
+        # Registrujeme Arial z arial.ttf v tom istom priečinku
+        try:
+            self._pdfmetrics.registerFont(self._ttfont("Arial", "arial.ttf"))
+            self.font = "Arial"
+        except Exception as e:
+            ctx.warnings.append(
+                f"Nepodarilo sa načítať arial.ttf, použije sa predvolený font (bez diakritiky).\n\n{e}"
+            )
+            self.font = "Helvetica"
+
+        self.c = self._canvas.Canvas(self.filename, pagesize=self.page_size)
+        self.width, self.height = self.page_size
+        self.margin = PDF_MARGIN_CM * cm
+        self.line_width = self.width - 2 * self.margin
+        self.widths = glyph_widths(self.font, self._pdfmetrics)
+        # zalomené riadky v cache platia len pre rovnaký font a šírku strany
+        self.version = f"{self.font}:{round(self.line_width)}:{PDF_LEADING}"
+        self.y = self.height - self.margin
+        self.text = None
+
+        # Nadpis
+        self.write_line("QA Test Report", size=16)
+        self.write_line(f"Vygenerované: {ctx.generated}", size=10)
+        self.y -= 0.5 * cm
+
+    def new_page(self):
+        self.flush_text()
+        self.c.showPage()
+        self.y = self.height - self.margin
+
+    def flush_text(self):
+        if self.text is not None:
+            self.c.drawText(self.text)
+            self.text = None
+
+    def space_left(self):
+        return self.y - self.margin
+
+    def draw_line(self, text, size):
+        leading = size * PDF_LEADING
+        if self.y - leading < self.margin:
+            self.new_page()
+        if self.text is None:
+            self.text = self.c.beginText()
+            self.text_size = self.text_y = None
+        if size != self.text_size:
+            self.text.setFont(self.font, size, leading)
+            self.text_size = size
+        if self.y != self.text_y:
+            self.text.setTextOrigin(self.margin, self.y)
+        self.text.textLine(text)
+        self.y -= leading
+        self.text_y = self.y
+
+    def layout(self, lines):
+        # [text, veľkosť] -> riadky zalomené na šírku strany
+        out = []
+        for text, size in lines:
+            for line in text.split("\n"):
+                for part in wrap_text(self.widths, line, size, self.line_width):
+                    out.append([part, size])
+        return out
+
+    def write_line(self, text="", size=10):
+        for text, size in self.layout([[text, size]]):
+            self.draw_line(text, size)
+
+    def keep_together(self, lines):
+        height = sum(size * PDF_LEADING for _, size in lines)
+        page = self.height - 2 * self.margin
+        if height > self.space_left() and self.y < self.height - self.margin:
+            if height <= page:
+                self.new_page()
+            elif sum(size * PDF_LEADING for _, size in lines[:PDF_KEEP_LINES]) > self.space_left():
+                self.new_page()
+
+    def start_section(self, kind, count):
+        # nadpis sekcie nesmie ostať sám na konci strany
+        if self.space_left() < (14 + PDF_KEEP_LINES * 10) * PDF_LEADING + 0.2 * self.cm:
+            self.new_page()
+        self.write_line(self.headings[kind], size=14)
+        self.y -= 0.2 * self.cm
+
+    def record(self, kind, record, attachment):
+        cm = self.cm
+        lines = self.fragment(kind, record)
+        self.keep_together(lines)
+        for text, size in lines:
+            self.draw_line(text, size)
+
+        if attachment is not None:
+            self.y -= 0.2 * cm
+            self.write_line("Screenshot:", size=10)
+            if self.y < 8 * cm:
+                self.new_page()
+            try:
+                img = self._image_reader(attachment.stream())
+                iw, ih = img.getSize()
+                max_w = self.line_width
+                max_h = 8 * cm
+                scale = min(max_w / iw, max_h / ih, 1.0)
+                img_w = iw * scale
+                img_h = ih * scale
+                if self.y - img_h < self.margin:
+                    self.new_page()
+                self.c.drawImage(img, self.margin, self.y - img_h, width=img_w, height=img_h)
+                self.y -= img_h + 0.5 * cm
+            except Exception as e:
+                self.write_line(f"(Nepodarilo sa vložiť obrázok: {e})", size=9)
+        if kind == "bug" and record["note"]:
+            self.write_line(f"Poznámka: {record['note']}", size=10)
+        self.y -= self.gaps[kind] * cm
+
+    def end_section(self, kind):
+        if kind != "bug":
+            self.y -= 0.5 * self.cm
+
+    def finish(self):
+        self.flush_text()
+        self.c.save()
+
+    def render_ts(self, ts):
+        lines = [[f"{ts['id']} – {ts['title']}", 11]]
+        if ts["description"]:
+            for line in ts["description"].splitlines():
+                lines.append([f"  {line}", 10])
+        return self.layout(lines)
+
+    def render_tc(self, tc):
+        lines = [
+            [f"{tc['id']} – {tc['title']}", 11],
+            [f"TS: {tc['ts_id']}", 10],
+            [f"Predpoklady: {tc['preconditions']}", 10],
+            ["Kroky:", 10],
+        ]
+        for i, step in enumerate(tc["steps"], start=1):
+            lines.append([f"  {i}. {step}", 10])
+        lines.append([f"Očakávaný výsledok: {tc['expected']}", 10])
+        lines.append([f"Skutočný výsledok: {tc['actual']}", 10])
+        lines.append([f"Stav: {tc['status']}", 10])
+        return self.layout(lines)
+
+    def render_bug(self, bug):
+        lines = [
+            [f"{bug['id']} – {bug['title']}", 11],
+            [f"Test Case: {bug['related_tc']}", 10],
+            [f"Severity: {bug['severity']}", 10],
+            [f"Vytvorené: {bug['created_at']}", 10],
+            ["Kroky k reprodukcii:", 10],
+        ]
+        for i, step in enumerate(bug["steps"], start=1):
+            lines.append([f"  {i}. {step}", 10])
+        lines.append([f"Očakávaný výsledok: {bug['expected']}", 10])
+        lines.append([f"Skutočný výsledok: {bug['actual']}", 10])
+        return self.layout(lines)
+
+
+# Analytický export – nie report na čítanie, ale tabuľky pre BI nástroje.
+# Záznamy sa pri prechode len rozložia do stĺpcov (zoznam hodnôt na stĺpec),
+# odvodené stĺpce (počty bugov, pass rate) sa dopočítajú naraz na konci a každá
+# tabuľka sa zapíše jedným volaním – CSV vždy, Parquet ak je nainštalovaný pyarrow.
+ANALYTICS_TABLES = {
+    "scenarios": (
+        ("id", "string"), ("title", "string"), ("test_cases", "int64"), ("passed", "int64"),
+        ("failed", "int64"), ("not_run", "int64"), ("pass_rate", "float64"), ("bugs", "int64"),
+    ),
+    "test_cases": (
+        ("id", "string"), ("title", "string"), ("ts_id", "string"), ("status", "string"),
+        ("passed", "bool"), ("steps", "int64"), ("bugs", "int64"), ("max_severity", "string"),
+    ),
+    "bugs": (
+        ("id", "string"), ("title", "string"), ("related_tc", "string"), ("ts_id", "string"),
+        ("tc_status", "string"), ("severity", "string"), ("severity_rank", "int64"),
+        ("created_at", "string"), ("created_date", "string"), ("has_screenshot", "bool"),
+    ),
+    "steps": (("parent_kind", "string"), ("parent_id", "string"), ("position", "int64"), ("text", "string")),
+}
+SEVERITY_RANK = {severity: rank for rank, severity in enumerate(SEVERITIES, start=1)}
+
+
+class AnalyticsWriter(ExportWriter):
+    fmt = "analytics"
+    label = "Analytika (CSV/Parquet)"
+    filename = "qa_analytics"  # adresár s tabuľkami
+
+    def __init__(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            pyarrow = None
+        self._arrow = pyarrow
+
+    def begin(self, ctx):
+        super().begin(ctx)
+        self.columns = {table: {name: [] for name, _ in schema} for table, schema in ANALYTICS_TABLES.items()}
+
+    def _step_rows(self, kind, record_id, steps):
+        steps_table = self.columns["steps"]
+        steps_table["parent_kind"].extend([kind] * len(steps))
+        steps_table["parent_id"].extend([record_id] * len(steps))
+        steps_table["position"].extend(range(1, len(steps) + 1))
+        steps_table["text"].extend(steps)
+
+    def record(self, kind, record, attachment):
+        if kind == "ts":
+            table = self.columns["scenarios"]
+            table["id"].append(record["id"])
+            table["title"].append(record.get("title") or "")
+        elif kind == "tc":
+            table = self.columns["test_cases"]
+            steps = record.get("steps") or []
+            table["id"].append(record["id"])
+            table["title"].append(record.get("title") or "")
+            table["ts_id"].append(record.get("ts_id") or "")
+            table["status"].append(record.get("status") or "")
+            table["steps"].append(len(steps))
+            self._step_rows("tc", record["id"], steps)
+        elif kind == "bug":
+            table = self.columns["bugs"]
+            created_at = record.get("created_at") or ""
+            table["id"].append(record["id"])
+            table["title"].append(record.get("title") or "")
+            table["related_tc"].append(record.get("related_tc") or "")
+            table["severity"].append(record.get("severity") or "")
+            table["created_at"].append(created_at)
+            table["created_date"].append(created_at[:10])
+            table["has_screenshot"].append(bool(record.get("screenshot")))
+            self._step_rows("bug", record["id"], record.get("steps") or [])
+
+    def _derive(self):
+        scenarios, cases, bugs = self.columns["scenarios"], self.columns["test_cases"], self.columns["bugs"]
+
+        cases["passed"] = [status == "PASSED" for status in cases["status"]]
+        tc_ts = dict(zip(cases["id"], cases["ts_id"]))
+        tc_status = dict(zip(cases["id"], cases["status"]))
+        bugs["ts_id"] = [tc_ts.get(tc_id, "") for tc_id in bugs["related_tc"]]
+        bugs["tc_status"] = [tc_status.get(tc_id, "") for tc_id in bugs["related_tc"]]
+        bugs["severity_rank"] = [SEVERITY_RANK.get(severity, 0) for severity in bugs["severity"]]
+
+        bug_count, worst = {}, {}
+        for tc_id, rank in zip(bugs["related_tc"], bugs["severity_rank"]):
+            bug_count[tc_id] = bug_count.get(tc_id, 0) + 1
+            worst[tc_id] = max(worst.get(tc_id, 0), rank)
+        cases["bugs"] = [bug_count.get(tc_id, 0) for tc_id in cases["id"]]
+        cases["max_severity"] = [SEVERITIES[worst[tc_id] - 1] if worst.get(tc_id) else "" for tc_id in cases["id"]]
+
+        stats = {ts_id: [0, 0, 0, 0, 0] for ts_id in scenarios["id"]}  # TC, PASSED, FAILED, NOT RUN, bugy
+        slot = {"PASSED": 1, "FAILED": 2, "NOT RUN": 3}
+        for ts_id, status, count in zip(cases["ts_id"], cases["status"], cases["bugs"]):
+            row = stats.get(ts_id)
+            if row is not None:
+                row[0] += 1
+                if status in slot:
+                    row[slot[status]] += 1
+                row[4] += count
+        rows = [stats[ts_id] for ts_id in scenarios["id"]]
+        scenarios["test_cases"] = [row[0] for row in rows]
+        scenarios["passed"] = [row[1] for row in rows]
+        scenarios["failed"] = [row[2] for row in rows]
+        scenarios["not_run"] = [row[3] for row in rows]
+        scenarios["pass_rate"] = [round(row[1] / row[0], 4) if row[0] else 0.0 for row in rows]
+        scenarios["bugs"] = [row[4] for row in rows]
+
+    def finish(self):
+        self._derive()
+        os.makedirs(self.filename, exist_ok=True)
+        for table, schema in ANALYTICS_TABLES.items():
+            names = [name for name, _ in schema]
+            columns = self.columns[table]
+            with open(os.path.join(self.filename, f"{table}.csv"), "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(names)
+                writer.writerows(zip(*(columns[name] for name in names)))
+            if self._arrow is not None:
+                pa = self._arrow
+                types = {"string": pa.string(), "int64": pa.int64(), "float64": pa.float64(), "bool": pa.bool_()}
+                arrow_table = pa.table({name: pa.array(columns[name], type=types[kind]) for name, kind in schema})
+                pa.parquet.write_table(arrow_table, os.path.join(self.filename, f"{table}.parquet"))
+
+
+EXPORT_WRITERS = {"txt": TxtWriter, "html": HtmlWriter, "docx": WordWriter, "pdf": PdfWriter,
+                  "analytics": AnalyticsWriter}
+MISSING_PACKAGES = {"docx": "python-docx", "pdf": "reportlab"}
+
+
+# ===== REST API SERVER (automatizácia, CI) =====
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_FLUSH_DELAY = 0.5  # zmeny z API sa ukladajú dávkovo
+SERVER_PAGE_SIZE = 100
+SERVER_MAX_PAGE_SIZE = 1000
+server_log = logging.getLogger("qa_manager.server")
+
+API_COLLECTIONS = {"ts": "test_scenarios", "tc": "test_cases", "bugs": "bug_reports"}
+API_FILTERS = {
+    "test_scenarios": ("id",),
+    "test_cases": ("id", "ts_id", "status"),
+    "bug_reports": ("id", "related_tc", "severity"),
+}
+API_FIELDS = {
+    "test_scenarios": ("title", "description"),
+    "test_cases": ("title", "preconditions", "ts_id", "steps", "expected", "actual", "status"),
+    "bug_reports": ("title", "related_tc", "steps", "expected", "actual", "severity", "note", "screenshot"),
+}
+API_REQUIRED = {"test_scenarios": ("title",), "test_cases": ("title", "steps"), "bug_reports": ("title", "steps")}
+API_RESULT_FIELDS = {"id", "status", "actual", "bug"}
+HTTP_REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+                405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class QAServer:
+    def __init__(self, path=None):
+        self.path = path or DATA_FILE
+        self.store = SharedStore(self.path) if SHARED_STORAGE else None
+        self.data = self.store.load() if self.store else load_data(self.path)
+        self.links = LinkGraph(self.data)
+        self.history = RecordHistory(history_path(self.path))
+        self.history.commit(self.data)
+        self.links.reserve(issued_ids(self.history, ArchiveStore(archive_dir(self.path))))
+        self._dirty = False
+        self._flush_handle = None
+        self._writing = None  # asyncio.Lock – zápis na disk a zmeny z API sa striedajú
+
+    # ---- ukladanie ----
+    def _touch(self):
+        self._dirty = True
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(SERVER_FLUSH_DELAY, lambda: loop.create_task(self.flush()))
+
+    async def flush(self):
+        # ukladá sa v executore, slučka medzitým vybavuje čítanie; zmeny čakajú na zámok
+        self._flush_handle = None
+        async with self._writing:
+            if not self._dirty:
+                return
+            self._dirty = False
+            loop = asyncio.get_running_loop()
+            try:
+                if self.store:
+                    snapshot, sent = self.store.snapshot(self.data)
+                    conflicts = await loop.run_in_executor(None, self._save_shared, snapshot, sent[1])
+                    self.store.adopt(self.data, snapshot, sent)
+                    self.links.rebuild(self.data)
+                    for _, record_id, reason, _ in conflicts:
+                        server_log.warning("Konflikt %s: %s (lokálna verzia v %s)",
+                                           record_id, reason, self.store.conflicts_path)
+                else:
+                    await loop.run_in_executor(None, self._save)
+            except (OSError, TimeoutError) as e:
+                server_log.error("Zmeny sa nepodarilo uložiť: %s", e)
+                self._touch()
+
+    def _save(self):
+        save_data(self.data, self.path)
+        self.history.commit(self.data)
+
+    def _save_shared(self, snapshot, changed):
+        conflicts, _ = self.store.save(snapshot, changed)
+        self.history.commit(snapshot)
+        return conflicts
+
+    # ---- dotazy ----
+    def _record(self, name, record_id):
+        record = self.links.record(name, record_id)
+        if record is None:
+            raise ApiError(404, f"{record_id} neexistuje")
+        return record
+
+    def _list(self, name, query):
+        try:
+            offset = max(int(query.get("offset", 0)), 0)
+            limit = min(max(int(query.get("limit", SERVER_PAGE_SIZE)), 1), SERVER_MAX_PAGE_SIZE)
+        except ValueError:
+            raise ApiError(400, "offset a limit musia byť čísla")
+
+        conditions = [(k, query[k]) for k in API_FILTERS[name] if k in query]
+        text = query.get("q", "").lower()
+        matched = []
+        for record in self.data[name]:
+            if any((record.get(k) or "") != v for k, v in conditions):
+                continue
+            if text and text not in (record.get("title") or "").lower():
+                continue
+            matched.append(record)
+        return {"items": matched[offset:offset + limit], "total": len(matched), "offset": offset, "limit": limit}
+
+    def _fields(self, name, body, create=False):
+        # typy sa kontrolujú vopred – chyba hlboko v edit_*/create_* by skončila 500-kou
+        if not isinstance(body, dict):
+            raise ApiError(400, "telo musí byť JSON objekt")
+        unknown = body.keys() - set(API_FIELDS[name])
+        if unknown:
+            raise ApiError(400, f"neznáme polia: {', '.join(sorted(unknown))}")
+        if create:
+            missing = [key for key in API_REQUIRED[name] if key not in body]
+            if missing:
+                raise ApiError(400, f"chýbajúce polia: {', '.join(missing)}")
+        for key, value in body.items():
+            if value is None or isinstance(value, str):
+                continue
+            if not (key == "steps" and isinstance(value, list) and all(isinstance(item, str) for item in value)):
+                raise ApiError(400, f"pole {key} musí byť text" + (" alebo zoznam textov" if key == "steps" else ""))
+        return body
+
+    def _create(self, name, body):
+        create = {"test_scenarios": create_ts, "test_cases": create_tc, "bug_reports": create_bug}[name]
+        try:
+            record = create(self.data, links=self.links, **self._fields(name, body, create=True))
+        except TypeError as e:
+            raise ApiError(400, str(e))
+        self._touch()
+        return record
+
+    def _edit(self, name, record_id, body):
+        edit = {"test_scenarios": edit_ts, "test_cases": edit_tc, "bug_reports": edit_bug}[name]
+        self._record(name, record_id)
+        try:
+            record = edit(self.data, record_id, links=self.links, **self._fields(name, body))
+        except TypeError as e:
+            raise ApiError(400, str(e))
+        self._touch()
+        return record
+
+    def _remove(self, name, record_id):
+        self._record(name, record_id)
+        delete_record(self.data, name, record_id, self.links)
+        self._touch()
+
+    def _check_results(self, body):
+        results = body.get("results") if isinstance(body, dict) else body
+        if not isinstance(results, list):
+            raise ApiError(400, "očakáva sa zoznam výsledkov")
+        for i, result in enumerate(results):
+            if not isinstance(result, dict):
+                raise ApiError(400, f"výsledok {i}: musí byť objekt")
+            unknown = result.keys() - API_RESULT_FIELDS
+            if unknown:
+                raise ApiError(400, f"výsledok {i}: neznáme polia: {', '.join(sorted(unknown))}")
+            if not isinstance(result.get("id"), str):
+                raise ApiError(400, f"výsledok {i}: id musí byť text")
+            for key in ("status", "actual"):
+                if not isinstance(result.get(key, ""), (str, type(None))):
+                    raise ApiError(400, f"výsledok {i}: pole {key} musí byť text")
+            if result.get("bug") is not None:
+                try:
+                    self._fields("bug_reports", dict(result["bug"], related_tc=result["id"])
+                                 if isinstance(result["bug"], dict) else result["bug"], create=True)
+                except ApiError as e:
+                    raise ApiError(400, f"výsledok {i}, bug: {e}") from None
+        return results
+
+    def _results(self, body):
+        # hromadné výsledky: [{"id": "TC01", "status": "FAILED", "actual": "...", "bug": {...}}, ...]
+        results = self._check_results(body)
+        updated, bugs, errors = 0, [], []
+        for i, result in enumerate(results):
+            try:
+                tc = self.links.record("test_cases", result.get("id"))
+                if tc is None:
+                    raise ValueError(f"{result.get('id')} neexistuje")
+                fields = {k: result[k] for k in ("status", "actual") if k in result}
+                edit_tc(self.data, tc["id"], links=self.links, **fields)
+                updated += 1
+                if result.get("bug") is not None:
+                    bug_fields = dict(result["bug"], related_tc=tc["id"])
+                    bug = create_bug(self.data, links=self.links, **bug_fields)
+                    bugs.append(bug["id"])
+            except (ValueError, TypeError, ApiError) as e:
+                errors.append({"index": i, "error": str(e)})
+        if updated or bugs:
+            self._touch()
+        return {"updated": updated, "bugs": bugs, "errors": errors}
+
+    # ---- smerovanie ----
+    @staticmethod
+    def _route(target):
+        parsed = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        return [urllib.parse.unquote(p) for p in parsed.path.strip("/").split("/") if p], query
+
+    def _check_request(self, method, target, body):
+        # celá požiadavka (aj všetky položky batch-u) sa overí pred prvou zmenou dát
+        parts, _ = self._route(target)
+        if parts[:1] != ["api"] or len(parts) < 2:
+            return
+        if len(parts) == 2 and parts[1] == "results":
+            if method == "POST":
+                self._check_results(body)
+        elif len(parts) == 2 and parts[1] == "batch":
+            if not isinstance(body, list):
+                raise ApiError(400, "batch očakáva POST so zoznamom požiadaviek")
+            for i, item in enumerate(body):
+                if (not isinstance(item, dict) or not isinstance(item.get("path"), str)
+                        or not isinstance(item.get("method", "GET"), str)):
+                    raise ApiError(400, f"položka {i}: potrebuje 'path' a 'method' ako text")
+                try:
+                    self._check_request(item.get("method", "GET").upper(), item["path"], item.get("body"))
+                except ApiError as e:
+                    raise ApiError(400, f"položka {i}: {e}") from None
+        elif parts[1] in API_COLLECTIONS and len(parts) <= 3:
+            name = API_COLLECTIONS[parts[1]]
+            if len(parts) == 2 and method == "POST":
+                self._fields(name, body, create=True)
+            elif len(parts) == 3 and method in ("PUT", "PATCH"):
+                self._fields(name, body)
+
+    def dispatch(self, method, target, body):
+        parts, query = self._route(target)
+        try:
+            self._check_request(method, target, body)
+            if parts[:1] != ["api"] or len(parts) < 2:
+                raise ApiError(404, "neznáma cesta")
+            if len(parts) == 2 and parts[1] == "results":
+                if method != "POST":
+                    raise ApiError(405, "použi POST")
+                return 200, self._results(body)
+            if len(parts) == 2 and parts[1] == "batch":
+                if method != "POST" or not isinstance(body, list):
+                    raise ApiError(400, "batch očakáva POST so zoznamom požiadaviek")
+                return 200, [self._dispatch_item(item) for item in body]
+
+            name = API_COLLECTIONS.get(parts[1])
+            if name is None or len(parts) > 3:
+                raise ApiError(404, "neznáma cesta")
+            if len(parts) == 2:
+                if method == "GET":
+                    return 200, self._list(name, query)
+                if method == "POST":
+                    return 201, self._create(name, body)
+                raise ApiError(405, "nepodporovaná metóda")
+
+            record_id = parts[2]
+            if method == "GET":
+                return 200, self._record(name, record_id)
+            if method in ("PUT", "PATCH"):
+                return 200, self._edit(name, record_id, body)
+            if method == "DELETE":
+                self._remove(name, record_id)
+                return 204, None
+            raise ApiError(405, "nepodporovaná metóda")
+        except ApiError as e:
+            return e.status, {"error": str(e)}
+        except KeyError as e:
+            return 404, {"error": f"{e.args[0]} neexistuje"}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+    def _dispatch_item(self, item):
+        status, payload = self.dispatch(item.get("method", "GET").upper(), item["path"], item.get("body"))
+        return {"status": status, "body": payload}
+
+    # ---- HTTP/1.1 s keep-alive ----
+    async def _respond(self, reader, method, target, length):
+        raw = await reader.readexactly(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            return 400, {"error": "neplatný JSON"}
+        try:
+            if method.upper() == "GET":
+                return self.dispatch(method.upper(), target, body)
+            async with self._writing:
+                return self.dispatch(method.upper(), target, body)
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                length = headers.get("content-length") or "0"
+                if not (length.isascii() and length.isdigit()):
+                    # bez platnej dĺžky sa nedá nájsť koniec tela – spojenie sa po odpovedi zavrie
+                    status, payload = 400, {"error": "neplatná hlavička Content-Length"}
+                    keep_alive = False
+                else:
+                    status, payload = await self._respond(reader, method, target, int(length))
+                out = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                        "Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(out)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode("latin-1") + out
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _refresh_shared(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(SHARED_POLL_MS / 1000)
+            if self._dirty or not self.store.changed_on_disk():
+                continue
+            async with self._writing:
+                try:
+                    fetched = await loop.run_in_executor(None, self.store.fetch)
+                except (OSError, TimeoutError):
+                    continue
+                if not self._dirty:
+                    self.store.reload(self.data, fetched)
+                    self.links.rebuild(self.data)
+
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT):
+        self._writing = asyncio.Lock()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if self.store:
+            asyncio.get_running_loop().create_task(self._refresh_shared())
+        print(f"QA Manager API beží na http://{host}:{port}/api/")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.flush()
+
+
+def run_server(host=SERVER_HOST, port=SERVER_PORT, path=None):
+    try:
+        asyncio.run(QAServer(path).serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+# ===== NÁHĽAD SCREENSHOTOV =====
+# Súbor sa číta (a s Pillow aj dekóduje a zmenšuje) v pozadí, hlavné vlákno
+# si výsledky vyzdvihuje cez after(). Hotové PhotoImage sa držia v LRU cache.
+PREVIEW_MAX_SIZE = (360, 240)
+PREVIEW_CACHE_SIZE = 32
+PREVIEW_POLL_MS = 40
+
+
+def _read_preview(path, max_size):
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        from PIL import Image
+    except ImportError:
+        # bez Pillow zvládne Tk len PNG/GIF a zmenšenie spraví až hlavné vlákno
+        return raw, False
+    img = Image.open(io.BytesIO(raw))
+    img.thumbnail(max_size)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue(), True
+
+
+class ImagePreviewCache:
+    def __init__(self, widget, max_size=PREVIEW_MAX_SIZE, capacity=PREVIEW_CACHE_SIZE):
+        self.widget = widget
+        self.max_size = max_size
+        self.capacity = capacity
+        self._images = OrderedDict()  # cesta -> PhotoImage
+        self._pending = set()
+        self._callbacks = {}
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="preview")
+        self._polling = False
+
+    def get(self, path, callback=None):
+        if path in self._images:
+            self._images.move_to_end(path)
+            if callback:
+                callback(path, self._images[path])
+            return
+        if callback:
+            self._callbacks[path] = callback
+        if path not in self._pending:
+            self._pending.add(path)
+            self._executor.submit(self._load, path)
+        if not self._polling:
+            self._polling = True
+            self.widget.after(PREVIEW_POLL_MS, self._poll)
+
+    def prefetch(self, path):
+        if path and path not in self._images:
+            self.get(path)
+
+    def _load(self, path):
+        try:
+            self._results.put((path, _read_preview(path, self.max_size)))
+        except Exception:
+            self._results.put((path, None))
+
+    def _to_photo(self, payload):
+        raw, scaled = payload
+        photo = tk.PhotoImage(data=base64.b64encode(raw))
+        if not scaled:
+            factor = max(
+                -(-photo.width() // self.max_size[0]),
+                -(-photo.height() // self.max_size[1]),
+                1,
+            )
+            if factor > 1:
+                photo = photo.subsample(factor)
+        return photo
+
+    def _poll(self):
+        while True:
+            try:
+                path, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(path)
+            photo = None
+            if payload is not None:
+                try:
+                    photo = self._to_photo(payload)
+                except tk.TclError:
+                    photo = None
+            if photo is not None:
+                # chyba sa nepamätá – súbor sa môže neskôr objaviť alebo dopísať
+                self._images[path] = photo
+                self._images.move_to_end(path)
+                while len(self._images) > self.capacity:
+                    self._images.popitem(last=False)
+            callback = self._callbacks.pop(path, None)
+            if callback:
+                callback(path, photo)
+
+        if self._pending:
+            self.widget.after(PREVIEW_POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def clear(self):
+        self._images.clear()
+
+
+# ===== ÚLOHY NA POZADÍ =====
+# Dlhé akcie (exporty, ukladanie, reset) bežia vo vláknach poolu. Úlohy čakajú
+# v prioritnej fronte, úlohy s rovnakým "lane" idú po sebe (napr. všetky zápisy
+# do databázy), ostatné paralelne. Výsledky si hlavné vlákno vyzdvihuje cez after().
+JOB_WORKERS = 2
+JOB_POLL_MS = 100
+JOB_PRIORITY_HIGH = 0
+JOB_PRIORITY_NORMAL = 5
+JOB_PRIORITY_LOW = 10
+JOB_PROGRESS_EVERY = 500  # záznamov medzi dvoma hláseniami priebehu
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    _ids = itertools.count(1)
+
+    def __init__(self, title, function, priority, lane, owner, on_done, on_error):
+        self.id = next(Job._ids)
+        self.title = title
+        self.function = function
+        self.priority = priority
+        self.lane = lane
+        self.owner = owner  # napr. projekt, ktorého dáta úloha číta
+        self.on_done = on_done
+        self.on_error = on_error
+        self.status = "queued"  # queued / running / done / failed / cancelled
+        self.done = 0
+        self.total = 0
+        self.text = ""
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.title)
+
+    def progress(self, done, total=None, text=None):
+        # volá sa z vlákna úlohy; zároveň je to miesto, kde sa úloha dá prerušiť
+        self.check()
+        self.done = done
+        if total is not None:
+            self.total = total
+        if text is not None:
+            self.text = text
+
+    @property
+    def percent(self):
+        if not self.total:
+            return None
+        return min(100, 100 * self.done // self.total)
+
+
+class JobScheduler:
+    def __init__(self, widget, workers=JOB_WORKERS):
+        self.widget = widget
+        self.jobs = []  # čakajúce a bežiace, v poradí zadania
+        self._heap = []
+        self._seq = itertools.count()
+        self._busy_lanes = set()
+        self._cond = threading.Condition()
+        self._results = queue.Queue()
+        self._listeners = []
+        self._polling = False
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"job-{i}", daemon=True).start()
+
+    def submit(self, title, function, priority=JOB_PRIORITY_NORMAL, lane=None, owner=None,
+               on_done=None, on_error=None):
+        # function(job) beží vo vlákne, on_done(result) / on_error(chyba) v hlavnom vlákne
+        job = Job(title, function, priority, lane, owner, on_done, on_error)
+        self.jobs.append(job)
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._cond.notify()
+        self._notify()
+        if not self._polling:
+            self._polling = True
+            self.widget.after(JOB_POLL_MS, self._poll)
+        return job
+
+    def pending(self, lane=None, owner=None):
+        return [
+            job for job in self.jobs
+            if (lane is None or job.lane == lane) and (owner is None or job.owner is owner)
+        ]
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+
+    def _take(self):
+        # najvyššia priorita, ktorej lane je voľný; volá sa pod self._cond
+        skipped = []
+        job = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if entry[2].lane is not None and entry[2].lane in self._busy_lanes:
+                skipped.append(entry)
+                continue
+            job = entry[2]
+            break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        if job is not None and job.lane is not None:
+            self._busy_lanes.add(job.lane)
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._take()
+                while job is None:
+                    self._cond.wait()
+                    job = self._take()
+            if job.cancelled:
+                self._results.put((job, "cancelled", None))
+                continue
+            job.status = "running"
+            try:
+                self._results.put((job, "done", job.function(job)))
+            except JobCancelled:
+                self._results.put((job, "cancelled", None))
+            except Exception as e:
+                self._results.put((job, "failed", e))
+
+    def _poll(self):
+        while True:
+            try:
+                job, status, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            job.status = status
+            self.jobs.remove(job)
+            try:
+                if status == "done" and job.on_done:
+                    job.on_done(value)
+                elif status == "failed" and job.on_error:
+                    job.on_error(value)
+            except Exception as e:
+                self.widget.report_callback_exception(type(e), e, e.__traceback__)
+            finally:
+                # lane sa uvoľní až po callbacku – ten ešte môže siahať na rovnaké súbory
+                if job.lane is not None:
+                    with self._cond:
+                        self._busy_lanes.discard(job.lane)
+                        self._cond.notify_all()
+
+        self._notify()
+        if self.jobs:
+            self.widget.after(JOB_POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback(self.jobs)
+
+
+# ===== DETAIL PO ČASTIACH =====
+# Detail TC / bugu sa do tk.Text vkladá po blokoch riadkov – ďalší blok až keď
+# používateľ doroluje ku koncu. Obrovské polia sa skrátia a dajú sa rozbaliť.
+# Formulár (truncate=False) sa dopĺňa celý, ale postupne cez after().
+DETAIL_CHUNK_LINES = 200
+DETAIL_FIELD_LIMIT = 2000
+FORM_FILL_MS = 10
+
+
+class ChunkedText:
+    def __init__(self, widget, truncate=True, background=False):
+        self.widget = widget
+        self.truncate = truncate
+        self.background = background
+        self._lines = []
+        self._pos = 0
+        self._job = None
+        self._scheduled = False
+        self._expanders = {}
+        widget.config(yscrollcommand=self._on_scroll)
+        widget.tag_config("expand_link", foreground="#1a73e8", underline=True)
+        widget.tag_bind("expand_link", "<Enter>", lambda e: widget.config(cursor="hand2"))
+        widget.tag_bind("expand_link", "<Leave>", lambda e: widget.config(cursor=""))
+
+    @property
+    def pending(self):
+        return self._pos < len(self._lines)
+
+    def clear(self):
+        self.set_lines([])
+
+    def set_lines(self, lines):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        for tag in self._expanders:
+            self.widget.tag_delete(tag)
+            self.widget.mark_unset(tag + "_start")
+        self._expanders = {}
+        self.widget.delete("1.0", "end")
+        self._lines = lines
+        self._pos = 0
+        self._insert_chunk()
+        self._schedule_background()
+
+    def complete(self):
+        # pred čítaním obsahu (uloženie formulára) musí byť vložené všetko
+        while self.pending:
+            self._insert_chunk()
+
+    def _schedule_background(self):
+        if self.background and self.pending and self._job is None:
+            self._job = self.widget.after(FORM_FILL_MS, self._background_step)
+
+    def _background_step(self):
+        self._job = None
+        self._insert_chunk()
+        self._schedule_background()
+
+    def _insert_chunk(self):
+        end = min(self._pos + DETAIL_CHUNK_LINES, len(self._lines))
+        batch = []
+        for i in range(self._pos, end):
+            text = self._lines[i]
+            if i:
+                batch.append("\n")
+            if self.truncate and len(text) > DETAIL_FIELD_LIMIT:
+                self.widget.insert("end", "".join(batch))
+                batch = []
+                self._insert_truncated(text)
+            else:
+                batch.append(text)
+        if batch:
+            self.widget.insert("end", "".join(batch))
+        self._pos = end
+
+    def _insert_truncated(self, text):
+        tag = f"expand{len(self._expanders)}"
+        self._expanders[tag] = text
+        mark = tag + "_start"
+        self.widget.mark_set(mark, "end-1c")
+        self.widget.mark_gravity(mark, "left")
+        self.widget.insert("end", text[:DETAIL_FIELD_LIMIT])
+        self.widget.insert("end", f" … [zobraziť celé – {len(text)} znakov]", ("expand_link", tag))
+        self.widget.tag_bind(tag, "<Button-1>", lambda e, tag=tag: self._expand(tag))
+
+    def _expand(self, tag):
+        ranges = self.widget.tag_ranges(tag)
+        if not ranges:
+            return
+        start = self.widget.index(tag + "_start")
+        self.widget.delete(start, ranges[-1])
+        self.widget.insert(start, self._expanders[tag])
+
+    def _on_scroll(self, first, last):
+        if self.pending and float(last) > 0.9 and not self._scheduled:
+            self._scheduled = True
+            self.widget.after_idle(self._load_more)
+
+    def _load_more(self):
+        self._scheduled = False
+        if self.pending:
+            self._insert_chunk()
+
+
+# ===== POPISKY RIADKOV ZOZNAMOV =====
+# Popisok riadku sa pamätá spolu s hodnotami polí, z ktorých vznikol – pri
+# obnovení zoznamu sa nanovo formátujú len záznamy, ktorých polia sa zmenili.
+# Listbox sa potom prepíše len v zmenených riadkoch, inak celý jedným volaním.
+ROW_UPDATE_LIMIT = 50
+
+
+class RowLabels:
+    # Popisky riadkov jedného zoznamu. Posledný výsledok sa pamätá a editačné cesty
+    # hlásia zmenené záznamy (changed) alebo mazanie a výmenu dát (reset) – obnovenie
+    # bez zmien tak na záznamy nesiaha, úprava prepočíta len svoj riadok a nové
+    # záznamy na konci zoznamu sa len doplnia.
+    def __init__(self, template, *fields):
+        self.template = template
+        self._values = operator.itemgetter(*fields)
+        self._rows = None  # (zoznam záznamov, prejdený počet, kľúč filtra, popisky, {id: riadok})
+        self._changed = {}  # id -> záznam zmenený od posledného rows()
+
+    def label(self, record):
+        return self.template.format(*self._values(record))
+
+    def changed(self, record):
+        if record is not None:
+            self._changed[record.get("id")] = record
+
+    def reset(self):
+        self._rows = None
+        self._changed.clear()
+
+    def rows(self, records, keep=None, key=None):
+        # keep – filter záznamov, key – jeho hodnota (iný filter = iný zoznam riadkov)
+        cached = self._rows
+        if cached is None or cached[0] is not records or cached[2] != key or cached[1] > len(records):
+            return self._build(records, keep, key)
+        _, count, _, labels, positions = cached
+        added = {id(record) for record in itertools.islice(records, count, None)}
+        for record_id, record in self._changed.items():
+            row = positions.get(record_id)
+            shown = keep is None or keep(record)
+            if row is None and (not shown or id(record) in added):
+                continue
+            if row is None or not shown:
+                return self._build(records, keep, key)  # záznam pribudol do filtra alebo z neho vypadol
+            labels[row] = self.label(record)
+        self._changed.clear()
+        for record in itertools.islice(records, count, None):
+            if keep is None or keep(record):
+                positions[record.get("id")] = len(labels)
+                labels.append(self.label(record))
+        self._rows = (records, len(records), key, labels, positions)
+        return labels
+
+    def _build(self, records, keep, key):
+        labels = []
+        positions = {}
+        for record in records:
+            if keep is None or keep(record):
+                positions[record.get("id")] = len(labels)
+                labels.append(self.label(record))
+        self._changed.clear()
+        self._rows = (records, len(records), key, labels, positions)
+        return labels
+
+
+def update_listbox(listbox, shown, labels):
+    # shown: zoznam popiskov, ktoré listbox práve zobrazuje (upraví sa na labels)
+    listbox.selection_clear(0, "end")
+    if shown == labels:
+        return  # nezmenené riadky sú tie isté reťazce – porovnanie bez prechodu v Pythone
+    if len(shown) == len(labels):
+        changed = [i for i, (old, new) in enumerate(zip(shown, labels)) if old != new]
+        if len(changed) <= ROW_UPDATE_LIMIT:
+            for i in changed:
+                listbox.delete(i)
+                listbox.insert(i, labels[i])
+            shown[:] = labels
+            return
+    listbox.delete(0, "end")
+    if labels:
+        listbox.insert("end", *labels)
+    shown[:] = labels
+
+
+# ===== PROJEKTY =====
+# Každý projekt má vlastný dátový súbor a vedľa neho históriu, index a archív.
+# Naposledy použité projekty ostávajú otvorené aj s postavenými indexmi, takže
+# prepnutie na ne je len výmena objektov. Keď odhad ich pamäte prekročí rozpočet
+# (alebo ich je viac ako WORKSPACE_WARM_LIMIT), najdlhšie nepoužitý sa zatvorí.
+WORKSPACES_FILE = "qa_workspaces.json"
+WORKSPACE_WARM_LIMIT = 4  # okrem aktívneho projektu
+WORKSPACE_MEMORY_BUDGET = 512 * 1024 * 1024
+WORKSPACE_RECORD_BYTES = 600  # nenačítaný lazy záznam: súhrnné polia a položky v indexoch
+WORKSPACE_LOADED_BYTES = 3000  # záznam celý v pamäti
+
+
+def archive_dir(path):
+    # qa_data_gui.json má archív v qa_archive (pôvodné umiestnenie), iný projekt v <názov>_archive
+    folder, name = os.path.split(path)
+    if name == os.path.basename(DATA_FILE):
+        return os.path.join(folder, ARCHIVE_DIR)
+    return os.path.join(folder, os.path.splitext(name)[0] + "_archive")
+
+
+def project_path(path):
+    # ten istý súbor vždy pod tým istým kľúčom (dialógy vracajú absolútne cesty)
+    path = os.path.abspath(path)
+    return DATA_FILE if path == os.path.abspath(DATA_FILE) else path
+
+
+def export_path(filename, path=DATA_FILE):
+    # qa_data_gui.json exportuje do pôvodných qa_export.*, iný projekt do <názov>_qa_export.*
+    # vedľa svojho súboru – projekty si neprepisujú exporty ani cache
+    path = project_path(path)
+    if path == DATA_FILE:
+        return filename
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f"{os.path.splitext(name)[0]}_{filename}")
+
+
+def load_workspace_list(path=WORKSPACES_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        projects = list(dict.fromkeys(project_path(p) for p in saved.get("projects", []) if isinstance(p, str)))
+        active = saved.get("active")
+        active = project_path(active) if isinstance(active, str) else None
+    except (OSError, ValueError, AttributeError):
+        projects, active = [], None
+    if not projects:
+        projects = [DATA_FILE]
+    if active not in projects:
+        active = projects[0]
+    return projects, active
+
+
+def save_workspace_list(projects, active, path=WORKSPACES_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"projects": projects, "active": active}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class Workspace:
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.store = SharedStore(path) if SHARED_STORAGE else None
+        self.data = self.store.load() if self.store else load_data(path)
+        self.repaired = False  # dáta sa pri otvorení opravili a treba ich uložiť
+        self.footprint = 0  # odhad pamäte, keď projekt nie je aktívny
+
+    def build(self):
+        # indexy a história – až po prípadnej oprave dát (kontrola integrity)
+        self.links = LinkGraph(self.data)
+        self.dup_index = BugDuplicateIndex(self.data["bug_reports"])
+        self.quick_index = QuickOpenIndex(self.data)
+        self.archive = ArchiveStore(archive_dir(self.path))
+        self.history = RecordHistory(history_path(self.path))
+        self.history.commit(self.data)
+        self.links.reserve(issued_ids(self.history, self.archive))
+        self.row_labels = {
+            "test_scenarios": RowLabels("{} – {}", "id", "title"),
+            "test_cases": RowLabels("{} – {} [{}]", "id", "title", "status"),
+            "bug_reports": RowLabels("{} – {} [{}]", "id", "title", "severity"),
+        }
+        return self
+
+    def memory(self):
+        # hrubý odhad – stačí na porovnanie s rozpočtom, nie na presné meranie
+        total = 0
+        for name in COLLECTIONS:
+            for record in self.data.get(name, []):
+                lazy = isinstance(record, LazyRecord) and not record.loaded
+                total += WORKSPACE_RECORD_BYTES if lazy else WORKSPACE_LOADED_BYTES
+        return total
+
+    def close(self):
+        close_data(self.data)
+
+
+def _workspace_attr(name):
+    # QAApp pracuje s self.data, self.links, … – tie patria aktívnemu projektu
+    return property(
+        lambda self: getattr(self.workspace, name),
+        lambda self, value: setattr(self.workspace, name, value),
+    )
+
+
 class QAApp(tk.Tk):
+    data = _workspace_attr("data")
+    store = _workspace_attr("store")
+    links = _workspace_attr("links")
+    dup_index = _workspace_attr("dup_index")
+    quick_index = _workspace_attr("quick_index")
+    archive = _workspace_attr("archive")
+    history = _workspace_attr("history")
+    row_labels = _workspace_attr("row_labels")
+
     def __init__(self):
         super().__init__()
-        self.title("QA Manager – Test Cases, Scenáre & Bugy")
         self.geometry("1000x650")
 
-        self.data = load_data()
+        self.projects, active = load_workspace_list()
+        self.warm = OrderedDict()  # cesta -> Workspace, od najdlhšie nepoužitého
+        try:
+            self.workspace = self.open_workspace(active)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Chyba", f"Projekt {active} sa nepodarilo otvoriť: {e}")
+            try:
+                self.workspace = self.open_workspace(DATA_FILE)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Chyba", f"Projekt {DATA_FILE} sa nepodarilo otvoriť: {e}")
+                self.destroy()
+                raise SystemExit(1)
+        self.update_title()
+        self._save_jobs = {}  # cesta projektu -> úloha uloženia
+        self._save_snapshots = {}  # cesta projektu -> stav, ktorý má úloha uložiť
+        self._shared_jobs = {}  # cesta projektu -> zlúčenie / načítanie v zdieľanom režime
+        self._dup_job = None
+        self._shown_rows = {name: [] for name in COLLECTIONS}
+        self.jobs = JobScheduler(self)
+        self._reset_job = None
+        self._closing = False
         self.dark_mode = False
 
         # výbery na úpravu / mazanie
@@ -43,6 +4399,7 @@ class QAApp(tk.Tk):
         self._styled_listbox_widgets = []
 
         self.create_menu()
+        self.create_status_bar()
 
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill="both", expand=True)
@@ -53,6 +4410,327 @@ class QAApp(tk.Tk):
 
         self.apply_theme()
 
+        if self.store:
+            self.after(SHARED_POLL_MS, self.poll_shared_changes)
+        self.bind_all("<Control-p>", self.open_quick_open)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after_idle(self.build_indexes)
+        if self.workspace.repaired:
+            self.save()
+
+    # ===== PROJEKTY =====
+    def update_title(self):
+        self.title(f"QA Manager – Test Cases, Scenáre & Bugy [{self.workspace.name}]")
+
+    def open_workspace(self, path):
+        ws = Workspace(path)
+        ws.repaired = self.repair_on_load(ws.data)
+        return ws.build()
+
+    def switch_workspace(self, path):
+        path = project_path(path)
+        if path == self.workspace.path:
+            return True
+        ws = self.warm.pop(path, None)
+        if ws is None:
+            try:
+                ws = self.open_workspace(path)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Chyba", f"Projekt {path} sa nepodarilo otvoriť: {e}")
+                return False
+
+        previous = self.workspace
+        previous.footprint = previous.memory()
+        self.warm[previous.path] = previous
+        self.workspace = ws
+        if path not in self.projects:
+            self.projects.append(path)
+        self.evict_workspaces()
+        self.remember_projects()
+
+        self.update_title()
+        self.bug_screenshot_path = None
+        if hasattr(self, "bug_screenshot_label"):
+            self.bug_screenshot_label.config(text="Žiadny súbor nevybraný")
+        self.refresh_all()
+        if ws.quick_index.building or ws.dup_index.building:
+            self.after_idle(self.build_indexes)
+        if ws.repaired:
+            ws.repaired = False
+            self.save()
+        return True
+
+    def evict_workspaces(self):
+        # zatvára najdlhšie nepoužité projekty, kým sa teplé nezmestia do limitu a rozpočtu
+        total = self.workspace.memory() + sum(ws.footprint for ws in self.warm.values())
+        for path, ws in list(self.warm.items()):
+            if len(self.warm) <= WORKSPACE_WARM_LIMIT and total <= WORKSPACE_MEMORY_BUDGET:
+                break
+            if self.jobs.pending(owner=ws):
+                continue  # ešte sa ukladá alebo exportuje
+            del self.warm[path]
+            total -= ws.footprint
+            ws.close()
+
+    def remember_projects(self):
+        try:
+            save_workspace_list(self.projects, self.workspace.path)
+        except OSError:
+            pass  # zoznam projektov je len pohodlie, práca s dátami ide ďalej
+
+    def new_project(self):
+        path = filedialog.asksaveasfilename(
+            title="Nový projekt",
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+        )
+        if path and self.switch_workspace(path) and not os.path.exists(path):
+            self.save()
+
+    def open_project(self):
+        path = filedialog.askopenfilename(
+            title="Otvoriť projekt",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+        )
+        if path:
+            self.switch_workspace(path)
+
+    def fill_project_menu(self):
+        menu = self.project_menu
+        menu.delete(0, "end")
+        menu.add_command(label="Nový projekt…", command=self.new_project)
+        menu.add_command(label="Otvoriť projekt…", command=self.open_project)
+        menu.add_separator()
+        self.project_var.set(self.workspace.path)
+        for path in self.projects:
+            name = os.path.splitext(os.path.basename(path))[0]
+            label = f"{name} (v pamäti)" if path in self.warm else name
+            menu.add_radiobutton(
+                label=label, value=path, variable=self.project_var,
+                command=lambda p=path: self.switch_workspace(p),
+            )
+
+    # ===== UKLADANIE =====
+    def save(self, ws=None):
+        ws = ws or self.workspace
+        if ws.store is None:
+            if LAZY_STORAGE and not SHARDED_STORAGE:
+                self.save_in_background(ws)
+            else:
+                save_data(ws.data, ws.path)
+                ws.history.commit(ws.data)
+            return True
+
+        self.save_shared(ws)
+        return True
+
+    # ===== ZDIEĽANÝ REŽIM =====
+    def shared_busy(self, ws):
+        if self._reset_job is not None and self._reset_job.owner is ws:
+            return True  # databáza sa vyprázdňuje – zlúči sa až po resete
+        job = self._shared_jobs.get(ws.path)
+        return job is not None and job.status in ("queued", "running")
+
+    def save_shared(self, ws):
+        # zámok súboru a zlúčenie sú na pozadí – GUI len odovzdá kópiu zmenených záznamov
+        if self.shared_busy(ws):
+            return  # po dokončení bežiacej úlohy sa lokálne zmeny skontrolujú znova
+        snapshot, sent = ws.store.snapshot(ws.data)
+        self._shared_jobs[ws.path] = self.jobs.submit(
+            f"Ukladanie ({ws.name})", lambda job: self._shared_save_job(job, ws, snapshot, sent[1]),
+            JOB_PRIORITY_HIGH, lane="storage", owner=ws,
+            on_done=lambda result: self._shared_saved(ws, snapshot, sent, result),
+            on_error=self._save_failed,
+        )
+
+    def _shared_save_job(self, job, ws, snapshot, changed):
+        remote = ws.store.changed_on_disk()
+        conflicts, renamed = ws.store.save(snapshot, changed)
+        ws.history.commit(snapshot)
+        return conflicts, renamed, remote
+
+    def _shared_saved(self, ws, snapshot, sent, result):
+        conflicts, renamed, remote = result
+        ws.store.adopt(ws.data, snapshot, sent)
+        self._shared_synced(ws, remote or renamed)
+
+        if conflicts or renamed:
+            lines = []
+            for old_id, new_id in renamed.items():
+                lines.append(f"{old_id} už existoval, uložený ako {new_id}")
+            for name, record_id, reason, _ in conflicts:
+                lines.append(f"{record_id}: {reason}")
+            if conflicts:
+                lines.append("")
+                lines.append(f"Lokálne verzie sú uložené v {ws.store.conflicts_path}")
+            messagebox.showwarning("Konflikty pri ukladaní", "\n".join(lines))
+
+    def _shared_reload_job(self, job, ws):
+        fetched = ws.store.fetch()
+        ws.history.commit(fetched[0])
+        return fetched
+
+    def _shared_reloaded(self, ws, fetched):
+        if ws.store.has_local_changes(ws.data):
+            # kým sa čítalo, pribudli lokálne zmeny – zlúčia sa pri uložení
+            self.save_shared(ws)
+            return
+        ws.store.reload(ws.data, fetched)
+        self._shared_synced(ws, True)
+
+    def _shared_synced(self, ws, refresh):
+        # záznamy sa nahradili zlúčenými – indexy nanovo, zoznamy len pri zmenách zvonka
+        self.reindex(ws)
+        if refresh and ws is self.workspace:
+            self.refresh_all()
+        if ws.store.has_local_changes(ws.data):
+            self.save_shared(ws)
+
+    def poll_shared_changes(self):
+        # v GUI vlákne len podpis súboru a príznaky zmien; čítanie a zlúčenie bežia na pozadí
+        ws = self.workspace
+        if not self.shared_busy(ws) and ws.store.changed_on_disk():
+            if ws.store.has_local_changes(ws.data):
+                self.save_shared(ws)
+            else:
+                self._shared_jobs[ws.path] = self.jobs.submit(
+                    f"Načítanie zmien ({ws.name})", lambda job: self._shared_reload_job(job, ws),
+                    JOB_PRIORITY_HIGH, lane="storage", owner=ws,
+                    on_done=lambda fetched: self._shared_reloaded(ws, fetched),
+                )
+        self.after(SHARED_POLL_MS, self.poll_shared_changes)
+
+    def save_in_background(self, ws):
+        # stav sa zachytí teraz; uloženie, ktoré ešte nezačalo, dostane ten novší
+        self._save_snapshots[ws.path] = snapshot_data(ws.data)
+        pending = self._save_jobs.get(ws.path)
+        if pending is not None and pending.status == "queued":
+            return
+        self._save_jobs[ws.path] = self.jobs.submit(
+            f"Ukladanie ({ws.name})", lambda job: self._save_job(job, ws), JOB_PRIORITY_HIGH,
+            lane="storage", owner=ws,
+            on_error=self._save_failed,
+        )
+
+    def _save_job(self, job, ws):
+        snapshot = self._save_snapshots.pop(ws.path, None)
+        if snapshot is None:
+            return  # stav už uložila predchádzajúca úloha
+        total = sum(len(snapshot[name]) for name in COLLECTIONS)
+        save_data(snapshot, ws.path, progress=lambda done: job.progress(done, total))
+        # odtlačky pre históriu sa počítajú tu, nie v GUI vlákne
+        ws.history.commit(snapshot)
+
+    def _save_failed(self, error):
+        messagebox.showerror("Chyba", f"Zmeny sa nepodarilo uložiť: {error}")
+
+    def reindex(self, ws=None):
+        # po načítaní / zlúčení dát zvonka sa indexy postavia nanovo
+        ws = ws or self.workspace
+        ws.links.rebuild(ws.data)
+        building = ws.dup_index.building or ws.quick_index.building
+        ws.dup_index.rebuild(ws.data["bug_reports"])
+        ws.quick_index.rebuild(ws.data)
+        for labels in ws.row_labels.values():
+            labels.reset()
+        if not building and ws is self.workspace:
+            self.after_idle(self.build_indexes)
+
+    def build_indexes(self):
+        # indexy duplicít a rýchleho otvorenia sa stavajú po dávkach, aby GUI nezamrzlo
+        if self.quick_index.building:
+            self.quick_index.build_step()
+            self.after(1, self.build_indexes)
+        elif self.dup_index.build_step():
+            self.after(1, self.build_indexes)
+        else:
+            self.schedule_duplicate_check()
+
+    def index_record(self, name, record):
+        self.quick_index.update(name, record)
+        self.row_labels[name].changed(record)
+        if name == "bug_reports":
+            self.dup_index.update(record)
+            # bug označí svoj TC ako FAILED (mark_tc_failed)
+            self.row_labels["test_cases"].changed(self.links.record("test_cases", record.get("related_tc")))
+
+    def prune_indexes(self):
+        # po mazaní (aj kaskádovom) vyhodí z indexov záznamy, ktoré už neexistujú
+        self.quick_index.retain(self.links.records)
+        self.dup_index.retain(self.links.records["bug_reports"])
+        for labels in self.row_labels.values():
+            labels.reset()  # riadky za zmazaným záznamom sa posunuli
+
+    def refresh_all(self):
+        self.refresh_ts_list()
+        self.refresh_tc_ts_combobox()
+        self.refresh_tc_list()
+        self.refresh_bug_tc_combobox()
+        self.refresh_bug_list()
+        self.selected_ts_index = None
+        self.selected_tc_id = None
+        self.selected_bug_id = None
+
+    # ===== ÚLOHY NA POZADÍ =====
+    def create_status_bar(self):
+        bar = ttk.Frame(self)
+        bar.pack(side="bottom", fill="x")
+        self.status_label = ttk.Label(bar, text="", anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True, padx=5, pady=2)
+        self.job_cancel_button = ttk.Button(bar, text="Zrušiť", command=self.cancel_job)
+        self.job_progress = ttk.Progressbar(bar, length=160, mode="determinate", maximum=100)
+        self._status_text = ""
+        self._monitored_job = None
+        self.jobs.add_listener(self.update_job_monitor)
+
+    def set_status(self, text):
+        self._status_text = text
+        if not self.jobs.jobs:
+            self.status_label.config(text=text)
+
+    def update_job_monitor(self, jobs):
+        if not jobs:
+            self._monitored_job = None
+            self.job_progress.pack_forget()
+            self.job_cancel_button.pack_forget()
+            self.status_label.config(text=self._status_text)
+            return
+
+        job = next((j for j in jobs if j.status == "running"), jobs[0])
+        text = job.title if job.status == "running" else f"{job.title} (čaká)"
+        if job.text:
+            text += f" – {job.text}"
+        percent = job.percent
+        if percent is not None:
+            text += f" {percent} %"
+        if len(jobs) > 1:
+            text += f"   (+{len(jobs) - 1} v rade)"
+        self.status_label.config(text=text)
+        self.job_progress["value"] = percent or 0
+        if self._monitored_job is None:
+            self.job_cancel_button.pack(side="right", padx=5, pady=2)
+            self.job_progress.pack(side="right", pady=2)
+        self._monitored_job = job
+
+    def cancel_job(self):
+        job = self._monitored_job
+        if job is not None and not job.cancelled:
+            job.cancel()
+            self._status_text = f"Zrušené: {job.title}"
+
+    def on_close(self):
+        # rozbehnuté exporty sa zrušia, uloženie sa ešte dokončí
+        if self.jobs.pending("storage"):
+            if not self._closing:
+                self._closing = True
+                for job in self.jobs.pending("export"):
+                    job.cancel()
+                self._status_text = "Dokončujem ukladanie…"
+            self.after(JOB_POLL_MS, self.on_close)
+            return
+        self.jobs.cancel_all()
+        self.destroy()
+
     # ===== MENU =====
     def create_menu(self):
         menubar = tk.Menu(self)
@@ -62,16 +4740,34 @@ class QAApp(tk.Tk):
         file_menu.add_command(label="Export do HTML", command=self.export_to_html)
         file_menu.add_command(label="Export do Word", command=self.export_to_word)
         file_menu.add_command(label="Export do PDF", command=self.export_to_pdf)
+        file_menu.add_command(label="Export všetkých formátov", command=self.export_all)
+        file_menu.add_command(label="Export analytiky (CSV/Parquet)", command=self.export_analytics)
+        file_menu.add_command(label="Export stavu k dátumu…", command=self.export_as_of)
         file_menu.add_separator()
+        file_menu.add_command(label="Archivovať uzavreté TS", command=self.archive_closed_scenarios)
+        file_menu.add_command(label="Archív…", command=self.show_archive)
         file_menu.add_command(label="Resetovať databázu", command=self.reset_database)
         file_menu.add_separator()
-        file_menu.add_command(label="Koniec", command=self.quit)
+        file_menu.add_command(label="Koniec", command=self.on_close)
         menubar.add_cascade(label="Súbor", menu=file_menu)
 
+        self.project_var = tk.StringVar()
+        self.project_menu = tk.Menu(menubar, tearoff=0, postcommand=self.fill_project_menu)
+        menubar.add_cascade(label="Projekt", menu=self.project_menu)
+
         view_menu = tk.Menu(menubar, tearoff=0)
         view_menu.add_command(label="Prepnúť Dark Mode", command=self.toggle_dark_mode)
         menubar.add_cascade(label="Zobrazenie", menu=view_menu)
 
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="Rýchle otvorenie…", accelerator="Ctrl+P", command=self.open_quick_open)
+        tools_menu.add_command(label="Osirelé odkazy", command=self.show_orphan_report)
+        tools_menu.add_command(label="Import JUnit výsledkov…", command=self.import_junit_results)
+        tools_menu.add_command(label="Kontrola integrity…", command=self.check_integrity)
+        tools_menu.add_command(label="Porovnať so súborom…", command=self.compare_with_file)
+        tools_menu.add_command(label="Porovnať so stavom k dátumu…", command=self.compare_with_date)
+        menubar.add_cascade(label="Nástroje", menu=tools_menu)
+
         self.config(menu=menubar)
 
     def toggle_dark_mode(self):
@@ -148,14 +4844,14 @@ class QAApp(tk.Tk):
         title = self.ts_title_var.get().strip()
         desc = self.ts_desc_text.get("1.0", "end").strip()
 
-        if not title:
-            messagebox.showerror("Chyba", "Názov TS nemôže byť prázdny.")
+        try:
+            ts = create_ts(self.data, title, desc, links=self.links)
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
             return
-
-        ts_id = generate_id("TS", self.data["test_scenarios"])
-        ts = {"id": ts_id, "title": title, "description": desc}
-        self.data["test_scenarios"].append(ts)
-        save_data(self.data)
+        ts_id = ts["id"]
+        self.index_record("test_scenarios", ts)
+        self.save()
 
         self.ts_title_var.set("")
         self.ts_desc_text.delete("1.0", "end")
@@ -191,22 +4887,21 @@ class QAApp(tk.Tk):
         title = self.ts_title_var.get().strip()
         desc = self.ts_desc_text.get("1.0", "end").strip()
 
-        if not title:
-            messagebox.showerror("Chyba", "Názov TS nemôže byť prázdny.")
-            return
-
         ts = self.data["test_scenarios"][self.selected_ts_index]
-        ts["title"] = title
-        ts["description"] = desc
-        save_data(self.data)
+        try:
+            edit_ts(self.data, ts["id"], title, desc, links=self.links)
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
+            return
+        self.index_record("test_scenarios", ts)
+        self.save()
         self.refresh_ts_list()
         self.apply_theme()
         messagebox.showinfo("OK", f"Test scenár {ts['id']} bol upravený.")
 
     def refresh_ts_list(self):
-        self.ts_list.delete(0, "end")
-        for ts in self.data["test_scenarios"]:
-            self.ts_list.insert("end", f"{ts['id']} – {ts['title']}")
+        rows = self.row_labels["test_scenarios"].rows(self.data["test_scenarios"])
+        update_listbox(self.ts_list, self._shown_rows["test_scenarios"], rows)
 
     def delete_ts(self):
         selection = self.ts_list.curselection()
@@ -218,14 +4913,22 @@ class QAApp(tk.Tk):
             return
         ts = self.data["test_scenarios"][index]
 
+        linked = len(self.links.linked("test_scenarios", ts["id"]))
+        policy = DELETE_POLICIES["test_scenarios"]
         if not messagebox.askyesno(
             "Vymazať TS",
-            f"Naozaj chceš vymazať {ts['id']} – {ts['title']}?\n\nTest Cases, ktoré naň odkazujú, zostanú nezmenené."
+            f"Naozaj chceš vymazať {ts['id']} – {ts['title']}?\n\n"
+            f"Test Cases, ktoré naň odkazujú ({linked}), {DELETE_POLICY_TEXT[policy]}."
         ):
             return
 
-        del self.data["test_scenarios"][index]
-        save_data(self.data)
+        try:
+            remove_ts(self.data, ts["id"], links=self.links)
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
+            return
+        self.prune_indexes()
+        self.save()
         self.refresh_ts_list()
         self.refresh_tc_ts_combobox()
         self.selected_ts_index = None
@@ -318,6 +5021,9 @@ class QAApp(tk.Tk):
         self.tc_detail = tk.Text(middle, width=50)
         self.tc_detail.pack(side="left", fill="both", expand=True, padx=(5, 0), pady=5)
 
+        self.tc_detail_view = ChunkedText(self.tc_detail)
+        self.tc_steps_form = ChunkedText(self.tc_steps_text, truncate=False, background=True)
+
         self._styled_text_widgets.append(self.tc_steps_text)
         self._styled_text_widgets.append(self.tc_detail)
         self._styled_listbox_widgets.append(self.tc_list)
@@ -333,41 +5039,37 @@ class QAApp(tk.Tk):
         title = self.tc_title_var.get().strip()
         pre = self.tc_pre_var.get().strip()
         ts_id = self.tc_ts_var.get().strip() or None
+        self.tc_steps_form.complete()
         steps_raw = self.tc_steps_text.get("1.0", "end").strip()
         expected = self.tc_exp_var.get().strip()
         actual = self.tc_act_var.get().strip()
         status = self.tc_status_var.get().strip() or "NOT RUN"
 
-        if not title:
-            messagebox.showerror("Chyba", "Názov TC nemôže byť prázdny.")
-            return
-        if not steps_raw:
-            messagebox.showerror("Chyba", "Musíš zadať aspoň jeden krok.")
+        try:
+            tc = create_tc(
+                self.data,
+                title=title,
+                steps=steps_raw,
+                preconditions=pre,
+                ts_id=ts_id,
+                expected=expected,
+                actual=actual,
+                status=status,
+                links=self.links,
+            )
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
             return
-
-        steps = [s.strip() for s in steps_raw.splitlines() if s.strip()]
-
-        tc_id = generate_id("TC", self.data["test_cases"])
-        tc = {
-            "id": tc_id,
-            "title": title,
-            "preconditions": pre,
-            "ts_id": ts_id,
-            "steps": steps,
-            "expected": expected,
-            "actual": actual,
-            "status": status.upper(),
-        }
-
-        self.data["test_cases"].append(tc)
-        save_data(self.data)
+        tc_id = tc["id"]
+        self.index_record("test_cases", tc)
+        self.save()
 
         self.refresh_bug_tc_combobox()
 
         self.tc_title_var.set("")
         self.tc_pre_var.set("")
         self.tc_ts_var.set("")
-        self.tc_steps_text.delete("1.0", "end")
+        self.tc_steps_form.clear()
         self.tc_exp_var.set("")
         self.tc_act_var.set("")
         self.tc_status_var.set("NOT RUN")
@@ -378,15 +5080,15 @@ class QAApp(tk.Tk):
         messagebox.showinfo("OK", f"Test case {tc_id} uložený.")
 
     def refresh_tc_list(self, event=None):
-        self.tc_list.delete(0, "end")
-        self.tc_detail.delete("1.0", "end")
+        self.tc_detail_view.clear()
 
         filter_val = self.tc_filter_var.get()
-        for tc in self.data["test_cases"]:
-            if filter_val != "ALL" and tc["status"] != filter_val:
-                continue
-            line = f"{tc['id']} – {tc['title']} [{tc['status']}]"
-            self.tc_list.insert("end", line)
+        rows = self.row_labels["test_cases"].rows(
+            self.data["test_cases"],
+            keep=None if filter_val == "ALL" else lambda tc: tc["status"] == filter_val,
+            key=filter_val,
+        )
+        update_listbox(self.tc_list, self._shown_rows["test_cases"], rows)
 
         self.selected_tc_id = None
 
@@ -408,7 +5110,6 @@ class QAApp(tk.Tk):
 
         self.selected_tc_id = tc["id"]
 
-        self.tc_detail.delete("1.0", "end")
         lines = []
         lines.append(f"ID: {tc['id']}")
         lines.append(f"Názov: {tc['title']}")
@@ -423,14 +5124,13 @@ class QAApp(tk.Tk):
         lines.append(f"Skutočný výsledok: {tc['actual']}")
         lines.append(f"Stav: {tc['status']}")
 
-        self.tc_detail.insert("1.0", "\n".join(lines))
+        self.tc_detail_view.set_lines(lines)
 
         # naplň formulár
         self.tc_title_var.set(tc["title"])
         self.tc_pre_var.set(tc["preconditions"])
         self.tc_ts_var.set(tc["ts_id"] or "")
-        self.tc_steps_text.delete("1.0", "end")
-        self.tc_steps_text.insert("1.0", "\n".join(tc["steps"]))
+        self.tc_steps_form.set_lines(tc["steps"])
         self.tc_exp_var.set(tc["expected"])
         self.tc_act_var.set(tc["actual"])
         self.tc_status_var.set(tc["status"])
@@ -443,32 +5143,34 @@ class QAApp(tk.Tk):
         title = self.tc_title_var.get().strip()
         pre = self.tc_pre_var.get().strip()
         ts_id = self.tc_ts_var.get().strip() or None
+        self.tc_steps_form.complete()
         steps_raw = self.tc_steps_text.get("1.0", "end").strip()
         expected = self.tc_exp_var.get().strip()
         actual = self.tc_act_var.get().strip()
         status = self.tc_status_var.get().strip() or "NOT RUN"
 
-        if not title:
-            messagebox.showerror("Chyba", "Názov TC nemôže byť prázdny.")
+        try:
+            tc = edit_tc(
+                self.data,
+                self.selected_tc_id,
+                title=title,
+                steps=steps_raw,
+                preconditions=pre,
+                ts_id=ts_id,
+                expected=expected,
+                actual=actual,
+                status=status,
+                links=self.links,
+            )
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
             return
-        if not steps_raw:
-            messagebox.showerror("Chyba", "Musíš zadať aspoň jeden krok.")
+        except KeyError:
+            messagebox.showerror("Chyba", "Test case sa nenašiel.")
             return
 
-        steps = [s.strip() for s in steps_raw.splitlines() if s.strip()]
-
-        for tc in self.data["test_cases"]:
-            if tc["id"] == self.selected_tc_id:
-                tc["title"] = title
-                tc["preconditions"] = pre
-                tc["ts_id"] = ts_id
-                tc["steps"] = steps
-                tc["expected"] = expected
-                tc["actual"] = actual
-                tc["status"] = status.upper()
-                break
-
-        save_data(self.data)
+        self.index_record("test_cases", tc)
+        self.save()
         self.refresh_tc_list()
         self.refresh_bug_tc_combobox()
         self.apply_theme()
@@ -479,29 +5181,32 @@ class QAApp(tk.Tk):
             messagebox.showerror("Chyba", "Najprv vyber test case zo zoznamu.")
             return
 
-        tc_to_delete = None
-        for tc in self.data["test_cases"]:
-            if tc["id"] == self.selected_tc_id:
-                tc_to_delete = tc
-                break
-
+        tc_to_delete = self.links.record("test_cases", self.selected_tc_id)
         if not tc_to_delete:
             messagebox.showerror("Chyba", "Test case sa nenašiel.")
             return
 
+        linked = len(self.links.linked("test_cases", tc_to_delete["id"]))
+        policy = DELETE_POLICIES["test_cases"]
         if not messagebox.askyesno(
             "Vymazať TC",
-            f"Naozaj chceš vymazať {tc_to_delete['id']} – {tc_to_delete['title']}?\n\nBugy, ktoré naň odkazujú, zostanú s rovnakým ID TC."
+            f"Naozaj chceš vymazať {tc_to_delete['id']} – {tc_to_delete['title']}?\n\n"
+            f"Bugy, ktoré naň odkazujú ({linked}), {DELETE_POLICY_TEXT[policy]}."
         ):
             return
 
-        self.data["test_cases"] = [tc for tc in self.data["test_cases"] if tc["id"] != self.selected_tc_id]
-        save_data(self.data)
+        try:
+            remove_tc(self.data, self.selected_tc_id, links=self.links)
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
+            return
+        self.prune_indexes()
+        self.save()
 
         self.tc_title_var.set("")
         self.tc_pre_var.set("")
         self.tc_ts_var.set("")
-        self.tc_steps_text.delete("1.0", "end")
+        self.tc_steps_form.clear()
         self.tc_exp_var.set("")
         self.tc_act_var.set("")
         self.tc_status_var.set("NOT RUN")
@@ -564,6 +5269,13 @@ class QAApp(tk.Tk):
             row=8, column=0, sticky="w", padx=5, pady=5
         )
 
+        # kandidáti na duplicitu sa hľadajú priebežne pri písaní
+        self.bug_dup_label = ttk.Label(form_frame, text="")
+        self.bug_dup_label.grid(row=8, column=1, sticky="w", padx=5, pady=5)
+        self.bug_title_var.trace_add("write", self.schedule_duplicate_check)
+        self.bug_act_var.trace_add("write", self.schedule_duplicate_check)
+        self.bug_steps_text.bind("<KeyRelease>", self.schedule_duplicate_check)
+
         ttk.Button(form_frame, text="Uložiť Bug", command=self.add_bug).grid(
             row=9, column=1, sticky="e", padx=5, pady=5
         )
@@ -584,8 +5296,20 @@ class QAApp(tk.Tk):
         self.bug_list.pack(side="left", fill="both", expand=True, padx=(0, 5), pady=5)
         self.bug_list.bind("<<ListboxSelect>>", self.show_bug_detail)
 
-        self.bug_detail = tk.Text(middle, width=50)
-        self.bug_detail.pack(side="left", fill="both", expand=True, padx=(5, 0), pady=5)
+        detail_frame = ttk.Frame(middle)
+        detail_frame.pack(side="left", fill="both", expand=True, padx=(5, 0), pady=5)
+
+        self.bug_detail = tk.Text(detail_frame, width=50)
+        self.bug_detail.pack(side="top", fill="both", expand=True)
+
+        # náhľad screenshotu pod detailom
+        self.bug_preview = ttk.Label(detail_frame, anchor="center")
+        self.bug_preview.pack(side="top", fill="x", pady=(5, 0))
+        self._preview_path = None
+        self.preview_cache = ImagePreviewCache(self)
+
+        self.bug_detail_view = ChunkedText(self.bug_detail)
+        self.bug_steps_form = ChunkedText(self.bug_steps_text, truncate=False, background=True)
 
         self._styled_text_widgets.append(self.bug_steps_text)
         self._styled_text_widgets.append(self.bug_detail)
@@ -607,6 +5331,25 @@ class QAApp(tk.Tk):
             file_name = os.path.basename(file_path)
             self.bug_screenshot_label.config(text=f"Vybraný: {file_name}")
 
+    def schedule_duplicate_check(self, *args):
+        if self._dup_job is not None:
+            self.after_cancel(self._dup_job)
+        self._dup_job = self.after(DUPLICATE_DELAY_MS, self.check_duplicates)
+
+    def check_duplicates(self):
+        self._dup_job = None
+        text = " ".join([
+            self.bug_title_var.get(),
+            self.bug_steps_text.get("1.0", "end"),
+            self.bug_act_var.get(),
+        ])
+        similar = self.dup_index.similar(text, exclude=self.selected_bug_id)
+        if similar:
+            found = ", ".join(f"{bug_id} ({score:.0%})" for bug_id, score in similar)
+            self.bug_dup_label.config(text=f"Možné duplicity: {found}")
+        else:
+            self.bug_dup_label.config(text="")
+
     def refresh_bug_tc_combobox(self):
         ids = [tc["id"] for tc in self.data["test_cases"]]
         self.bug_tc_combo["values"] = ids
@@ -614,6 +5357,7 @@ class QAApp(tk.Tk):
     def add_bug(self):
         title = self.bug_title_var.get().strip()
         tc_id = self.bug_tc_var.get().strip()
+        self.bug_steps_form.complete()
         steps_raw = self.bug_steps_text.get("1.0", "end").strip()
         expected = self.bug_exp_var.get().strip()
         actual = self.bug_act_var.get().strip()
@@ -621,42 +5365,29 @@ class QAApp(tk.Tk):
         note = self.bug_note_var.get().strip()
         screenshot = self.bug_screenshot_path
 
-        if not title:
-            messagebox.showerror("Chyba", "Názov chyby nemôže byť prázdny.")
-            return
-        if not steps_raw:
-            messagebox.showerror("Chyba", "Musíš zadať kroky k reprodukcii.")
+        try:
+            bug = create_bug(
+                self.data,
+                title=title,
+                steps=steps_raw,
+                related_tc=tc_id,
+                expected=expected,
+                actual=actual,
+                severity=severity,
+                note=note,
+                screenshot=screenshot,
+                links=self.links,
+            )
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
             return
-
-        steps = [s.strip() for s in steps_raw.splitlines() if s.strip()]
-
-        bug_id = generate_id("BUG", self.data["bug_reports"])
-        bug = {
-            "id": bug_id,
-            "title": title,
-            "related_tc": tc_id,
-            "steps": steps,
-            "expected": expected,
-            "actual": actual,
-            "severity": severity,
-            "note": note,
-            "screenshot": screenshot,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        }
-
-        self.data["bug_reports"].append(bug)
-
-        if tc_id:
-            for tc in self.data["test_cases"]:
-                if tc["id"] == tc_id:
-                    tc["status"] = "FAILED"
-                    break
-
-        save_data(self.data)
+        bug_id = bug["id"]
+        self.index_record("bug_reports", bug)
+        self.save()
 
         self.bug_title_var.set("")
         self.bug_tc_var.set("")
-        self.bug_steps_text.delete("1.0", "end")
+        self.bug_steps_form.clear()
         self.bug_exp_var.set("")
         self.bug_act_var.set("")
         self.bug_sev_var.set("Medium")
@@ -671,13 +5402,31 @@ class QAApp(tk.Tk):
         messagebox.showinfo("OK", f"Bug {bug_id} uložený.")
 
     def refresh_bug_list(self):
-        self.bug_list.delete(0, "end")
-        self.bug_detail.delete("1.0", "end")
-        for bug in self.data["bug_reports"]:
-            line = f"{bug['id']} – {bug['title']} [{bug['severity']}]"
-            self.bug_list.insert("end", line)
+        self.bug_detail_view.clear()
+        self.show_bug_preview(None)
+        rows = self.row_labels["bug_reports"].rows(self.data["bug_reports"])
+        update_listbox(self.bug_list, self._shown_rows["bug_reports"], rows)
         self.selected_bug_id = None
 
+    def show_bug_preview(self, path):
+        self._preview_path = path
+        if not path:
+            self.bug_preview.config(image="", text="")
+            self.bug_preview.image = None
+            return
+        self.bug_preview.config(image="", text="Načítavam náhľad…")
+        self.preview_cache.get(path, self._on_preview_ready)
+
+    def _on_preview_ready(self, path, photo):
+        if path != self._preview_path:
+            return  # medzičasom vybraný iný bug
+        if photo is None:
+            self.bug_preview.config(image="", text="Náhľad nie je dostupný")
+            self.bug_preview.image = None
+        else:
+            self.bug_preview.config(image=photo, text="")
+            self.bug_preview.image = photo
+
     def show_bug_detail(self, event):
         selection = self.bug_list.curselection()
         if not selection:
@@ -688,7 +5437,6 @@ class QAApp(tk.Tk):
         bug = self.data["bug_reports"][index]
         self.selected_bug_id = bug["id"]
 
-        self.bug_detail.delete("1.0", "end")
         lines = []
         lines.append(f"ID: {bug['id']}")
         lines.append(f"Názov: {bug['title']}")
@@ -710,13 +5458,18 @@ class QAApp(tk.Tk):
             lines.append("")
             lines.append(f"Poznámka: {bug['note']}")
 
-        self.bug_detail.insert("1.0", "\n".join(lines))
+        self.bug_detail_view.set_lines(lines)
+        self.show_bug_preview(screenshot)
+
+        # susedné bugy sa načítajú dopredu, aby bol pohyb v zozname okamžitý
+        for neighbour in (index - 1, index + 1):
+            if 0 <= neighbour < len(self.data["bug_reports"]):
+                self.preview_cache.prefetch(self.data["bug_reports"][neighbour].get("screenshot"))
 
         # naplň formulár
         self.bug_title_var.set(bug["title"])
         self.bug_tc_var.set(bug["related_tc"])
-        self.bug_steps_text.delete("1.0", "end")
-        self.bug_steps_text.insert("1.0", "\n".join(bug["steps"]))
+        self.bug_steps_form.set_lines(bug["steps"])
         self.bug_exp_var.set(bug["expected"])
         self.bug_act_var.set(bug["actual"])
         self.bug_sev_var.set(bug["severity"])
@@ -735,6 +5488,7 @@ class QAApp(tk.Tk):
 
         title = self.bug_title_var.get().strip()
         tc_id = self.bug_tc_var.get().strip()
+        self.bug_steps_form.complete()
         steps_raw = self.bug_steps_text.get("1.0", "end").strip()
         expected = self.bug_exp_var.get().strip()
         actual = self.bug_act_var.get().strip()
@@ -742,34 +5496,29 @@ class QAApp(tk.Tk):
         note = self.bug_note_var.get().strip()
         screenshot = self.bug_screenshot_path
 
-        if not title:
-            messagebox.showerror("Chyba", "Názov chyby nemôže byť prázdny.")
+        try:
+            bug = edit_bug(
+                self.data,
+                self.selected_bug_id,
+                title=title,
+                steps=steps_raw,
+                related_tc=tc_id,
+                expected=expected,
+                actual=actual,
+                severity=severity,
+                note=note,
+                screenshot=screenshot,
+                links=self.links,
+            )
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
             return
-        if not steps_raw:
-            messagebox.showerror("Chyba", "Musíš zadať kroky k reprodukcii.")
+        except KeyError:
+            messagebox.showerror("Chyba", "Bug sa nenašiel.")
             return
 
-        steps = [s.strip() for s in steps_raw.splitlines() if s.strip()]
-
-        for bug in self.data["bug_reports"]:
-            if bug["id"] == self.selected_bug_id:
-                bug["title"] = title
-                bug["related_tc"] = tc_id
-                bug["steps"] = steps
-                bug["expected"] = expected
-                bug["actual"] = actual
-                bug["severity"] = severity
-                bug["note"] = note
-                bug["screenshot"] = screenshot
-                break
-
-        if tc_id:
-            for tc in self.data["test_cases"]:
-                if tc["id"] == tc_id:
-                    tc["status"] = "FAILED"
-                    break
-
-        save_data(self.data)
+        self.index_record("bug_reports", bug)
+        self.save()
         self.refresh_bug_list()
         self.refresh_tc_list()
         self.apply_theme()
@@ -780,12 +5529,7 @@ class QAApp(tk.Tk):
             messagebox.showerror("Chyba", "Najprv vyber bug zo zoznamu.")
             return
 
-        bug_to_delete = None
-        for bug in self.data["bug_reports"]:
-            if bug["id"] == self.selected_bug_id:
-                bug_to_delete = bug
-                break
-
+        bug_to_delete = self.links.record("bug_reports", self.selected_bug_id)
         if not bug_to_delete:
             messagebox.showerror("Chyba", "Bug sa nenašiel.")
             return
@@ -796,12 +5540,13 @@ class QAApp(tk.Tk):
         ):
             return
 
-        self.data["bug_reports"] = [bug for bug in self.data["bug_reports"] if bug["id"] != self.selected_bug_id]
-        save_data(self.data)
+        remove_bug(self.data, self.selected_bug_id, links=self.links)
+        self.prune_indexes()
+        self.save()
 
         self.bug_title_var.set("")
         self.bug_tc_var.set("")
-        self.bug_steps_text.delete("1.0", "end")
+        self.bug_steps_form.clear()
         self.bug_exp_var.set("")
         self.bug_act_var.set("")
         self.bug_sev_var.set("Medium")
@@ -814,404 +5559,625 @@ class QAApp(tk.Tk):
         messagebox.showinfo("OK", "Bug bol vymazaný.")
 
     # ===== EXPORTY =====
+    def run_export(self, formats, data=None, suffix="", variant=""):
+        writers = []
+        for fmt in formats:
+            try:
+                writer = EXPORT_WRITERS[fmt]()
+                writer.filename = export_path(writer.filename, self.workspace.path)
+                if suffix:
+                    base, ext = os.path.splitext(writer.filename)
+                    writer.filename = f"{base}_{suffix}{ext}"
+                writers.append(writer)
+            except TemplateError as e:
+                messagebox.showerror("Chyba v šablóne", str(e))
+            except ImportError:
+                package = MISSING_PACKAGES[fmt]
+                messagebox.showerror(
+                    "Chýbajúci balík",
+                    f"Na export do {EXPORT_WRITERS[fmt].label} potrebuješ balík '{package}'.\n"
+                    f"Nainštaluj ho napríklad príkazom:\n\npip install {package}"
+                )
+        if not writers:
+            return
+
+        # živé dáta sa zachytia teraz – export nevidí zmeny urobené počas behu
+        if data is None:
+            snapshot = snapshot_data(self.data)
+        else:
+            snapshot = {name: list(data[name]) for name in COLLECTIONS}
+        total = sum(len(records) for records in snapshot.values())
+        cache_path = export_path(EXPORT_CACHE_FILE, self.workspace.path)
+
+        def work(job):
+            ctx = ExportContext(ExportCache(cache_path, variant))
+            return run_export(snapshot, writers, ctx, progress=lambda done: job.progress(done, total))
+
+        def done(ctx):
+            created = ", ".join(w.filename for w in writers)
+            self.set_status(f"Export vytvorený: {created} – {ctx.cache.summary()}")
+            for warning in ctx.warnings:
+                messagebox.showwarning("Export", warning)
+
+        def failed(error):
+            messagebox.showerror("Export", f"Export sa nepodaril: {error}")
+
+        title = "Export " + ", ".join(w.label for w in writers)
+        self.jobs.submit(
+            title, work, JOB_PRIORITY_LOW, lane="export", owner=self.workspace, on_done=done, on_error=failed,
+        )
+
     def export_to_txt(self):
-        filename = "qa_export.txt"
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write("=== TEST SCENÁRE ===\n\n")
-            for ts in self.data["test_scenarios"]:
-                f.write(f"{ts['id']} – {ts['title']}\n")
-                if ts["description"]:
-                    f.write(f"Popis: {ts['description']}\n")
-                f.write("-" * 60 + "\n")
-
-            f.write("\n=== TEST CASES ===\n\n")
-            for tc in self.data["test_cases"]:
-                f.write(f"ID: {tc['id']}\n")
-                f.write(f"Názov: {tc['title']}\n")
-                f.write(f"TS: {tc['ts_id']}\n")
-                f.write(f"Predpoklady: {tc['preconditions']}\n")
-                f.write("Kroky:\n")
-                for i, step in enumerate(tc["steps"], start=1):
-                    f.write(f"  {i}. {step}\n")
-                f.write(f"Očakávaný výsledok: {tc['expected']}\n")
-                f.write(f"Skutočný výsledok: {tc['actual']}\n")
-                f.write(f"Stav: {tc['status']}\n")
-                f.write("-" * 60 + "\n")
-
-            f.write("\n=== BUG REPORTS ===\n\n")
-            for bug in self.data["bug_reports"]:
-                f.write(f"ID: {bug['id']}\n")
-                f.write(f"Názov: {bug['title']}\n")
-                f.write(f"Test Case: {bug['related_tc']}\n")
-                f.write(f"Severity: {bug['severity']}\n")
-                f.write("Kroky k reprodukcii:\n")
-                for i, step in enumerate(bug["steps"], start=1):
-                    f.write(f"  {i}. {step}\n")
-                f.write(f"Očakávaný výsledok: {bug['expected']}\n")
-                f.write(f"Skutočný výsledok: {bug['actual']}\n")
-                screenshot = bug.get("screenshot")
-                if screenshot:
-                    f.write(f"Screenshot: {screenshot}\n")
-                if bug["note"]:
-                    f.write(f"Poznámka: {bug['note']}\n")
-                f.write(f"Vytvorené: {bug['created_at']}\n")
-                f.write("-" * 60 + "\n")
-
-        messagebox.showinfo("Export", f"TXT export vytvorený: {filename}")
+        self.run_export(["txt"])
 
     def export_to_html(self):
-        filename = "qa_export.html"
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(
-                "<html><head><meta charset='utf-8'>"
-                "<title>QA Export</title>"
-                "<style>"
-                "body{font-family:Arial, sans-serif;}"
-                "h1,h2{color:#333;}"
-                ".section{margin-bottom:30px;}"
-                ".card{border:1px solid #ccc;padding:10px;margin:5px 0;}"
-                ".bug{border-color:#f00;}"
-                "table{border-collapse:collapse;width:100%;margin:5px 0;}"
-                "th,td{border:1px solid #ccc;padding:4px;font-size:12px;}"
-                "th{background:#f5f5f5;}"
-                "</style>"
-                "</head><body>"
-            )
-            f.write("<h1>QA Export</h1>")
-            f.write(f"<p>Vygenerované: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>")
-
-            # Test scenáre
-            f.write("<div class='section'><h2>Test Scenáre</h2>")
-            for ts in self.data["test_scenarios"]:
-                f.write("<div class='card'>")
-                f.write(f"<strong>{ts['id']}</strong> – {ts['title']}<br>")
-                if ts["description"]:
-                    f.write(f"<em>Popis:</em> {ts['description']}<br>")
-                f.write("</div>")
-            f.write("</div>")
-
-            # Test Cases
-            f.write("<div class='section'><h2>Test Cases</h2>")
-            for tc in self.data["test_cases"]:
-                f.write("<div class='card'>")
-                f.write(f"<strong>{tc['id']}</strong> – {tc['title']}<br>")
-                f.write(f"<strong>TS:</strong> {tc['ts_id']}<br>")
-                f.write(f"<strong>Predpoklady:</strong> {tc['preconditions']}<br>")
-                f.write("<strong>Kroky:</strong><ol>")
-                for step in tc["steps"]:
-                    f.write(f"<li>{step}</li>")
-                f.write("</ol>")
-                f.write(f"<strong>Očakávaný:</strong> {tc['expected']}<br>")
-                f.write(f"<strong>Skutočný:</strong> {tc['actual']}<br>")
-                f.write(f"<strong>Stav:</strong> {tc['status']}<br>")
-                f.write("</div>")
-            f.write("</div>")
-
-            # Bug Reports
-            f.write("<div class='section'><h2>Bug Reports</h2>")
-            for bug in self.data["bug_reports"]:
-                f.write("<div class='card bug'>")
-                f.write(f"<strong>{bug['id']}</strong> – {bug['title']}<br>")
-                f.write(f"<strong>Test Case:</strong> {bug['related_tc']}<br>")
-                f.write(f"<strong>Severity:</strong> {bug['severity']}<br>")
-                f.write(f"<strong>Vytvorené:</strong> {bug['created_at']}<br>")
-                f.write("<strong>Kroky k reprodukcii:</strong><ol>")
-                for step in bug["steps"]:
-                    f.write(f"<li>{step}</li>")
-                f.write("</ol>")
-                f.write(f"<strong>Očakávaný:</strong> {bug['expected']}<br>")
-                f.write(f"<strong>Skutočný:</strong> {bug['actual']}<br>")
-
-                screenshot = bug.get("screenshot")
-                if screenshot:
-                    web_path = screenshot.replace("\\", "/")
-                    f.write("<strong>Screenshot:</strong><br>")
-                    f.write(
-                        f"<img src='{web_path}' "
-                        f"style='max-width:400px; max-height:300px; border:1px solid #ccc;'><br>"
-                    )
+        self.run_export(["html"])
+
+    def export_to_word(self):
+        self.run_export(["docx"])
 
-                if bug["note"]:
-                    f.write(f"<strong>Poznámka:</strong> {bug['note']}<br>")
-                f.write("</div>")
-            f.write("</div>")
+    def export_to_pdf(self):
+        self.run_export(["pdf"])
 
-            f.write("</body></html>")
+    def export_analytics(self):
+        self.run_export(["analytics"])
 
-        messagebox.showinfo("Export", f"HTML export vytvorený: {filename}")
+    def export_all(self):
+        self.run_export(["txt", "html", "docx", "pdf"])
 
-    def export_to_word(self):
+    def export_as_of(self):
+        text = simpledialog.askstring(
+            "Export stavu k dátumu",
+            "Stav databázy k času (RRRR-MM-DD alebo RRRR-MM-DD HH:MM):",
+            parent=self,
+        )
+        if not text:
+            return
         try:
-            from docx import Document
-            from docx.shared import Inches
-        except ImportError:
-            messagebox.showerror(
-                "Chýbajúci balík",
-                "Na export do Wordu potrebuješ balík 'python-docx'.\n"
-                "Nainštaluj ho napríklad príkazom:\n\npip install python-docx"
-            )
+            when = parse_timestamp(text)
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
             return
+        data = self.history.as_of(when)
+        if not any(data[name] for name in COLLECTIONS):
+            messagebox.showinfo("Export", f"K času {when} história neobsahuje žiadne záznamy.")
+            return
+        suffix = when.replace("-", "").replace(":", "").replace(" ", "_")
+        self.run_export(["txt", "html", "docx", "pdf"], data=data, suffix=suffix, variant="asof")
+
+    # ===== RÝCHLE OTVORENIE =====
+    def open_quick_open(self, event=None):
+        win = tk.Toplevel(self)
+        win.title("Rýchle otvorenie")
+        win.transient(self)
+        win.geometry("520x360")
+
+        query_var = tk.StringVar()
+        entry = ttk.Entry(win, textvariable=query_var)
+        entry.pack(side="top", fill="x", padx=10, pady=(10, 5))
+        results = tk.Listbox(win, activestyle="dotbox")
+        results.pack(side="top", fill="both", expand=True, padx=10, pady=(0, 10))
+        self._styled_listbox_widgets.append(results)
+        self.apply_theme()
 
-        doc = Document()
-
-        # Hlavný nadpis
-        doc.add_heading("QA Test Report", level=1)
-        doc.add_paragraph(f"Vygenerované: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-        # ===== TEST SCENÁRE =====
-        doc.add_page_break()
-        doc.add_heading("Test Scenáre", level=2)
-
-        if self.data["test_scenarios"]:
-            table = doc.add_table(rows=1, cols=3)
-            table.style = "Table Grid"
-
-            hdr_cells = table.rows[0].cells
-            hdr_cells[0].text = "ID"
-            hdr_cells[1].text = "Názov"
-            hdr_cells[2].text = "Popis"
-
-            for ts in self.data["test_scenarios"]:
-                row_cells = table.add_row().cells
-                row_cells[0].text = ts["id"]
-                row_cells[1].text = ts["title"] or ""
-                row_cells[2].text = ts["description"] or ""
-        else:
-            doc.add_paragraph("Žiadne test scenáre.", style="Intense Quote")
-
-        # ===== TEST CASES =====
-        doc.add_page_break()
-        doc.add_heading("Test Cases", level=2)
-
-        if self.data["test_cases"]:
-            table = doc.add_table(rows=1, cols=8)
-            table.style = "Table Grid"
-
-            hdr_cells = table.rows[0].cells
-            hdr_cells[0].text = "ID"
-            hdr_cells[1].text = "Názov"
-            hdr_cells[2].text = "TS"
-            hdr_cells[3].text = "Predpoklady"
-            hdr_cells[4].text = "Kroky"
-            hdr_cells[5].text = "Očakávaný výsledok"
-            hdr_cells[6].text = "Skutočný výsledok"
-            hdr_cells[7].text = "Stav"
-
-            for tc in self.data["test_cases"]:
-                row_cells = table.add_row().cells
-                row_cells[0].text = tc["id"]
-                row_cells[1].text = tc["title"] or ""
-                row_cells[2].text = tc["ts_id"] or ""
-                row_cells[3].text = tc["preconditions"] or ""
-                steps_text = "\n".join(tc["steps"]) if tc["steps"] else ""
-                row_cells[4].text = steps_text
-                row_cells[5].text = tc["expected"] or ""
-                row_cells[6].text = tc["actual"] or ""
-                row_cells[7].text = tc["status"] or ""
+        found = []
+
+        def search(*args):
+            found[:] = [key for key in self.quick_index.search(query_var.get()) if self.links.record(*key)]
+            results.delete(0, "end")
+            for name, record_id in found:
+                record = self.links.record(name, record_id)
+                results.insert("end", f"{record_id} – {record.get('title', '')} ({QUICK_OPEN_KINDS[name]})")
+            if found:
+                results.selection_set(0)
+                results.activate(0)
+
+        def move(step):
+            if found:
+                current = results.curselection()
+                index = min(max((current[0] if current else -1) + step, 0), len(found) - 1)
+                results.selection_clear(0, "end")
+                results.selection_set(index)
+                results.activate(index)
+                results.see(index)
+            return "break"
+
+        def choose(event=None):
+            current = results.curselection()
+            if current:
+                name, record_id = found[current[0]]
+                close()
+                self.jump_to_record(name, record_id)
+            return "break"
+
+        def close(event=None):
+            self._styled_listbox_widgets.remove(results)
+            win.destroy()
+
+        query_var.trace_add("write", search)
+        entry.bind("<Down>", lambda e: move(1))
+        entry.bind("<Up>", lambda e: move(-1))
+        entry.bind("<Return>", choose)
+        results.bind("<Double-Button-1>", choose)
+        results.bind("<Return>", choose)
+        win.bind("<Escape>", close)
+        win.protocol("WM_DELETE_WINDOW", close)
+        entry.focus_set()
+        return "break"
+
+    def jump_to_record(self, name, record_id):
+        if name == "test_scenarios":
+            tab, listbox, handler = self.ts_tab, self.ts_list, self.on_ts_select
+            rows = self.data["test_scenarios"]
+        elif name == "test_cases":
+            tab, listbox, handler = self.tc_tab, self.tc_list, self.show_tc_detail
+            record = self.links.record(name, record_id)
+            if self.tc_filter_var.get() not in ("ALL", record["status"]):
+                self.tc_filter_var.set("ALL")
+                self.refresh_tc_list()
+            filter_val = self.tc_filter_var.get()
+            rows = [tc for tc in self.data["test_cases"] if filter_val == "ALL" or tc["status"] == filter_val]
         else:
-            doc.add_paragraph("Žiadne Test Cases.", style="Intense Quote")
-
-        # ===== BUG REPORTS =====
-        doc.add_page_break()
-        doc.add_heading("Bug Reports", level=2)
-
-        if self.data["bug_reports"]:
-            table = doc.add_table(rows=1, cols=9)
-            table.style = "Table Grid"
-
-            hdr_cells = table.rows[0].cells
-            hdr_cells[0].text = "ID"
-            hdr_cells[1].text = "Názov"
-            hdr_cells[2].text = "Test Case"
-            hdr_cells[3].text = "Severity"
-            hdr_cells[4].text = "Kroky k reprodukcii"
-            hdr_cells[5].text = "Očakávaný výsledok"
-            hdr_cells[6].text = "Skutočný výsledok"
-            hdr_cells[7].text = "Poznámka"
-            hdr_cells[8].text = "Vytvorené"
-
-            for bug in self.data["bug_reports"]:
-                row_cells = table.add_row().cells
-                row_cells[0].text = bug["id"]
-                row_cells[1].text = bug["title"] or ""
-                row_cells[2].text = bug["related_tc"] or ""
-                row_cells[3].text = bug["severity"] or ""
-                steps_text = "\n".join(bug["steps"]) if bug["steps"] else ""
-                row_cells[4].text = steps_text
-                row_cells[5].text = bug["expected"] or ""
-                row_cells[6].text = bug["actual"] or ""
-                row_cells[7].text = bug["note"] or ""
-                row_cells[8].text = bug["created_at"] or ""
-
-                screenshot = bug.get("screenshot")
-                if screenshot:
-                    p = doc.add_paragraph()
-                    p.add_run(f"Screenshot pre {bug['id']} – {bug['title']}:\n")
-                    try:
-                        doc.add_picture(screenshot, width=Inches(3))
-                    except Exception as e:
-                        p.add_run(f"(Nepodarilo sa vložiť obrázok: {e})")
-                    doc.add_paragraph("")
+            tab, listbox, handler = self.bug_tab, self.bug_list, self.show_bug_detail
+            rows = self.data["bug_reports"]
+
+        index = next((i for i, record in enumerate(rows) if record["id"] == record_id), None)
+        if index is None:
+            return
+        self.notebook.select(tab)
+        listbox.selection_clear(0, "end")
+        listbox.selection_set(index)
+        listbox.activate(index)
+        listbox.see(index)
+        handler(None)
+
+    # ===== IMPORT JUNIT =====
+    def import_junit_results(self):
+        path = filedialog.askopenfilename(
+            title="Vyber JUnit / xUnit výsledky",
+            filetypes=[("XML files", "*.xml"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        create_bugs = messagebox.askyesno("Import JUnit", "Vytvoriť bug pre každý zlyhaný test?")
+        # aj pri chybe v polovici súboru ostávajú spracované testy zmenené a uložia sa
+        result = import_junit(self.data, path, links=self.links, create_bugs=create_bugs)
+        self.row_labels["test_cases"].reset()  # stav mohol zmeniť ktorýkoľvek TC
+        for bug in result["bugs"]:
+            self.index_record("bug_reports", bug)
+        self.save()
+        self.refresh_tc_list()
+        self.refresh_bug_list()
+        if result["error"] or result["failed"]:
+            messagebox.showwarning("Import JUnit", junit_summary(result))
         else:
-            doc.add_paragraph("Žiadne bug reporty.", style="Intense Quote")
+            messagebox.showinfo("Import JUnit", junit_summary(result))
+
+    # ===== KONTROLA INTEGRITY =====
+    def repair_on_load(self, data):
+        # starší súbor načítaný celý do pamäte sa skontroluje hneď – poškodený
+        # záznam by inak zhodil už naplnenie zoznamov (lazy súbor zapísala táto verzia)
+        if _data_sources(data):
+            return False
+        report = check_integrity(data, check_files=False)
+        if not report.fixable:
+            return False
+        if not messagebox.askyesno(
+            "Kontrola integrity",
+            f"Databáza obsahuje poškodené záznamy ({report.count} problémov).\n"
+            "Opraviť ich teraz? Bez opravy sa databáza neotvorí – skontrolovať ju dá aj "
+            "python qa_manager.py --check."
+        ):
+            # indexy a zoznamy počítajú s platnými záznamami – neopravené dáta sa neotvárajú
+            raise ValueError(f"databáza obsahuje {report.count} neopravených problémov")
+        apply_repair(data, report)
+        return True
 
-        filename = "qa_export_professional.docx"
-        doc.save(filename)
-        messagebox.showinfo("Export", f"Word export (profi) vytvorený: {filename}")
+    def check_integrity(self):
+        data = self.data
+        total = sum(len(data.get(name) or []) for name in COLLECTIONS)
 
-    def export_to_pdf(self):
+        def work(job):
+            return check_integrity(data, progress=lambda done: job.progress(done, total))
+
+        def failed(error):
+            messagebox.showerror("Kontrola integrity", f"Kontrola sa nepodarila: {error}")
+
+        self.jobs.submit(
+            "Kontrola integrity", work, owner=self.workspace,
+            on_done=lambda report: self.show_integrity_report(report, data), on_error=failed,
+        )
+
+    def show_integrity_report(self, report, data):
+        win = tk.Toplevel(self)
+        win.title("Kontrola integrity")
+        win.geometry("620x420")
+
+        text = tk.Text(win, width=70, height=18)
+        text.pack(side="top", fill="both", expand=True, padx=10, pady=10)
+        summary = integrity_summary(report)
+        if report.count and not report.fixable:
+            summary += "\n\nChýbajúce screenshoty sa len hlásia, oprava ich nemení."
+        text.insert("1.0", summary)
+        text.config(state="disabled")
+        self._styled_text_widgets.append(text)
+        self.apply_theme()
+
+        def repair():
+            try:
+                if data is not self.data:
+                    raise ValueError("Databáza sa od kontroly zmenila, spusti kontrolu znova.")
+                fixed = apply_repair(self.data, report)
+            except ValueError as e:
+                messagebox.showerror("Chyba", str(e))
+                return
+            self.reindex()
+            self.save()
+            self.refresh_all()
+            win.destroy()
+            messagebox.showinfo("OK", f"Opravené záznamy: {fixed}")
+
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        ttk.Button(btn_frame, text="Zavrieť", command=win.destroy).pack(side="right")
+        if report.fixable:
+            ttk.Button(btn_frame, text="Opraviť", command=repair).pack(side="right", padx=5)
+
+    # ===== POROVNANIE =====
+    def compare_with_file(self):
+        path = filedialog.askopenfilename(
+            title="Vyber starší snapshot databázy",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+        )
+        if path:
+            self.compare(os.path.basename(path), path=path)
+
+    def compare_with_date(self):
+        text = simpledialog.askstring(
+            "Porovnanie",
+            "Porovnať so stavom k času (RRRR-MM-DD alebo RRRR-MM-DD HH:MM):",
+            parent=self,
+        )
+        if not text:
+            return
         try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.units import cm
-            from reportlab.lib.utils import ImageReader
-            from reportlab.pdfbase import pdfmetrics
-            from reportlab.pdfbase.ttfonts import TTFont
-        except ImportError:
-            messagebox.showerror(
-                "Chýbajúci balík",
-                "Na export do PDF potrebuješ balík 'reportlab'.\n"
-                "Nainštaluj ho napríklad príkazom:\n\npip install reportlab"
-            )
+            when = parse_timestamp(text)
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
             return
+        self.compare(when, old=self.history.as_of(when))
 
-        # Registrujeme Arial z arial.ttf v tom istom priečinku
-        try:
-            pdfmetrics.registerFont(TTFont("Arial", "arial.ttf"))
-            base_font_name = "Arial"
-        except Exception as e:
-            messagebox.showwarning(
-                "Font",
-                f"Nepodarilo sa načítať arial.ttf, použije sa predvolený font (bez diakritiky).\n\n{e}"
-            )
-            base_font_name = "Helvetica"
+    def compare(self, label, old=None, path=None):
+        # starý stav sa (pri súbore) načíta aj porovná na pozadí, aktuálne dáta sa len čítajú
+        current = {name: list(self.data[name]) for name in COLLECTIONS}
 
-        filename = "qa_export.pdf"
-        c = canvas.Canvas(filename, pagesize=A4)
-        width, height = A4
-        y = height - 2 * cm
+        def work(job):
+            before = old if old is not None else load_data(path)
+            try:
+                total = sum(len(before.get(name, [])) + len(current[name]) for name in COLLECTIONS)
+                return diff_datasets(before, current, progress=lambda done: job.progress(done, total))
+            finally:
+                if old is None:
+                    close_data(before)
+
+        def failed(error):
+            messagebox.showerror("Porovnanie", f"Porovnanie sa nepodarilo: {error}")
+
+        self.jobs.submit(
+            f"Porovnanie s {label}", work, owner=self.workspace,
+            on_done=lambda diff: self.show_diff(diff, label), on_error=failed,
+        )
 
-        def new_page():
-            nonlocal y
-            c.showPage()
-            y = height - 2 * cm
-            c.setFont(base_font_name, 10)
+    def show_diff(self, diff, label):
+        win = tk.Toplevel(self)
+        win.title(f"Porovnanie: {label} → aktuálny stav")
+        win.geometry("640x460")
 
-        def write_line(text="", size=10):
-            nonlocal y
-            if y < 2 * cm:
-                new_page()
-            c.setFont(base_font_name, size)
-            c.drawString(2 * cm, y, text)
-            y -= 0.6 * cm
+        text = tk.Text(win, width=72, height=20)
+        text.pack(side="top", fill="both", expand=True, padx=10, pady=10)
+        text.insert("1.0", "Žiadne rozdiely." if diff.empty else diff_summary(diff))
+        text.config(state="disabled")
+        self._styled_text_widgets.append(text)
+        self.apply_theme()
 
-        c.setFont(base_font_name, 10)
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        ttk.Button(btn_frame, text="Zavrieť", command=win.destroy).pack(side="right")
+        if not diff.empty:
+            suffix = "diff_" + re.sub(r"\W+", "_", os.path.splitext(label)[0]).strip("_")
 
-        # Nadpis
-        write_line("QA Test Report", size=16)
-        write_line(f"Vygenerované: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", size=10)
-        y -= 0.5 * cm
-
-        # Test scenáre
-        write_line("Test Scenáre", size=14)
-        y -= 0.2 * cm
-        for ts in self.data["test_scenarios"]:
-            write_line(f"{ts['id']} – {ts['title']}", size=11)
-            if ts["description"]:
-                for line in ts["description"].splitlines():
-                    write_line(f"  {line}", size=10)
-            y -= 0.2 * cm
-        y -= 0.5 * cm
-
-        # Test Cases
-        write_line("Test Cases", size=14)
-        y -= 0.2 * cm
-        for tc in self.data["test_cases"]:
-            write_line(f"{tc['id']} – {tc['title']}", size=11)
-            write_line(f"TS: {tc['ts_id']}", size=10)
-            write_line(f"Predpoklady: {tc['preconditions']}", size=10)
-            write_line("Kroky:", size=10)
-            for i, step in enumerate(tc["steps"], start=1):
-                write_line(f"  {i}. {step}", size=10)
-            write_line(f"Očakávaný výsledok: {tc['expected']}", size=10)
-            write_line(f"Skutočný výsledok: {tc['actual']}", size=10)
-            write_line(f"Stav: {tc['status']}", size=10)
-            y -= 0.4 * cm
-        y -= 0.5 * cm
-
-        # Bug Reports
-        write_line("Bug Reports", size=14)
-        y -= 0.2 * cm
-        for bug in self.data["bug_reports"]:
-            write_line(f"{bug['id']} – {bug['title']}", size=11)
-            write_line(f"Test Case: {bug['related_tc']}", size=10)
-            write_line(f"Severity: {bug['severity']}", size=10)
-            write_line(f"Vytvorené: {bug['created_at']}", size=10)
-            write_line("Kroky k reprodukcii:", size=10)
-            for i, step in enumerate(bug["steps"], start=1):
-                write_line(f"  {i}. {step}", size=10)
-            write_line(f"Očakávaný výsledok: {bug['expected']}", size=10)
-            write_line(f"Skutočný výsledok: {bug['actual']}", size=10)
-
-            screenshot = bug.get("screenshot")
-            if screenshot:
-                y -= 0.2 * cm
-                write_line("Screenshot:", size=10)
-                if y < 8 * cm:
-                    new_page()
-                try:
-                    img = ImageReader(screenshot)
-                    iw, ih = img.getSize()
-                    max_w = width - 4 * cm
-                    max_h = 8 * cm
-                    scale = min(max_w / iw, max_h / ih, 1.0)
-                    img_w = iw * scale
-                    img_h = ih * scale
-                    if y - img_h < 2 * cm:
-                        new_page()
-                    c.drawImage(img, 2 * cm, y - img_h, width=img_w, height=img_h)
-                    y -= img_h + 0.5 * cm
-                except Exception as e:
-                    write_line(f"(Nepodarilo sa vložiť obrázok: {e})", size=9)
-            if bug["note"]:
-                write_line(f"Poznámka: {bug['note']}", size=10)
-            y -= 0.4 * cm
-
-        c.save()
-        messagebox.showinfo("Export", f"PDF export vytvorený: {filename}")
+            def export_diff():
+                self.run_export(["txt", "html", "docx", "pdf"], data=diff_report_data(diff), suffix=suffix,
+                                variant="diff")
+
+            ttk.Button(btn_frame, text="Exportovať rozdiely", command=export_diff).pack(side="right", padx=5)
+
+    # ===== OSIRELÉ ODKAZY =====
+    def show_orphan_report(self):
+        orphans = self.links.orphans()
+
+        win = tk.Toplevel(self)
+        win.title("Osirelé odkazy")
+        win.geometry("520x360")
+
+        text = tk.Text(win, width=60, height=16)
+        text.pack(side="top", fill="both", expand=True, padx=10, pady=10)
+        if orphans:
+            lines = [f"{record_id}: {field} = {target_id} (neexistuje)" for _, record_id, field, target_id in orphans]
+        else:
+            lines = ["Žiadne osirelé odkazy."]
+        text.insert("1.0", "\n".join(lines))
+        text.config(state="disabled")
+        self._styled_text_widgets.append(text)
+        self.apply_theme()
+
+        def clear_links():
+            fixed = nullify_orphans(self.data, self.links)
+            self.save()
+            self.refresh_tc_list()
+            self.refresh_bug_list()
+            win.destroy()
+            messagebox.showinfo("OK", f"Zrušené odkazy: {fixed}")
+
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        ttk.Button(btn_frame, text="Zavrieť", command=win.destroy).pack(side="right")
+        if orphans:
+            ttk.Button(btn_frame, text="Zrušiť osirelé odkazy", command=clear_links).pack(side="right", padx=5)
 
     # ===== RESET DATABÁZY =====
     def reset_database(self):
         if not messagebox.askyesno(
             "Reset databázy",
-            "Naozaj chceš vymazať všetky uložené dáta?\n"
-            "Súbor qa_data_gui.json bude zmazaný a všetko sa vynuluje."
+            "Naozaj chceš vyprázdniť databázu?\n"
+            f"Všetky dáta sa najprv odložia do archívu ({self.archive.directory}) a dajú sa obnoviť."
         ):
             return
+        if self._reset_job is not None and self._reset_job.status in ("queued", "running"):
+            return
 
-        if os.path.exists(DATA_FILE):
-            try:
-                os.remove(DATA_FILE)
-            except OSError as e:
-                messagebox.showerror("Chyba", f"Nepodarilo sa zmazať súbor: {e}")
-                return
-
-        self.data = {"test_scenarios": [], "test_cases": [], "bug_reports": []}
-
-        self.refresh_ts_list()
-        self.refresh_tc_ts_combobox()
-        self.refresh_tc_list()
-        self.refresh_bug_tc_combobox()
-        self.refresh_bug_list()
-        self.selected_ts_index = None
-        self.selected_tc_id = None
-        self.selected_bug_id = None
+        # GUI hneď pracuje s prázdnou databázou, pôvodný stav sa archivuje na pozadí;
+        # čo v GUI medzitým pribudne, sa po dokončení uloží do novej databázy
+        ws = self.workspace
+        snapshot = snapshot_data(ws.data)
+        ws.data = empty_data()
+        self.reindex(ws)
+        self.refresh_all()
         self.bug_screenshot_path = None
         if hasattr(self, "bug_screenshot_label"):
             self.bug_screenshot_label.config(text="Žiadny súbor nevybraný")
-        messagebox.showinfo("Reset", "Databáza bola vymazaná.")
+
+        def work(job):
+            total = sum(len(snapshot[name]) for name in COLLECTIONS)
+            if not total:
+                return None
+            archived = {name: [] for name in COLLECTIONS}
+            done = 0
+            for name in COLLECTIONS:
+                for record in snapshot[name]:
+                    if done % JOB_PROGRESS_EVERY == 0:
+                        job.progress(done, total)
+                    done += 1
+                    archived[name].append(record_view(record))
+            job.progress(total, total, "komprimujem archív")
+            return ws.archive.add(archived, "Reset databázy")
+
+        def failed(error):
+            self._reset_job = None
+            self._undo_reset(ws, snapshot)
+            messagebox.showerror("Chyba", f"Dáta sa nepodarilo archivovať, reset sa nevykonal: {error}")
+
+        self._reset_job = self.jobs.submit(
+            "Reset databázy", work, lane="storage", owner=ws,
+            on_done=lambda segment: self._finish_reset(ws, snapshot, segment), on_error=failed,
+        )
+
+    def _undo_reset(self, ws, snapshot):
+        # pôvodné záznamy sa vrátia, aj so záznamami vytvorenými počas resetu (ID sa nezrazia)
+        for name in COLLECTIONS:
+            ws.data[name] = snapshot[name] + ws.data[name]
+        self.reindex(ws)
+        if ws is self.workspace:
+            self.refresh_all()
+
+    def _finish_reset(self, ws, snapshot, segment):
+        self._reset_job = None
+        sources = _data_sources(snapshot)
+        close_data(snapshot)  # na Windows sa namapovaný súbor nedá zmazať
+        for path in (ws.path, ws.path + INDEX_SUFFIX):
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    for source in sources:
+                        source.open()
+                    self._undo_reset(ws, snapshot)
+                    messagebox.showerror("Chyba", f"Nepodarilo sa zmazať súbor: {e}")
+                    return
+
+        if ws.store:
+            ws.store.reload(empty_data())  # základ pre zlúčenie je prázdna databáza
+        ws.history.commit(ws.data)  # v histórii ostane, čo bolo pred resetom
+        if SHARDED_STORAGE or any(ws.data[name] for name in COLLECTIONS):
+            self.save(ws)  # pri shardoch prázdny manifest, staré shardy sa zmažú
+
+        if segment:
+            messagebox.showinfo("Reset", f"Databáza bola vyprázdnená, pôvodné dáta sú v archíve ({segment['file']}).")
+        else:
+            messagebox.showinfo("Reset", "Databáza bola vyprázdnená.")
+
+    # ===== ARCHÍV =====
+    def archive_closed_scenarios(self):
+        ts_ids = closed_scenarios(self.data, self.links)
+        if not ts_ids:
+            messagebox.showinfo("Archív", "Žiadny TS nie je uzavretý (všetky jeho TC PASSED).")
+            return
+        if not messagebox.askyesno(
+            "Archivovať uzavreté TS",
+            f"Presunúť do archívu {len(ts_ids)} TS ({', '.join(ts_ids[:10])}"
+            f"{'…' if len(ts_ids) > 10 else ''}) spolu s ich TC a bugmi?"
+        ):
+            return
+
+        moved = split_archive(self.data, ts_ids, self.links)
+        try:
+            segment = self.archive.add(moved, f"Uzavreté TS: {', '.join(ts_ids)}")
+        except OSError as e:
+            restore_archive(self.data, moved, self.links)
+            messagebox.showerror("Chyba", f"Archív sa nepodarilo zapísať: {e}")
+            return
+        self.prune_indexes()
+        self.save()
+        self.refresh_all()
+        counts = segment["counts"]
+        messagebox.showinfo(
+            "Archív",
+            f"Archivované: {counts['test_scenarios']} TS, {counts['test_cases']} TC, "
+            f"{counts['bug_reports']} bugov ({segment['file']})."
+        )
+
+    def show_archive(self):
+        win = tk.Toplevel(self)
+        win.title("Archív")
+        win.transient(self)
+        win.geometry("700x450")
+
+        query_var = tk.StringVar()
+        ttk.Entry(win, textvariable=query_var).pack(side="top", fill="x", padx=10, pady=(10, 5))
+        rows = tk.Listbox(win)
+        rows.pack(side="top", fill="both", expand=True, padx=10, pady=5)
+        self._styled_listbox_widgets.append(rows)
+        self.apply_theme()
+
+        shown = []  # segment pre každý riadok
+
+        def refresh(*args):
+            shown.clear()
+            rows.delete(0, "end")
+            text = query_var.get().strip()
+            if text:
+                for segment, name, record_id, title in self.archive.search(text)[:500]:
+                    shown.append(segment)
+                    rows.insert("end", f"{record_id} – {title}   [{segment['label']}, {segment['created_at']}]")
+            else:
+                for segment in reversed(self.archive.segments):
+                    counts = segment["counts"]
+                    restored = f", obnovený {segment['restored_at']}" if segment.get("restored_at") else ""
+                    shown.append(segment)
+                    rows.insert(
+                        "end",
+                        f"{segment['created_at']} – {segment['label']} "
+                        f"({counts['test_scenarios']} TS, {counts['test_cases']} TC, {counts['bug_reports']} bugov"
+                        f"{restored})"
+                    )
+
+        def selected_segment():
+            selection = rows.curselection()
+            if not selection:
+                messagebox.showerror("Chyba", "Najprv vyber segment alebo záznam.", parent=win)
+                return None
+            return shown[selection[0]]
+
+        def export_segment():
+            segment = selected_segment()
+            if segment:
+                suffix = "archiv_" + segment["file"].split(".")[0].replace("segment-", "")
+                self.run_export(["txt", "html", "docx", "pdf"], data=self.archive.load(segment), suffix=suffix,
+                                variant="archive")
+
+        def restore_segment():
+            segment = selected_segment()
+            if not segment:
+                return
+            if segment.get("restored_at"):
+                messagebox.showerror(
+                    "Chyba", f"Segment {segment['file']} už bol obnovený ({segment['restored_at']}).", parent=win
+                )
+                return
+            if not messagebox.askyesno(
+                "Obnoviť z archívu", f"Vrátiť záznamy zo segmentu {segment['file']} do databázy?", parent=win
+            ):
+                return
+            try:
+                archived = self.archive.load(segment)
+                self.archive.mark_restored(segment)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Chyba", f"Segment sa nepodarilo obnoviť: {e}", parent=win)
+                return
+            renamed = restore_archive(self.data, archived, self.links)
+            self.reindex()
+            self.save()
+            self.refresh_all()
+            text = "Záznamy boli obnovené."
+            if renamed:
+                text += "\n\nObsadené ID boli premenované:\n" + "\n".join(
+                    f"{old_id} → {new_id}" for old_id, new_id in list(renamed.items())[:20]
+                )
+            messagebox.showinfo("Archív", text, parent=win)
+
+        def close():
+            self._styled_listbox_widgets.remove(rows)
+            win.destroy()
+
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        ttk.Button(btn_frame, text="Exportovať", command=export_segment).pack(side="left")
+        ttk.Button(btn_frame, text="Obnoviť do databázy", command=restore_segment).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Zavrieť", command=close).pack(side="right")
+
+        query_var.trace_add("write", refresh)
+        win.protocol("WM_DELETE_WINDOW", close)
+        refresh()
 
 
 if __name__ == "__main__":
-    app = QAApp()
-    app.mainloop()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="QA Manager")
+    parser.add_argument("--server", action="store_true", help="spustí REST API namiesto GUI")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--data", metavar="JSON", default=DATA_FILE, help="dátový súbor projektu")
+    parser.add_argument("--import-junit", metavar="XML", help="nahrá výsledky z JUnit / xUnit XML a skončí")
+    parser.add_argument("--create-bugs", action="store_true", help="pri importe vytvorí bug pre zlyhané testy")
+    parser.add_argument("--check", action="store_true", help="skontroluje integritu databázy a skončí")
+    parser.add_argument("--repair", action="store_true", help="skontroluje integritu a opraví, čo sa dá")
+    parser.add_argument("--diff", metavar="JSON", help="porovná starší snapshot s aktuálnymi dátami a skončí")
+    args = parser.parse_args()
+
+    if args.server:
+        run_server(args.host, args.port, args.data)
+    elif args.import_junit:
+        store = SharedStore(args.data) if SHARED_STORAGE else None
+        data = store.load() if store else load_data(args.data)
+        history = RecordHistory(history_path(args.data))
+        history.commit(data)
+        links = LinkGraph(data)
+        links.reserve(issued_ids(history, ArchiveStore(archive_dir(args.data))))
+        summary = import_junit(data, args.import_junit, links=links, create_bugs=args.create_bugs)
+        if store:
+            store.save(data)
+        else:
+            save_data(data, args.data)
+        history.commit(data)
+        print(junit_summary(summary))
+    elif args.check or args.repair:
+        store = SharedStore(args.data) if SHARED_STORAGE else None
+        data = store.load() if store else load_data(args.data)
+        report = check_integrity(data)
+        print(integrity_summary(report))
+        if args.repair and report.fixable:
+            history = RecordHistory(history_path(args.data))
+            history.commit(data)
+            fixed = apply_repair(data, report)
+            if store:
+                store.save(data)
+            else:
+                save_data(data, args.data)
+            history.commit(data)
+            print(f"Opravené záznamy: {fixed}")
+    elif args.diff:
+        print(diff_summary(diff_datasets(load_data(args.diff), load_data(args.data))))
+    else:
+        app = QAApp()
+        app.mainloop()
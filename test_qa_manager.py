@@ -0,0 +1,153 @@
+import io
+
+import qa_manager as qa
+
+
+def lazy_data(tmp_path, count=50):
+    path = str(tmp_path / "data.json")
+    data = qa.empty_data()
+    ts = qa.create_ts(data, "Prihlásenie")
+    for i in range(count):
+        qa.create_tc(data, f"TC {i}", ["otvor stránku", "prihlás sa"], ts_id=ts["id"])
+    qa.create_bug(data, "Chyba", ["krok"], related_tc="TC01")
+    qa.save_data(data, path)
+    loaded = qa.load_data(path)
+    assert all(isinstance(r, qa.LazyRecord) for name in qa.COLLECTIONS for r in loaded[name])
+    return loaded
+
+
+def loaded_records(data):
+    return [r["id"] for name in qa.COLLECTIONS for r in data[name] if r.loaded]
+
+
+def test_export_keeps_lazy_records_unloaded(tmp_path):
+    data = lazy_data(tmp_path)
+    writer = qa.TxtWriter()
+    writer.filename = str(tmp_path / "export.txt")
+    ctx = qa.ExportContext(qa.ExportCache(str(tmp_path / "export.cache.json")))
+    qa.run_export(data, [writer], ctx)
+
+    assert loaded_records(data) == []
+    text = (tmp_path / "export.txt").read_text(encoding="utf-8")
+    assert "TC 49" in text and "prihlás sa" in text
+
+
+def shared_store(tmp_path):
+    path = str(tmp_path / "shared.json")
+    data = qa.empty_data()
+    ts = qa.create_ts(data, "Prihlásenie")
+    for i in range(3):
+        qa.create_tc(data, f"TC {i}", ["krok"], ts_id=ts["id"])
+    qa.save_data(data, path)
+    store = qa.SharedStore(path)
+    return store, store.load()
+
+
+def test_shared_local_changes_without_fingerprints(tmp_path, monkeypatch):
+    store, data = shared_store(tmp_path)
+
+    def fingerprint(record):
+        raise AssertionError("odtlačok v GUI vlákne")
+
+    monkeypatch.setattr(qa, "_fingerprint", fingerprint)
+    assert not store.has_local_changes(data)
+    qa.edit_tc(data, "TC01", title="Upravený")
+    assert store.has_local_changes(data)
+
+
+def test_shared_background_save_keeps_edits_made_meanwhile(tmp_path):
+    store, data = shared_store(tmp_path)
+    other = qa.SharedStore(store.path)
+    theirs = other.load()
+
+    qa.edit_tc(data, "TC01", title="Pred uložením")
+    snapshot, sent = store.snapshot(data)
+    qa.edit_tc(data, "TC02", title="Počas ukladania")
+    qa.create_tc(data, "Nový", ["krok"])
+    qa.edit_tc(theirs, "TC03", status="PASSED")
+    other.save(theirs)
+
+    store.save(snapshot, sent[1])
+    store.adopt(data, snapshot, sent)
+    tcs = {tc["id"]: tc for tc in data["test_cases"]}
+    assert tcs["TC01"]["title"] == "Pred uložením"
+    assert tcs["TC02"]["title"] == "Počas ukladania"
+    assert tcs["TC03"]["status"] == "PASSED"
+    assert "TC04" in tcs
+    assert store.has_local_changes(data)
+
+    store.save(data)
+    disk = {tc["id"]: tc for tc in qa.materialize_data(qa.load_data(store.path))["test_cases"]}
+    assert [disk[i]["title"] for i in ("TC01", "TC02", "TC04")] == ["Pred uložením", "Počas ukladania", "Nový"]
+    assert disk["TC03"]["status"] == "PASSED"
+
+
+def test_ids_not_reused_after_archive_or_reset(tmp_path):
+    data = qa.empty_data()
+    links = qa.LinkGraph(data)
+    for title in ("A", "B"):
+        qa.create_ts(data, title, links=links)
+    archive = qa.ArchiveStore(str(tmp_path / "archive"))
+    archive.add(qa.split_archive(data, ["TS02"], links), "test")
+    history = qa.RecordHistory(str(tmp_path / "history.jsonl"))
+    history.commit(data)
+
+    fresh = qa.LinkGraph(data)
+    fresh.reserve(qa.issued_ids(history, archive))
+    assert qa.create_ts(data, "C", links=fresh)["id"] == "TS03"
+
+    empty = qa.empty_data()
+    after_reset = qa.LinkGraph(empty)
+    after_reset.reserve(qa.issued_ids(history, archive))
+    assert qa.create_ts(empty, "D", links=after_reset)["id"] == "TS03"
+
+
+def test_junit_import_survives_legacy_tcs_and_broken_xml():
+    data = qa.empty_data()
+    qa.create_tc(data, "Prihlásenie", ["krok"])
+    data["test_cases"].append({"id": "TC02", "title": "", "steps": [], "status": "NOT RUN"})
+    qa.create_tc(data, "Odhlásenie", ["krok"])
+    xml = (
+        '<testsuite><testcase name="test_TC01"><failure message="zle"/></testcase>'
+        '<testcase name="test_TC02"><failure message="zle"/></testcase>'
+        '<testcase name="test_TC03"/><testcase name="test_TC'
+    )
+    result = qa.import_junit(data, io.BytesIO(xml.encode()), create_bugs=True)
+
+    assert [tc["status"] for tc in data["test_cases"]] == ["FAILED", "FAILED", "PASSED"]
+    assert [bug["related_tc"] for bug in result["bugs"]] == ["TC01", "TC02"]
+    assert result["updated"] == 3 and result["error"]
+    assert "Súbor sa nepodarilo dočítať" in qa.junit_summary(result)
+
+
+class CountingRecord(dict):
+    reads = 0
+
+    def __getitem__(self, key):
+        CountingRecord.reads += 1
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        CountingRecord.reads += 1
+        return dict.get(self, key, default)
+
+
+def test_row_labels_unchanged_refresh_skips_records():
+    records = [CountingRecord(id=f"TC{i:02d}", title=f"TC {i}", status="NOT RUN") for i in range(1, 101)]
+    labels = qa.RowLabels("{} – {} [{}]", "id", "title", "status")
+    first = list(labels.rows(records))
+
+    CountingRecord.reads = 0
+    assert labels.rows(records) == first
+    assert CountingRecord.reads == 0
+
+    records[41]["status"] = "PASSED"
+    labels.changed(records[41])
+    records.append(CountingRecord(id="TC101", title="Nový", status="NOT RUN"))
+    CountingRecord.reads = 0
+    rows = labels.rows(records)
+    assert rows[41] == "TC42 – TC 42 [PASSED]" and rows[-1] == "TC101 – Nový [NOT RUN]"
+    assert CountingRecord.reads < 10
+
+    passed = labels.rows(records, keep=lambda tc: tc["status"] == "PASSED", key="PASSED")
+    assert passed == ["TC42 – TC 42 [PASSED]"]